@@ -1,6 +1,9 @@
 # ==========================================================
 # BACKTRACKING CPU / OPTIMAL HINT
 # ==========================================================
+from samegame.engine import get_all_components
+from samegame.moves import apply_move, undo_move
+
 def backtracking_best_score(grid, is_cpu_turn):
     """
     Pure Backtracking (no memoization)
@@ -21,12 +24,8 @@ def backtracking_best_score(grid, is_cpu_turn):
             if len(comp) <= 1:
                 continue
 
-            # --- Save current state (for backtracking) ---
-            original_board = copy_grid(grid)
-
-            # --- Make move ---
-            remove_component(grid, comp)
-            apply_gravity(grid)
+            # --- Make move (undo log instead of a board copy) ---
+            undo = apply_move(grid, comp)
 
             gain = len(comp) ** 2
             future = backtracking_best_score(grid, False)
@@ -34,7 +33,7 @@ def backtracking_best_score(grid, is_cpu_turn):
             best = max(best, gain - future)
 
             # --- Undo move (Backtrack) ---
-            grid.board = original_board.board
+            undo_move(grid, undo)
 
         return best
 
@@ -45,12 +44,8 @@ def backtracking_best_score(grid, is_cpu_turn):
             if len(comp) <= 1:
                 continue
 
-            # --- Save current state ---
-            original_board = copy_grid(grid)
-
             # --- Make move ---
-            remove_component(grid, comp)
-            apply_gravity(grid)
+            undo = apply_move(grid, comp)
 
             gain = len(comp) ** 2
             future = backtracking_best_score(grid, True)
@@ -58,7 +53,7 @@ def backtracking_best_score(grid, is_cpu_turn):
             worst = min(worst, future - gain)
 
             # --- Undo move ---
-            grid.board = original_board.board
+            undo_move(grid, undo)
 
         return worst
 
@@ -79,17 +74,13 @@ def cpu_best_move_backtracking(grid):
         if len(comp) <= 1:
             continue
 
-        # Deep copy the board safely
-        original_state = copy_grid(grid)
-
         # Make move
-        remove_component(grid, comp)
-        apply_gravity(grid)
+        undo = apply_move(grid, comp)
 
         gain = len(comp) ** 2
 
         # Opponent turn
-        opponent_best = backtracking_best_score(grid, is_cpu=False)
+        opponent_best = backtracking_best_score(grid, is_cpu_turn=False)
 
         current_value = gain - opponent_best
 
@@ -99,7 +90,7 @@ def cpu_best_move_backtracking(grid):
             best_component = comp
 
         # Restore board (safe backtracking)
-        grid.board = [row[:] for row in original_state.board]
+        undo_move(grid, undo)
 
     return best_component
 
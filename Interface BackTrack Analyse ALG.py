@@ -11,14 +11,34 @@
 # 6. Greedy Strategy -> Local heuristic optimization
 # 7. Optimal Strategy -> Divide & Conquer + Dynamic Programming
 # 8. Exhaustive Strategy -> Backtracking with/without Memoization
+# 9. Beam Search       -> Top-K positions per depth, tunable cost
+# 10. Nested Monte Carlo -> Anytime search for large boards
+# 11. NRPA             -> Nested rollouts with a learned move policy
 # ==========================================================
 
 import tkinter as tk
 from tkinter import messagebox, ttk
-import random
 import time
 import threading
 
+from samegame import create_grid, endgame
+from samegame.engine import (get_component, get_all_components, apply_gravity,
+                             is_game_over, is_board_empty)
+from samegame.components import component_index
+from samegame.diskcache import solve_table, SCORE
+from samegame.hashing import state_key
+from samegame.beam import beam_search
+from samegame.commute import commuting_moves
+from samegame.divide import independent_regions, sub_board
+from samegame.moves import apply_move, undo_move
+from samegame.nmcs import NestedMonteCarlo
+from samegame.nrpa import NRPA, warm_policy, remember_policy
+from samegame.parallel import (root_map, child_boards, merge_stats, start_helpers,
+                               stop_helpers, DEFAULT_WORKERS)
+from samegame.sharedtt import SharedTranspositionTable, SearchStopped
+from samegame.stealing import work_stealing, merge_reports, format_reports
+from samegame.ttable import TranspositionTable
+
 # -------------------------------
 # GLOBAL GAME VARIABLES
 # -------------------------------
@@ -31,6 +51,10 @@ COLOR_MAP = {
     None: '#1e293b'  # Empty (dark)
 }
 
+# Board backend: 'list' (2D list GridADT), 'columns' (bottom-up column lists)
+# or 'bitboard' (one bitmask per color; the fastest for the exact solvers)
+BOARD_BACKEND = 'bitboard'
+
 # Theme colors
 BG_COLOR = '#0f172a'
 FG_COLOR = '#f8fafc'
@@ -39,144 +63,104 @@ PANEL_COLOR = '#1e293b'
 BUTTON_COLOR = '#334155'
 HIGHLIGHT_COLOR = '#fbbf24'
 
+# Branch-and-bound for the memoized solvers: skip any move whose
+# score plus the color bound (sum of count^2 per color) cannot beat
+# the best total already found. Scores stay optimal.
+BRANCH_AND_BOUND = True
+
+# Partial-order reduction for pure backtracking: moves that commute
+# (disjoint, non-adjacent columns, no column emptied) are searched
+# in one order only. Scores stay optimal.
+PARTIAL_ORDER_REDUCTION = True
+
+# Divide phase: the board's columns split into regions sharing no
+# color (samegame.divide) and optimal_strategy solves one region on
+# its own. DIVIDE_INDEPENDENT also splits every state inside the DP
+# search and adds up the regions' scores: exact, but off because
+# such splits are rare (~1% of states on 4-color boards, see
+# python -m samegame.bench) and the check costs ~10% per node.
+DIVIDE_INDEPENDENT = False
+
+# Entry budget of each solver's transposition table
+TT_ENTRIES = 1 << 18
+
+# Keep the exact scores of dp_memo and backtrack_memo_cache in
+# ~/.samegame/solves.sqlite3 across sessions (samegame.diskcache;
+# opt-in: the file and its writer thread are created at import)
+PERSISTENT_CACHE = False
+
+# Exhaustive strategies: search the root moves in a pool of
+# PARALLEL_WORKERS processes (None = one per CPU core,
+# samegame.parallel). Same moves as the serial search.
+PARALLEL_ROOT = False
+PARALLEL_WORKERS = None
+
+# DP and exhaustive strategies: search with one memo table in
+# shared memory (samegame.sharedtt) that PARALLEL_WORKERS - 1
+# helper processes fill by searching the root moves in other
+# orders (Lazy SMP); with PARALLEL_ROOT the root-split workers
+# share it instead. Same moves as the serial search.
+SHARED_TT = False
+
+# Pure exhaustive strategy: share the search tree between
+# PARALLEL_WORKERS processes that steal unexplored subtrees from
+# each other (samegame.stealing); with BRANCH_AND_BOUND they also
+# share their best score as a cut-off bound. Same moves as the
+# serial search.
+WORK_STEALING = False
+
+# Beam search: positions kept per depth, and moves searched ahead
+# (None = to the end of the game). Cost grows linearly in both.
+BEAM_WIDTH = 10
+BEAM_DEPTH = None
+
+# Nested Monte Carlo Search: nesting level and time budget
+NMCS_LEVEL = 2
+NMCS_TIME_LIMIT = 5.0
+
+# Nested Rollout Policy Adaptation: nesting level and time budget
+NRPA_LEVEL = 2
+NRPA_TIME_LIMIT = 5.0
+
 # Statistics for search tree pruning (advanced demo)
+# pruned_branches counts bound cutoffs (commuting moves skipped in
+# pure backtracking, plus the workers' bound cutoffs with
+# WORK_STEALING), memo_hits cache lookups, splits boards solved
+# as independent regions, endgames boards handed to samegame.endgame
 search_stats = {
     'nodes_visited': 0,
     'pruned_branches': 0,
-    'max_depth': 0
+    'memo_hits': 0,
+    'max_depth': 0,
+    'splits': 0,
+    'endgames': 0
 }
 
+# Per-worker totals of work-stealing searches (worker -> report)
+worker_reports = {}
+
 def reset_search_stats():
     """Reset search tree statistics"""
     global search_stats
+    worker_reports.clear()
     search_stats = {
         'nodes_visited': 0,
         'pruned_branches': 0,
-        'max_depth': 0
+        'memo_hits': 0,
+        'max_depth': 0,
+        'splits': 0,
+        'endgames': 0
     }
 
 # ==========================================================
-# GRID ADT
-# ==========================================================
-class GridADT:
-    """Abstract Data Type for Game Board"""
-
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = self.create_board()
-
-    def create_board(self):
-        return [[random.choice(COLORS) for _ in range(self.cols)]
-                for _ in range(self.rows)]
-
-    def copy(self):
-        """Create a deep copy of the grid"""
-        new_grid = GridADT.__new__(GridADT)
-        new_grid.rows = self.rows
-        new_grid.cols = self.cols
-        new_grid.board = [row[:] for row in self.board]
-        return new_grid
-
-# ==========================================================
-# GRAPH ADT
-# ==========================================================
-class GraphADT:
-    @staticmethod
-    def neighbors(r, c):
-        return [(r-1, c), (r+1, c), (r, c-1), (r, c+1)]
-
+# GRID ADT + ENGINE (shared samegame package)
 # ==========================================================
-# ITERATIVE DFS (STACK-BASED)
-# ==========================================================
-def dfs(grid, r, c, color, visited, component):
-    """Iterative DFS using stack ADT"""
-    stack = [(r, c)]
-
-    while stack:
-        cr, cc = stack.pop()
-
-        if cr < 0 or cr >= grid.rows or cc < 0 or cc >= grid.cols:
-            continue
-
-        if (cr, cc) in visited:
-            continue
-
-        if grid.board[cr][cc] != color:
-            continue
-
-        visited.add((cr, cc))
-        component.append((cr, cc))
-
-        for nr, nc in GraphADT.neighbors(cr, cc):
-            if (nr, nc) not in visited:
-                stack.append((nr, nc))
-
-def get_component(grid, r, c):
-    """Get connected component"""
-    if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
-        return []
-
-    if grid.board[r][c] is None:
-        return []
-
-    visited = set()
-    component = []
-    dfs(grid, r, c, grid.board[r][c], visited, component)
-    return component
-
-def get_all_components(grid):
-    """Get all valid components (size > 1)"""
-    visited = set()
-    components = []
-
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if grid.board[r][c] is not None and (r, c) not in visited:
-                comp = []
-                dfs(grid, r, c, grid.board[r][c], visited, comp)
-                if len(comp) > 1:
-                    components.append(comp)
-
-    return components
-
-# ==========================================================
-# GRAVITY (STACK-BASED)
-# ==========================================================
-def apply_gravity(grid):
-    """Apply vertical and horizontal gravity"""
-    # Vertical gravity (stack-based)
-    for c in range(grid.cols):
-        stack = []
-        for r in range(grid.rows):
-            if grid.board[r][c] is not None:
-                stack.append(grid.board[r][c])
-
-        for r in range(grid.rows - 1, -1, -1):
-            grid.board[r][c] = stack.pop() if stack else None
-
-    # Horizontal shift
-    write_col = 0
-    for read_col in range(grid.cols):
-        column_has_block = any(
-            grid.board[r][read_col] is not None
-            for r in range(grid.rows)
-        )
-
-        if column_has_block:
-            if write_col != read_col:
-                for r in range(grid.rows):
-                    grid.board[r][write_col] = grid.board[r][read_col]
-                    grid.board[r][read_col] = None
-            write_col += 1
-
-def is_game_over(grid):
-    """Check if any valid moves remain"""
-    return len(get_all_components(grid)) == 0
-
-def is_board_empty(grid):
-    """Check if board is completely empty"""
-    return all(cell is None for row in grid.board for cell in row)
+# GridADT, iterative DFS components, gravity and the game-over
+# checks come from samegame.engine; BOARD_BACKEND picks the
+# board representation.
+def new_grid(rows, cols):
+    """Create a board using the selected BOARD_BACKEND"""
+    return create_grid(rows, cols, BOARD_BACKEND, COLORS)
 
 # ==========================================================
 # MERGE SORT FOR GREEDY STRATEGY
@@ -211,12 +195,13 @@ def merge(left, right):
 # ==========================================================
 # GREEDY STRATEGY (Used for CPU opponent)
 # ==========================================================
-def greedy_strategy(grid):
+def greedy_strategy(grid, index=None):
     """
     Greedy Strategy: Always select the largest component
     Uses merge sort for academic demonstration
+    index: optional component index kept up to date by the caller
     """
-    components = get_all_components(grid)
+    components = index.moves() if index is not None else get_all_components(grid)
 
     if not components:
         return None
@@ -239,55 +224,90 @@ def greedy_strategy(grid):
 # ==========================================================
 def divide_board_regions(grid):
     """
-    Divide the board into independent regions based on empty columns.
-    Each region is a contiguous set of columns that contain blocks.
+    Divide the board into independent regions.
+    Each region is a contiguous set of columns sharing no color with
+    the other regions, so no move in one region ever changes another
+    (empty columns alone never split: gravity closes them up).
     """
-    regions = []
-    current = []
-
-    for c in range(grid.cols):
-        column_has_block = any(
-            grid.board[r][c] is not None
-            for r in range(grid.rows)
-        )
-
-        if column_has_block:
-            current.append(c)
-        else:
-            if current:
-                regions.append(current)
-                current = []
-
-    if current:
-        regions.append(current)
-
-    return regions
+    return independent_regions(grid)
 
 # ==========================================================
 # DP SOLVER FOR OPTIMAL SCORE (Memoized)
 # ==========================================================
-dp_memo = {}
+dp_memo = solve_table(SCORE, TT_ENTRIES, persistent=PERSISTENT_CACHE)
+# Upper bounds of states cut off by branch-and-bound (not exact)
+dp_bound_memo = TranspositionTable(TT_ENTRIES)
 
-def dp_max_score(grid, depth=0):
+def dp_max_score(grid, depth=0, index=None, alpha=-1):
     """
     Dynamic Programming solver for Same Game (single player)
     Returns maximum possible total score from current board state
     Includes search statistics for advanced demo
+    index: move index of grid (samegame.components), played and
+    undone along the search (built on the first call)
+    alpha: score the caller already has from this state. With
+    BRANCH_AND_BOUND a result <= alpha is only an upper bound;
+    a result > alpha is always exact.
     """
     global search_stats
     search_stats['nodes_visited'] += 1
     search_stats['max_depth'] = max(search_stats['max_depth'], depth)
     
-    # Create hashable board representation
-    board_tuple = tuple(tuple(row) for row in grid.board)
+    # 64-bit column-hash key for the board
+    board_key = state_key(grid)
 
     # Check memoization cache
-    if board_tuple in dp_memo:
-        search_stats['pruned_branches'] += 1
-        return dp_memo[board_tuple]
+    if board_key in dp_memo:
+        search_stats['memo_hits'] += 1
+        return dp_memo[board_key]
+
+    if index is None:
+        index = component_index(grid)
+    # Probes from here on = size of this subtree (replacement weight)
+    start = dp_memo.probes
+
+    blocks = sum(index.counts.values())
+    if blocks <= endgame.ENDGAME_CELLS:
+        # Endgame: exact score from the tablebase / endgame solver
+        search_stats['endgames'] += 1
+        best = endgame.solve_grid(grid, blocks)[0]
+        dp_memo.store(board_key, best, 0)
+        return best
+
+    if BRANCH_AND_BOUND:
+        bound = index.upper_bound()
+        bound = min(bound, dp_bound_memo.get(board_key, bound))
+        if bound <= alpha:
+            search_stats['pruned_branches'] += 1
+            return bound
+    else:
+        alpha = -1   # every result is exact
+
+    if DIVIDE_INDEPENDENT:
+        regions = divide_board_regions(grid)
+        if len(regions) > 1:
+            # Independent regions: the best score is the sum of each
+            # region's best score (each solved and cached on its own).
+            # A region only has to beat alpha minus what the others
+            # can add at most.
+            search_stats['splits'] += 1
+            parts = [sub_board(grid, region) for region in regions]
+            indexes = [component_index(part) for part in parts]
+            bounds = [part_index.upper_bound() for part_index in indexes]
+            best = 0
+            for i, part in enumerate(parts):
+                rest = sum(bounds[i + 1:])
+                value = dp_max_score(part, depth, indexes[i], alpha - best - rest)
+                if best + value + rest <= alpha:
+                    # Cut off: the whole board cannot beat alpha
+                    dp_bound_memo.store(board_key, best + value + rest, dp_memo.probes - start)
+                    return best + value + rest
+                best += value
+            dp_memo.store(board_key, best, dp_memo.probes - start)
+            return best
 
     # Get all possible moves
-    components = get_all_components(grid)
+    components = index.moves()
     
     # Sort by size for better pruning (optional but helpful)
     components.sort(key=len, reverse=True)
@@ -297,41 +317,57 @@ def dp_max_score(grid, depth=0):
         return 0
 
     best = 0
+    cut_bound = 0   # highest upper bound among cut-off moves
 
     # Try each possible move
     for comp in components:
-        # Create simulation grid
-        sim = grid.copy()
+        gain = len(comp) ** 2
+        target = max(best, alpha)
 
-        # Remove the component
-        for r, c in comp:
-            sim.board[r][c] = None
+        if BRANCH_AND_BOUND:
+            # Bound: this move cannot beat the best total so far
+            limit = gain + index.bound_after(index.color_of(comp), len(comp))
+            if limit <= target:
+                search_stats['pruned_branches'] += 1
+                cut_bound = max(cut_bound, limit)
+                continue
 
-        # Apply gravity
-        apply_gravity(sim)
+        # Play the move in place (remove + gravity)
+        undo = index.play(comp)
 
         # Calculate score: immediate gain + future optimal score
-        gain = len(comp) ** 2
-        future = dp_max_score(sim, depth + 1)
+        future = dp_max_score(grid, depth + 1, index, target - gain)
         total = gain + future
 
-        # Update best score
-        if total > best:
+        # Restore the board
+        index.undo(undo)
+
+        # Update best score (totals <= target are only upper bounds)
+        if total > target:
             best = total
+        else:
+            cut_bound = max(cut_bound, total)
+
+    if cut_bound > best:
+        # Every move was cut off below alpha: remember the bound only
+        dp_bound_memo.store(board_key, cut_bound, dp_memo.probes - start)
+        return cut_bound
 
     # Cache and return result
-    dp_memo[board_tuple] = best
+    dp_memo.store(board_key, best, dp_memo.probes - start)
     return best
 
 # ==========================================================
 # CONQUER REGION USING DP
 # ==========================================================
-def conquer_region(grid, region_cols):
+def conquer_region(grid, region_cols, index=None):
     """
     Solve a specific region using DP.
     Only considers components that are fully inside the region.
     """
-    components = get_all_components(grid)
+    if index is None:
+        index = component_index(grid)
+    components = index.moves()
 
     best_move = None
     best_value = -1
@@ -341,17 +377,19 @@ def conquer_region(grid, region_cols):
         if not all(c in region_cols for r, c in comp):
             continue
 
-        sim = grid.copy()
-
-        for r, c in comp:
-            sim.board[r][c] = None
+        gain = len(comp) ** 2
+        if BRANCH_AND_BOUND and gain + index.bound_after(index.color_of(comp), len(comp)) <= best_value:
+            search_stats['pruned_branches'] += 1
+            continue
 
-        apply_gravity(sim)
+        undo = index.play(comp)
 
-        gain = len(comp) ** 2
-        future = dp_max_score(sim)
+        # Totals <= best_value may be bounds, but never win the move
+        future = dp_max_score(grid, 0, index, best_value - gain)
         total = gain + future
 
+        index.undo(undo)
+
         if total > best_value:
             best_value = total
             best_move = comp
@@ -376,14 +414,32 @@ def optimal_strategy(grid):
     if not regions:
         return None
 
+    if len(regions) > 1:
+        # Independent regions: the best total is the sum of the
+        # regions' best scores, so the best move of any region that
+        # has a move is optimal. Solve the smallest on its own board.
+        search_stats['splits'] += 1
+        for region in sorted(regions, key=len):
+            part = sub_board(grid, region)
+            move, _ = conquer_region(part, range(part.cols))
+            if move:
+                return [(r, c + region[0]) for r, c in move]
+        return None
+
     results = []
+    index = component_index(grid)
+    started = start_lazy_smp('dp', grid, index.moves()) if SHARED_TT else None
 
     # -------- CONQUER --------
-    for region in regions:
-        move, value = conquer_region(grid, region)
+    try:
+        for region in regions:
+            move, value = conquer_region(grid, region, index)
 
-        if move:
-            results.append((move, value))
+            if move:
+                results.append((move, value))
+    finally:
+        if started is not None:
+            finish_lazy_smp(started)
 
     # -------- COMBINE --------
     best_move = None
@@ -399,25 +455,42 @@ def optimal_strategy(grid):
 # ==========================================================
 # EXHAUSTIVE STRATEGY (BACKTRACKING WITH MEMOIZATION)
 # ==========================================================
-backtrack_memo_cache = {}
+backtrack_memo_cache = solve_table(SCORE, TT_ENTRIES, persistent=PERSISTENT_CACHE)
+# Upper bounds of states cut off by branch-and-bound (not exact)
+backtrack_bound_cache = TranspositionTable(TT_ENTRIES)
 
-def backtrack_memo(grid, depth=0):
+def backtrack_memo(grid, depth=0, index=None, alpha=-1):
     """
     Backtracking with memoization for optimal score
     Returns the maximum possible total score from this state
     Includes search statistics for advanced demo
+    index: component index of grid (built on the first call)
+    alpha: score the caller already has (see dp_max_score)
     """
     global search_stats
     search_stats['nodes_visited'] += 1
     search_stats['max_depth'] = max(search_stats['max_depth'], depth)
     
-    board_tuple = tuple(tuple(row) for row in grid.board)
+    board_key = state_key(grid)
 
-    if board_tuple in backtrack_memo_cache:
-        search_stats['pruned_branches'] += 1
-        return backtrack_memo_cache[board_tuple]
+    if board_key in backtrack_memo_cache:
+        search_stats['memo_hits'] += 1
+        return backtrack_memo_cache[board_key]
 
-    components = get_all_components(grid)
+    if index is None:
+        index = component_index(grid)
+    start = backtrack_memo_cache.probes
+
+    if BRANCH_AND_BOUND:
+        bound = index.upper_bound()
+        bound = min(bound, backtrack_bound_cache.get(board_key, bound))
+        if bound <= alpha:
+            search_stats['pruned_branches'] += 1
+            return bound
+    else:
+        alpha = -1
+
+    components = index.moves()
 
     if not components:
         return 0
@@ -426,22 +499,106 @@ def backtrack_memo(grid, depth=0):
     components.sort(key=len, reverse=True)
 
     best = 0
+    cut_bound = 0
     for comp in components:
-        sim = grid.copy()
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
-
         gain = len(comp) ** 2
-        future = backtrack_memo(sim, depth + 1)
+        target = max(best, alpha)
+
+        if BRANCH_AND_BOUND:
+            limit = gain + index.bound_after(index.color_of(comp), len(comp))
+            if limit <= target:
+                search_stats['pruned_branches'] += 1
+                cut_bound = max(cut_bound, limit)
+                continue
+
+        undo = index.play(comp)
+
+        future = backtrack_memo(grid, depth + 1, index, target - gain)
         total = gain + future
 
-        if total > best:
+        index.undo(undo)
+
+        if total > target:
             best = total
+        else:
+            cut_bound = max(cut_bound, total)
+
+    if cut_bound > best:
+        backtrack_bound_cache.store(board_key, cut_bound, backtrack_memo_cache.probes - start)
+        return cut_bound
 
-    backtrack_memo_cache[board_tuple] = best
+    backtrack_memo_cache.store(board_key, best, backtrack_memo_cache.probes - start)
     return best
 
+def _memo_root_task(job):
+    """Pool worker: backtrack_memo after one root move, with the worker's stats"""
+    board, alpha, table = job
+    reset_search_stats()
+    saved = _swap_memo('memo', table) if table is not None else None
+    try:
+        future = backtrack_memo(board, 0, None, alpha)
+    finally:
+        if saved is not None:
+            _swap_memo('memo', saved)
+    return future, search_stats
+
+# ==========================================================
+# SHARED MEMO TABLE (LAZY SMP)
+# ==========================================================
+_shared_memo = None
+
+def shared_memo():
+    """The shared-memory memo table of SHARED_TT searches (created once)"""
+    global _shared_memo
+    if _shared_memo is None:
+        _shared_memo = SharedTranspositionTable(TT_ENTRIES)
+    return _shared_memo
+
+def _swap_memo(engine, table):
+    """Make table the memo of engine ('dp' or 'memo'); returns the one it replaces"""
+    global dp_memo, backtrack_memo_cache
+    if engine == 'dp':
+        saved, dp_memo = dp_memo, table
+    else:
+        saved, backtrack_memo_cache = backtrack_memo_cache, table
+    return saved
+
+def _helper_task(job):
+    """Lazy SMP helper: solve root moves into the shared table until stopped"""
+    engine, table, boards = job
+    reset_search_stats()
+    saved = _swap_memo(engine, table)
+    search = dp_max_score if engine == 'dp' else backtrack_memo
+    try:
+        for board in boards:
+            search(board)
+    except SearchStopped:
+        pass
+    finally:
+        _swap_memo(engine, saved)
+    return search_stats
+
+def start_lazy_smp(engine, grid, components):
+    """
+    Switch engine's memo to the shared table and start helpers that
+    solve the root moves into it, each from another move (smallest
+    first, where the serial search starts with the largest).
+    Returns what finish_lazy_smp needs.
+    """
+    table = shared_memo()
+    boards = child_boards(grid, components)[::-1]
+    helpers = max(1, (PARALLEL_WORKERS or DEFAULT_WORKERS) - 1)
+    jobs = [(engine, table, boards[h:] + boards[:h])
+            for h in range(min(helpers, len(boards)))]
+    futures = start_helpers(_helper_task, jobs, PARALLEL_WORKERS)
+    return engine, _swap_memo(engine, table), futures
+
+def finish_lazy_smp(started):
+    """Stop the helpers, restore the engine's own memo and add up the helpers' stats"""
+    engine, saved, futures = started
+    table = _swap_memo(engine, saved)
+    merge_stats(search_stats, stop_helpers(table, futures))
+
 def exhaustive_strategy(grid):
     """
     Exhaustive Strategy: Backtracking with memoization
@@ -449,8 +606,10 @@ def exhaustive_strategy(grid):
     """
     global backtrack_memo_cache
     backtrack_memo_cache.clear()
+    backtrack_bound_cache.clear()
 
-    components = get_all_components(grid)
+    index = component_index(grid)
+    components = index.moves()
 
     if not components:
         return None
@@ -458,22 +617,67 @@ def exhaustive_strategy(grid):
     # Sort components by size for better exploration order
     components.sort(key=len, reverse=True)
 
+    if SHARED_TT:
+        shared_memo().clear()
+
+    if PARALLEL_ROOT and len(components) > 1:
+        # The eldest (largest) move is searched here first; the
+        # others only have to beat its total, in the process pool
+        table = shared_memo() if SHARED_TT else None
+        saved = _swap_memo('memo', table) if table is not None else None
+        try:
+            best_move = components[0]
+            gain = len(best_move) ** 2
+            undo = index.play(best_move)
+            best_score = gain + backtrack_memo(grid, 0, index)
+            index.undo(undo)
+
+            moves = []
+            jobs = []
+            for comp, board in zip(components[1:], child_boards(grid, components[1:])):
+                gain = len(comp) ** 2
+                if BRANCH_AND_BOUND and gain + index.bound_after(index.color_of(comp), len(comp)) <= best_score:
+                    search_stats['pruned_branches'] += 1
+                    continue
+                moves.append(comp)
+                jobs.append((board, best_score - gain, table))
+            results = root_map(_memo_root_task, jobs, PARALLEL_WORKERS)
+        finally:
+            if saved is not None:
+                _swap_memo('memo', saved)
+        merge_stats(search_stats, [stats for _, stats in results])
+
+        # Totals <= the eldest's are only bounds and never win
+        for comp, (future, _) in zip(moves, results):
+            if len(comp) ** 2 + future > best_score:
+                best_score = len(comp) ** 2 + future
+                best_move = comp
+        return best_move
+
     best_score = -1
     best_move = None
 
-    for comp in components:
-        sim = grid.copy()
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
+    started = start_lazy_smp('memo', grid, components) if SHARED_TT else None
+    try:
+        for comp in components:
+            gain = len(comp) ** 2
+            if BRANCH_AND_BOUND and gain + index.bound_after(index.color_of(comp), len(comp)) <= best_score:
+                search_stats['pruned_branches'] += 1
+                continue
 
-        gain = len(comp) ** 2
-        future = backtrack_memo(sim)
-        total = gain + future
+            undo = index.play(comp)
 
-        if total > best_score:
-            best_score = total
-            best_move = comp
+            future = backtrack_memo(grid, 0, index, best_score - gain)
+            total = gain + future
+
+            index.undo(undo)
+
+            if total > best_score:
+                best_score = total
+                best_move = comp
+    finally:
+        if started is not None:
+            finish_lazy_smp(started)
 
     return best_move
 
@@ -481,11 +685,24 @@ def exhaustive_strategy(grid):
 # PURE BACKTRACKING (NO MEMOIZATION)
 # ==========================================================
 
-def backtrack_pure(grid, depth=0):
+def pure_moves(grid, components, sleep):
+    """
+    Moves for pure backtracking as (component, child sleep set).
+    With PARTIAL_ORDER_REDUCTION, moves asleep after a commuting
+    sibling are skipped (counted in pruned_branches).
+    """
+    if not PARTIAL_ORDER_REDUCTION:
+        return [(comp, None) for comp in components]
+    moves = commuting_moves(grid, components, sleep)
+    search_stats['pruned_branches'] += len(components) - len(moves)
+    return moves
+
+def backtrack_pure(grid, depth=0, sleep=None):
     """
     Pure Backtracking (NO memoization)
     Returns the maximum possible total score from this state
     Includes search statistics for advanced demo
+    sleep: moves already covered in another order (see samegame.commute)
     """
     global search_stats
     search_stats['nodes_visited'] += 1
@@ -500,21 +717,39 @@ def backtrack_pure(grid, depth=0):
     components.sort(key=len, reverse=True)
 
     best = 0
-    for comp in components:
-        sim = grid.copy()
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
+    for comp, child_sleep in pure_moves(grid, components, sleep):
+        undo = apply_move(grid, comp)
 
         gain = len(comp) ** 2
-        future = backtrack_pure(sim, depth + 1)
+        future = backtrack_pure(grid, depth + 1, child_sleep)
         total = gain + future
 
+        undo_move(grid, undo)
+
         if total > best:
             best = total
 
     return best
 
+def _pure_root_task(job):
+    """Pool worker: backtrack_pure after one root move, with the worker's stats"""
+    board, sleep = job
+    reset_search_stats()
+    future = backtrack_pure(board, sleep=sleep)
+    return future, search_stats
+
+def _pure_children(grid, sleep):
+    """Work-stealing search: the moves backtrack_pure searches from grid"""
+    components = get_all_components(grid)
+    components.sort(key=len, reverse=True)
+    return pure_moves(grid, components, sleep)
+
+def _worker_search_stats():
+    """Work-stealing worker: its search_stats since the last call"""
+    stats = search_stats
+    reset_search_stats()
+    return stats
+
 def exhaustive_strategy_pure(grid):
     """
     Pure Exhaustive Strategy: Backtracking WITHOUT memoization
@@ -528,25 +763,104 @@ def exhaustive_strategy_pure(grid):
     # Sort components by size for better exploration order
     components.sort(key=len, reverse=True)
 
+    if WORK_STEALING and len(components) > 1:
+        moves = pure_moves(grid, components, None)
+        boards = child_boards(grid, [comp for comp, _ in moves])
+        items = [(board, len(comp) ** 2, child_sleep)
+                 for board, (comp, child_sleep) in zip(boards, moves)]
+        values, reports = work_stealing(PARALLEL_WORKERS).run(
+            items, _pure_children, BRANCH_AND_BOUND, _worker_search_stats)
+        # Worker search_stats only count the commuting moves skipped
+        merge_stats(search_stats, [report['stats'] for report in reports])
+        merge_stats(search_stats, [{'nodes_visited': report['nodes'],
+                                    'pruned_branches': report['pruned'],
+                                    'max_depth': report['max_depth']} for report in reports])
+        merge_reports(worker_reports, reports)
+
+        best_score = -1
+        best_move = None
+        for (comp, _), value in zip(moves, values):
+            if value > best_score:
+                best_score = value
+                best_move = comp
+        return best_move
+
+    if PARALLEL_ROOT and len(components) > 1:
+        moves = pure_moves(grid, components, None)
+        boards = child_boards(grid, [comp for comp, _ in moves])
+        results = root_map(_pure_root_task,
+                           [(board, child_sleep) for board, (_, child_sleep) in zip(boards, moves)],
+                           PARALLEL_WORKERS)
+        merge_stats(search_stats, [stats for _, stats in results])
+
+        best_score = -1
+        best_move = None
+        for (comp, _), (future, _) in zip(moves, results):
+            if len(comp) ** 2 + future > best_score:
+                best_score = len(comp) ** 2 + future
+                best_move = comp
+        return best_move
+
     best_score = -1
     best_move = None
 
-    for comp in components:
-        sim = grid.copy()
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
+    for comp, child_sleep in pure_moves(grid, components, None):
+        undo = apply_move(grid, comp)
 
         gain = len(comp) ** 2
-        future = backtrack_pure(sim)
+        future = backtrack_pure(grid, sleep=child_sleep)
         total = gain + future
 
+        undo_move(grid, undo)
+
         if total > best_score:
             best_score = total
             best_move = comp
 
     return best_move
 
+# ==========================================================
+# BEAM SEARCH STRATEGY
+# ==========================================================
+def beam_strategy(grid):
+    """
+    Beam Search Strategy: first move of the best line kept by a
+    BEAM_WIDTH beam (accumulated score + group-size heuristic)
+    """
+    _, sequence = beam_search(grid, BEAM_WIDTH, BEAM_DEPTH)
+    return sequence[0] if sequence else None
+
+# ==========================================================
+# NESTED MONTE CARLO SEARCH (ANYTIME)
+# ==========================================================
+def nested_monte_carlo_strategy(grid):
+    """
+    Nested Monte Carlo Strategy: best move sequence found within
+    NMCS_LEVEL and NMCS_TIME_LIMIT, as (score, moves)
+    """
+    solver = NestedMonteCarlo(level=NMCS_LEVEL, time_limit=NMCS_TIME_LIMIT)
+    score, sequence = solver.search(grid)
+    search_stats['nodes_visited'] = solver.playouts
+    search_stats['max_depth'] = len(sequence)
+    return score, sequence
+
+# ==========================================================
+# NESTED ROLLOUT POLICY ADAPTATION
+# ==========================================================
+def nrpa_strategy(grid):
+    """
+    NRPA Strategy: best move sequence found within NRPA_TIME_LIMIT,
+    as (score, moves). The learned policy is kept per board size,
+    so every run warm-starts from the previous one.
+    """
+    solver = NRPA(level=NRPA_LEVEL, time_limit=NRPA_TIME_LIMIT,
+                  policy=warm_policy(grid.rows, grid.cols))
+    score, sequence = solver.search(grid)
+    remember_policy(grid.rows, grid.cols, solver.policy)
+    search_stats['nodes_visited'] = solver.playouts
+    search_stats['max_depth'] = len(sequence)
+    return score, sequence
+
 # ==========================================================
 # SAME GAME GUI
 # ==========================================================
@@ -698,6 +1012,7 @@ class SameGameGUI:
             ("🟡 DC + DP Optimal Strategy", '#eab308', 2),
             ("🔴 Exhaustive (Backtracking + Memo)", '#ef4444', 3),
             ("🟠 Exhaustive (Pure Backtracking)", '#f97316', 4),
+            (f"🔵 Beam Search (width {BEAM_WIDTH})", '#3b82f6', 5),
         ]
 
         for text, color, difficulty in algorithm_buttons:
@@ -750,9 +1065,10 @@ class SameGameGUI:
             1: "GREEDY STRATEGY - Local Heuristic", 
             2: "DC + DP OPTIMAL STRATEGY - Divide & Conquer + Dynamic Programming", 
             3: "EXHAUSTIVE STRATEGY - Backtracking + Memoization",
-            4: "EXHAUSTIVE STRATEGY - Pure Backtracking (No Memo)"
+            4: "EXHAUSTIVE STRATEGY - Pure Backtracking (No Memo)",
+            5: f"BEAM SEARCH STRATEGY - Top {BEAM_WIDTH} Positions per Depth"
         }
-        colors = {1: '#22c55e', 2: '#eab308', 3: '#ef4444', 4: '#f97316'}
+        colors = {1: '#22c55e', 2: '#eab308', 3: '#ef4444', 4: '#f97316', 5: '#3b82f6'}
 
         title_frame = tk.Frame(analysis_window, bg=BG_COLOR)
         title_frame.pack(pady=10)
@@ -858,7 +1174,8 @@ class SameGameGUI:
                 1: "GREEDY",
                 2: "DC + DP OPTIMAL", 
                 3: "EXHAUSTIVE (Memo)",
-                4: "EXHAUSTIVE (Pure)"
+                4: "EXHAUSTIVE (Pure)",
+                5: "BEAM SEARCH"
             }
             
             self.log_message(f"Starting {algo_names[difficulty]} Strategy Analysis...")
@@ -866,6 +1183,9 @@ class SameGameGUI:
 
             start_time = time.time()
 
+            # Tracks components across the moves played below
+            index = component_index(grid_to_analyze)
+
             while not is_game_over(grid_to_analyze) and self.algorithm_running:
                 while self.analysis_paused and self.algorithm_running:
                     time.sleep(0.1)
@@ -879,11 +1199,13 @@ class SameGameGUI:
                 self.root.after(0, lambda m=move_count: self.move_label.config(text=f"Move: {m}"))
 
                 if difficulty == 1:
-                    move = greedy_strategy(grid_to_analyze)
+                    move = greedy_strategy(grid_to_analyze, index)
                 elif difficulty == 2:
                     move = optimal_strategy(grid_to_analyze)
                 elif difficulty == 3:
                     move = exhaustive_strategy(grid_to_analyze)
+                elif difficulty == 5:
+                    move = beam_strategy(grid_to_analyze)
                 else:
                     move = exhaustive_strategy_pure(grid_to_analyze)
 
@@ -896,8 +1218,7 @@ class SameGameGUI:
                 self.root.after(0, lambda m=move: self.highlight_move(m))
                 time.sleep(self.speed_var.get() / 2)
 
-                for r, c in move:
-                    grid_to_analyze.board[r][c] = None
+                index.play(move)
 
                 gain = len(move) ** 2
                 score += gain
@@ -907,8 +1228,6 @@ class SameGameGUI:
 
                 self.log_message(f"Move {move_count}: Removed {len(move)} blocks at {move[0]} → +{gain} points")
 
-                apply_gravity(grid_to_analyze)
-
                 self.root.after(0, lambda g=grid_to_analyze: self.draw_analysis_board(g))
 
                 time.sleep(self.speed_var.get())
@@ -925,12 +1244,23 @@ class SameGameGUI:
             if difficulty == 2:  # DC + DP Strategy
                 regions = divide_board_regions(grid_to_analyze)
                 self.log_message(f"Regions Analyzed: {len(regions)}")
-                self.log_message(f"DP States Stored: {len(dp_memo)}")
+                self.log_message(f"Independent splits solved: {search_stats['splits']}")
+                self.log_message(f"Endgames solved exactly: {search_stats['endgames']}")
+                self.log_message(f"DP States Stored: {len(dp_memo)} / {dp_memo.capacity}")
+                self.log_message(f"TT Hits: {dp_memo.hits}, Misses: {dp_memo.misses}, Evictions: {dp_memo.evictions}")
             elif difficulty == 3:  # Exhaustive with Memo
-                self.log_message(f"Backtracking Cache Size: {len(backtrack_memo_cache)}")
+                self.log_message(f"Backtracking Cache Size: {len(backtrack_memo_cache)} / {backtrack_memo_cache.capacity}")
+                self.log_message(f"TT Hits: {backtrack_memo_cache.hits}, Misses: {backtrack_memo_cache.misses}, "
+                                 f"Evictions: {backtrack_memo_cache.evictions}")
             elif difficulty == 4:  # Pure Backtracking
                 self.log_message(f"Note: Pure backtracking uses no cache")
+                self.log_message(f"Commuting moves skipped / bound cutoffs: {search_stats['pruned_branches']}")
+                for line in format_reports(worker_reports.values()):
+                    self.log_message(line)
                 self.log_message(f"Performance may be significantly slower on larger boards")
+            elif difficulty == 5:  # Beam Search
+                depth = BEAM_DEPTH if BEAM_DEPTH is not None else "end of game"
+                self.log_message(f"Beam Width: {BEAM_WIDTH}, Depth: {depth}")
 
             self.root.after(0, lambda: self.status_label.config(text="Status: Complete"))
 
@@ -1053,6 +1383,10 @@ class SameGameGUI:
         thread.start()
 
     def _compare_algorithms_thread(self, output_text, progress_label):
+        # The timings measure search: the memos are swapped for
+        # in-memory tables that never answer from the disk cache
+        saved_memos = (_swap_memo('dp', solve_table(SCORE, TT_ENTRIES, persistent=False)),
+                       _swap_memo('memo', solve_table(SCORE, TT_ENTRIES, persistent=False)))
         try:
             grid_to_analyze = self.original_grid.copy()
 
@@ -1067,7 +1401,10 @@ class SameGameGUI:
                 (1, "GREEDY STRATEGY", greedy_strategy),
                 (2, "DC + DP OPTIMAL STRATEGY", optimal_strategy),
                 (3, "EXHAUSTIVE (Backtracking + Memo)", exhaustive_strategy),
-                (4, "EXHAUSTIVE (Pure Backtracking)", exhaustive_strategy_pure)
+                (4, "EXHAUSTIVE (Pure Backtracking)", exhaustive_strategy_pure),
+                (5, f"BEAM SEARCH (Width {BEAM_WIDTH})", beam_strategy),
+                (6, f"NESTED MONTE CARLO (Level {NMCS_LEVEL})", nested_monte_carlo_strategy),
+                (7, f"NRPA (Level {NRPA_LEVEL}, learned policy)", nrpa_strategy)
             ]
 
             for diff, name, algo_func in algorithms:
@@ -1076,33 +1413,41 @@ class SameGameGUI:
 
                 # Clear caches and reset statistics before each algorithm
                 global dp_memo, backtrack_memo_cache, search_stats
-                dp_memo.clear()
-                backtrack_memo_cache.clear()
+                for table in (dp_memo, dp_bound_memo, backtrack_memo_cache, backtrack_bound_cache):
+                    table.clear()
+                    table.reset_stats()
                 reset_search_stats()
                 
                 # Safer copy for comparison mode
-                sim = GridADT.__new__(GridADT)
-                sim.rows = grid_to_analyze.rows
-                sim.cols = grid_to_analyze.cols
-                sim.board = [row[:] for row in grid_to_analyze.board]
+                sim = grid_to_analyze.copy()
+                index = component_index(sim)
                 
                 score = 0
                 move_count = 0
 
                 start = time.time()
 
-                while not is_game_over(sim):
-                    move_count += 1
-                    move = algo_func(sim)
+                if diff in [6, 7]:
+                    # NMCS and NRPA plan the whole game in one search
+                    _, sequence = algo_func(sim)
+                    for move in sequence:
+                        move_count += 1
+                        score += len(move) ** 2
+                        index.play(move)
+                else:
+                    while not is_game_over(sim):
+                        move_count += 1
+                        if diff == 1:
+                            move = algo_func(sim, index)
+                        else:
+                            move = algo_func(sim)
 
-                    if move is None:
-                        break
+                        if move is None:
+                            break
 
-                    score += len(move) ** 2
+                        score += len(move) ** 2
 
-                    for r, c in move:
-                        sim.board[r][c] = None
-                    apply_gravity(sim)
+                        index.play(move)
 
                 elapsed = time.time() - start
                 
@@ -1111,15 +1456,35 @@ class SameGameGUI:
                     cache_size = len(dp_memo)
                     regions = divide_board_regions(grid_to_analyze)
                     region_info = f", Regions: {len(regions)}"
-                    search_info = f", Nodes: {search_stats['nodes_visited']}, Pruned: {search_stats['pruned_branches']}"
+                    search_info = (f", Nodes: {search_stats['nodes_visited']}, Pruned: {search_stats['pruned_branches']}"
+                                   f", Memo hits: {search_stats['memo_hits']}, Splits: {search_stats['splits']}"
+                                   f", Endgames: {search_stats['endgames']}"
+                                   f", TT misses: {dp_memo.misses}, Evictions: {dp_memo.evictions}")
                 elif diff == 3:
                     cache_size = len(backtrack_memo_cache)
                     region_info = ""
-                    search_info = f", Nodes: {search_stats['nodes_visited']}, Pruned: {search_stats['pruned_branches']}"
+                    search_info = (f", Nodes: {search_stats['nodes_visited']}, Pruned: {search_stats['pruned_branches']}"
+                                   f", Memo hits: {search_stats['memo_hits']}"
+                                   f", TT misses: {backtrack_memo_cache.misses}, Evictions: {backtrack_memo_cache.evictions}")
                 elif diff == 4:
                     cache_size = 0
                     region_info = " (No cache)"
-                    search_info = f", Nodes: {search_stats['nodes_visited']}, Pruned: 0"
+                    search_info = (f", Nodes: {search_stats['nodes_visited']}"
+                                   f", Commuting moves skipped / bound cutoffs: {search_stats['pruned_branches']}")
+                elif diff == 5:
+                    cache_size = 0
+                    region_info = " (No cache)"
+                    search_info = f", Width: {BEAM_WIDTH}, Depth: {BEAM_DEPTH or 'full game'}"
+                elif diff == 6:
+                    cache_size = 0
+                    region_info = " (No cache)"
+                    search_info = (f", Playouts: {search_stats['nodes_visited']}"
+                                   f", Time limit: {NMCS_TIME_LIMIT:.0f}s")
+                elif diff == 7:
+                    cache_size = len(warm_policy(self.rows, self.cols))
+                    region_info = " (policy weights)"
+                    search_info = (f", Playouts: {search_stats['nodes_visited']}"
+                                   f", Time limit: {NRPA_TIME_LIMIT:.0f}s")
                 else:
                     cache_size = 0
                     region_info = ""
@@ -1130,11 +1495,14 @@ class SameGameGUI:
                 self.root.after(0, lambda s=score: output_text.insert(tk.END, f"  ✓ Score: {s}\n"))
                 self.root.after(0, lambda m=move_count: output_text.insert(tk.END, f"  ✓ Moves: {m}\n"))
                 self.root.after(0, lambda e=elapsed: output_text.insert(tk.END, f"  ✓ Time: {e:.2f}s\n"))
-                if diff in [2, 3, 4]:
+                if diff in [2, 3, 4, 5, 6, 7]:
                     self.root.after(0, lambda c=cache_size, r=region_info, s=search_info: 
                                    output_text.insert(tk.END, f"  ✓ Cache Size: {c}{r}{s}\n"))
                 if diff in [2, 3]:
                     self.root.after(0, lambda: output_text.insert(tk.END, f"  ✓ Max Depth: {search_stats['max_depth']}\n"))
+                if diff == 4:
+                    for line in format_reports(worker_reports.values()):
+                        self.root.after(0, lambda l=line: output_text.insert(tk.END, f"  ✓ {l}\n"))
                 self.root.after(0, lambda: output_text.see(tk.END))
 
             self.root.after(0, lambda: output_text.insert(tk.END, "\n" + "="*90 + "\n"))
@@ -1170,6 +1538,9 @@ class SameGameGUI:
             self.root.after(0, lambda: output_text.insert(tk.END, "• DP + Memoization: Significant pruning through caching\n"))
             self.root.after(0, lambda: output_text.insert(tk.END, "• Backtracking + Memo: Reuses computed results\n"))
             self.root.after(0, lambda: output_text.insert(tk.END, "• Pure Backtracking: Explores entire search space\n"))
+            self.root.after(0, lambda: output_text.insert(tk.END, "• Beam Search: Keeps the best positions per depth, cost linear in width\n"))
+            self.root.after(0, lambda: output_text.insert(tk.END, "• Nested Monte Carlo: Best sequence found in the time limit (anytime)\n"))
+            self.root.after(0, lambda: output_text.insert(tk.END, "• NRPA: Learns a move policy, warm-started per board size\n"))
             self.root.after(0, lambda: output_text.insert(tk.END, "="*90 + "\n"))
 
             self.root.after(0, lambda: progress_label.config(text="Comparison complete!"))
@@ -1177,6 +1548,8 @@ class SameGameGUI:
         except Exception as e:
             self.root.after(0, lambda: output_text.insert(tk.END, f"\n❌ Error: {str(e)}\n"))
         finally:
+            _swap_memo('dp', saved_memos[0])
+            _swap_memo('memo', saved_memos[1])
             self.algorithm_running = False
 
     # ================= SETTINGS =================
@@ -1208,6 +1581,38 @@ class SameGameGUI:
                           command=lambda r=r, c=c: self.set_board_size(r, c))
             btn.pack(pady=5)
 
+        backend_frame = tk.Frame(center_frame, bg=BG_COLOR)
+        backend_frame.pack(pady=15)
+
+        tk.Label(backend_frame, text="Board Backend:",
+                font=('Arial', 12),
+                fg='white', bg=BG_COLOR).pack(side='left', padx=5)
+
+        for backend, label in [('list', "2D List"), ('columns', "Columns"), ('bitboard', "Bitboard")]:
+            is_current = (BOARD_BACKEND == backend)
+            tk.Button(backend_frame, text=label,
+                     font=('Arial', 11, 'bold'),
+                     bg=ACCENT_COLOR if is_current else BUTTON_COLOR,
+                     fg='black' if is_current else 'white',
+                     width=10, bd=0, cursor='hand2',
+                     command=lambda b=backend: self.set_board_backend(b)).pack(side='left', padx=5)
+
+        bound_frame = tk.Frame(center_frame, bg=BG_COLOR)
+        bound_frame.pack(pady=5)
+
+        tk.Label(bound_frame, text="Branch & Bound:",
+                font=('Arial', 12),
+                fg='white', bg=BG_COLOR).pack(side='left', padx=5)
+
+        for enabled, label in [(True, "On"), (False, "Off")]:
+            is_current = (BRANCH_AND_BOUND == enabled)
+            tk.Button(bound_frame, text=label,
+                     font=('Arial', 11, 'bold'),
+                     bg=ACCENT_COLOR if is_current else BUTTON_COLOR,
+                     fg='black' if is_current else 'white',
+                     width=10, bd=0, cursor='hand2',
+                     command=lambda e=enabled: self.set_branch_and_bound(e)).pack(side='left', padx=5)
+
         tk.Button(center_frame, text="← Back to Menu",
                  font=('Arial', 14),
                  bg='#64748b', fg='white',
@@ -1221,6 +1626,16 @@ class SameGameGUI:
         self.cell_size = min(60, 500 // max(rows, cols))
         self.show_menu()
 
+    def set_board_backend(self, backend):
+        global BOARD_BACKEND
+        BOARD_BACKEND = backend
+        self.show_settings()
+
+    def set_branch_and_bound(self, enabled):
+        global BRANCH_AND_BOUND
+        BRANCH_AND_BOUND = enabled
+        self.show_settings()
+
     # ================= INSTRUCTIONS =================
     def show_instructions(self):
         self.clear_screen()
@@ -1285,7 +1700,7 @@ class SameGameGUI:
     # ================= START GAME =================
     def start_game(self, mode):
         self.game_mode = mode
-        self.grid = GridADT(self.rows, self.cols)
+        self.grid = new_grid(self.rows, self.cols)
         self.original_grid = self.grid.copy()
         self.score = 0
         self.cpu_score = 0
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import messagebox
-import random
+
+from samegame import GridADT
+from samegame.engine import get_component, get_all_components, apply_gravity, is_game_over
 
 # ==========================================================
 # SAME GAME - GUI VERSION WITH ADT & DSA
@@ -14,24 +16,6 @@ COLOR_MAP = {
     'Y': '#eab308',  # Yellow
 }
 
-# ==========================================================
-# GRID ADT
-# ==========================================================
-class GridADT:
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = [[random.choice(COLORS) for _ in range(cols)]
-                      for _ in range(rows)]
-
-# ==========================================================
-# GRAPH ADT
-# ==========================================================
-class GraphADT:
-    @staticmethod
-    def neighbors(r, c):
-        return [(r+1, c), (r-1, c), (r, c+1), (r, c-1)]
-
 # ==========================================================
 # SAME GAME GUI
 # ==========================================================
@@ -179,7 +163,7 @@ class SameGameGUI:
     # ================= START GAME =================
     def start_game(self, mode):
         self.game_mode = mode
-        self.grid = GridADT(self.rows, self.cols)
+        self.grid = GridADT(self.rows, self.cols, colors=COLORS)
         self.score = 0
         self.cpu_score = 0
         self.game_over = False
@@ -268,36 +252,12 @@ class SameGameGUI:
                         width=1
                     )
     
-    # ================= DFS =================
-    def dfs(self, r, c, color, visited, component):
-        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
-            return
-        if (r, c) in visited:
-            return
-        if self.grid.board[r][c] != color:
-            return
-        
-        visited.add((r, c))
-        component.append((r, c))
-        
-        for nr, nc in GraphADT.neighbors(r, c):
-            self.dfs(nr, nc, color, visited, component)
-    
-    def get_component(self, r, c):
-        if not self.grid.board[r][c]:
-            return []
-        
-        visited = set()
-        comp = []
-        self.dfs(r, c, self.grid.board[r][c], visited, comp)
-        return comp
-    
     # ================= HANDLE CLICK =================
     def handle_click(self, r, c):
         if self.is_animating or self.game_over:
             return
         
-        comp = self.get_component(r, c)
+        comp = get_component(self.grid, r, c)
         
         if len(comp) < 2:
             self.info_label.config(text="❌ Invalid move! Need 2+ blocks")
@@ -325,17 +285,8 @@ class SameGameGUI:
     
     # ================= GRAVITY =================
     def apply_gravity(self):
-        # Apply gravity using stack (same as base code)
-        for c in range(self.cols):
-            stack = []
-            for r in range(self.rows):
-                if self.grid.board[r][c]:
-                    stack.append(self.grid.board[r][c])
-            
-            for r in range(self.rows - 1, -1, -1):
-                self.grid.board[r][c] = stack.pop() if stack else None
-        
-        self.shift_left()
+        # Vertical drop + column shift (shared engine)
+        apply_gravity(self.grid)
         self.draw_board()
         self.is_animating = False
         self.info_label.config(text="")
@@ -346,21 +297,6 @@ class SameGameGUI:
         else:
             self.check_game_over()
     
-    # ================= SHIFT LEFT =================
-    def shift_left(self):
-        # Remove empty columns
-        columns = [[self.grid.board[r][c] for r in range(self.rows)]
-                   for c in range(self.cols)]
-        
-        columns = [col for col in columns if any(cell is not None for cell in col)]
-        
-        while len(columns) < self.cols:
-            columns.append([None] * self.rows)
-        
-        for c in range(self.cols):
-            for r in range(self.rows):
-                self.grid.board[r][c] = columns[c][r]
-    
     # ================= CPU TURN =================
     def cpu_turn(self):
         if self.game_over:
@@ -370,16 +306,7 @@ class SameGameGUI:
         self.info_label.config(text="🤖 CPU is thinking...")
         
         # Find all valid components
-        components = []
-        visited_global = set()
-        
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.grid.board[r][c] and (r, c) not in visited_global:
-                    comp = self.get_component(r, c)
-                    if len(comp) > 1:
-                        components.append(comp)
-                        visited_global.update(comp)
+        components = get_all_components(self.grid)
         
         if not components:
             self.check_game_over()
@@ -401,16 +328,7 @@ class SameGameGUI:
     
     def cpu_gravity(self):
         # Apply gravity for CPU
-        for c in range(self.cols):
-            stack = []
-            for r in range(self.rows):
-                if self.grid.board[r][c]:
-                    stack.append(self.grid.board[r][c])
-            
-            for r in range(self.rows - 1, -1, -1):
-                self.grid.board[r][c] = stack.pop() if stack else None
-        
-        self.shift_left()
+        apply_gravity(self.grid)
         self.draw_board()
         self.is_animating = False
         self.info_label.config(text="")
@@ -420,10 +338,8 @@ class SameGameGUI:
     # ================= GAME OVER =================
     def check_game_over(self):
         # Check if any valid moves remain
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.grid.board[r][c] and len(self.get_component(r, c)) > 1:
-                    return
+        if not is_game_over(self.grid):
+            return
         
         self.game_over = True
         self.show_game_over()
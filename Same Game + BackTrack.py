@@ -11,7 +11,14 @@
 # 7. Backtracking    -> Optimal Move Search
 # ==========================================================
 
-import random
+from samegame import GridADT
+from samegame.engine import (get_component, get_all_components, remove_component,
+                             apply_gravity, is_game_over, is_board_empty)
+from samegame.moves import apply_move, undo_move
+from samegame.negamax import negamax
+from samegame.parallel import root_map, child_boards
+from samegame.ponder import Ponderer, StoppableTable
+from samegame.ttable import TranspositionTable
 
 # -------------------------------
 # GLOBAL GAME VARIABLES
@@ -19,186 +26,15 @@ import random
 ROWS = 6
 COLS = 6
 COLORS = ['R', 'G', 'B', 'Y']
+PARALLEL_ROOT = False    # Backtracking: search the root moves in a process pool
+PARALLEL_WORKERS = None  # Pool size (None = one worker per CPU core)
+PONDER = False           # Multiplayer: search the human's likely replies during their turn
 
 # ==========================================================
-# GRID ADT
+# GRID ADT + ENGINE (shared samegame package)
 # ==========================================================
-class GridADT:
-    """Abstract Data Type for Game Board"""
-
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = self.create_board()
-
-    def create_board(self):
-        return [[random.choice(COLORS) for _ in range(self.cols)]
-                for _ in range(self.rows)]
-
-    def display(self):
-        print("\nBoard:")
-        print("   ", end="")
-        for c in range(self.cols):
-            print(c, end=" ")
-        print()
-
-        for r in range(self.rows):
-            print(r, " ", end="")
-            for c in range(self.cols):
-                # FIXED: Explicit None check instead of truthiness
-                print(self.board[r][c] if self.board[r][c] is not None else '.', end=" ")
-            print()
-        print()
-
-# ==========================================================
-# GRAPH ADT (IMPLICIT GRID GRAPH)
-# ==========================================================
-class GraphADT:
-    @staticmethod
-    def neighbors(r, c):
-        # Cleaner order: up, down, left, right
-        return [(r-1, c), (r+1, c), (r, c-1), (r, c+1)]
-
-# ==========================================================
-# ITERATIVE DFS (STACK-BASED)
-# ==========================================================
-def dfs(grid, r, c, color, visited, component):
-    """Iterative DFS using stack ADT - no recursion, safe for large boards"""
-    stack = [(r, c)]
-
-    while stack:
-        cr, cc = stack.pop()
-
-        # Check bounds first (more efficient)
-        if cr < 0 or cr >= grid.rows or cc < 0 or cc >= grid.cols:
-            continue
-
-        if (cr, cc) in visited:
-            continue
-
-        if grid.board[cr][cc] != color:
-            continue
-
-        visited.add((cr, cc))
-        component.append((cr, cc))
-
-        for nr, nc in GraphADT.neighbors(cr, cc):
-            stack.append((nr, nc))
-
-# ==========================================================
-# GET COMPONENT - With boundary safety
-# ==========================================================
-def get_component(grid, r, c):
-    """Get connected component with full boundary safety"""
-    if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
-        return []
-
-    if grid.board[r][c] is None:
-        return []
-
-    visited = set()
-    component = []
-    dfs(grid, r, c, grid.board[r][c], visited, component)
-    return component
-
-# ==========================================================
-# GET COMPONENT - WITH BOUNDARY SAFETY (Alias for compatibility)
-# ==========================================================
-def get_component_safe(grid, r, c):
-    """Alias for get_component (both are now safe)"""
-    return get_component(grid, r, c)
-
-# ==========================================================
-# GET ALL COMPONENTS
-# ==========================================================
-def get_all_components(grid):
-    """Returns list of all valid components (size > 1) on the board"""
-    visited = set()
-    components = []
-    
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if grid.board[r][c] is not None and (r, c) not in visited:
-                comp = []
-                dfs(grid, r, c, grid.board[r][c], visited, comp)
-                if len(comp) > 1:
-                    components.append(comp)
-    
-    return components
-
-# ==========================================================
-# REMOVE COMPONENT
-# ==========================================================
-def remove_component(grid, component):
-    for r, c in component:
-        grid.board[r][c] = None
-
-# ==========================================================
-# GRAVITY USING STACK ADT
-# ==========================================================
-def apply_gravity(grid):
-    # Vertical Shift
-    for c in range(grid.cols):
-        stack = []
-
-        # Use explicit None check
-        for r in range(grid.rows):
-            if grid.board[r][c] is not None:
-                stack.append(grid.board[r][c])
-
-        for r in range(grid.rows - 1, -1, -1):
-            grid.board[r][c] = stack.pop() if stack else None
-    
-    # Horizontal Shift 
-    write_col = 0
-    for read_col in range(grid.cols):
-        column_has_block = any(
-            grid.board[r][read_col] is not None
-            for r in range(grid.rows)
-        )
-
-        if column_has_block:
-            if write_col != read_col:
-                for r in range(grid.rows):
-                    grid.board[r][write_col] = grid.board[r][read_col]
-                    grid.board[r][read_col] = None
-            write_col += 1
-
-# ==========================================================
-# GAME OVER CHECK - FIXED: Explicit None check
-# ==========================================================
-def is_game_over(grid):
-    """Check if game is over by finding if any valid component exists"""
-    visited = set()
-
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            # FIXED: Use explicit None check instead of truthiness
-            if grid.board[r][c] is not None and (r, c) not in visited:
-                comp = []
-                dfs(grid, r, c, grid.board[r][c], visited, comp)
-                if len(comp) > 1:
-                    return False
-    
-    return True
-
-# ==========================================================
-# HELPER FUNCTION: DUPLICATE COPY OF THE GRID (Optimized)
-# ==========================================================
-def copy_grid(grid):
-    """Optimized copy that avoids unnecessary random board generation"""
-    new_grid = GridADT.__new__(GridADT)
-    new_grid.rows = grid.rows
-    new_grid.cols = grid.cols
-    new_grid.board = [row[:] for row in grid.board]
-    return new_grid
-
-# ==========================================================
-# CHECK IF BOARD IS COMPLETELY EMPTY
-# ==========================================================
-def is_board_empty(grid):
-    """Check if every cell is None - using generator expression"""
-    return all(cell is None for row in grid.board for cell in row)
+# GridADT, iterative DFS components, gravity, copying and the
+# game-over/empty checks all come from samegame.engine.
 
 # ==========================================================
 # MERGE SORT FOR CPU MOVE SELECTION
@@ -253,15 +89,14 @@ def backtrack_max_score(grid, current_score):
     # Try every possible move
     for comp in components:
         # Simulate the move
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
         
         # Calculate score for this move
         gain = len(comp) ** 2
         
         # Recursively explore future moves
-        score = backtrack_max_score(sim, current_score + gain)
+        score = backtrack_max_score(grid, current_score + gain)
+        undo_move(grid, undo)
         
         # Track best score
         if score > best_score:
@@ -269,6 +104,10 @@ def backtrack_max_score(grid, current_score):
     
     return best_score
 
+def _backtracking_root_task(board):
+    """Pool worker: best future score of the board after one root move"""
+    return backtrack_max_score(board, 0)
+
 # ==========================================================
 # BACKTRACKING BEST MOVE
 # ==========================================================
@@ -284,19 +123,27 @@ def backtracking_best_move(grid):
     
     best_score = -1
     best_component = None
+
+    futures = None
+    if PARALLEL_ROOT and len(components) > 1:
+        # Root moves searched in the process pool (exact, same order)
+        futures = root_map(_backtracking_root_task, child_boards(grid, components),
+                           PARALLEL_WORKERS)
     
     # Evaluate each possible first move
-    for comp in components:
-        # Simulate this move
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
-        
+    for i, comp in enumerate(components):
         # Calculate immediate gain
         gain = len(comp) ** 2
-        
-        # Use backtracking to find final score from this state
-        final_score = backtrack_max_score(sim, gain)
+
+        if futures is None:
+            # Simulate this move
+            undo = apply_move(grid, comp)
+
+            # Use backtracking to find final score from this state
+            final_score = backtrack_max_score(grid, gain)
+            undo_move(grid, undo)
+        else:
+            final_score = gain + futures[i]
         
         # Track best move
         if final_score > best_score:
@@ -326,72 +173,36 @@ def get_backtracking_hint(grid):
 # ==========================================================
 # DP SCORE DIFFERENCE - Turn-aware optimal evaluation
 # ==========================================================
-def dp_score_difference(grid, memo, is_cpu_turn):
+# One table for the CPU and hint searches: entries are keyed on
+# the board alone, so they stay valid for the whole session
+score_memo = TranspositionTable()
+
+def dp_score_difference(grid, memo):
     """
-    Returns maximum score DIFFERENCE (current player - opponent)
-    from this board state.
+    Returns maximum score DIFFERENCE (player to move - opponent)
+    from this board state. Negamax on the board alone, see
+    samegame.negamax.
     """
-    # Using map(tuple) for faster conversion
-    board_tuple = tuple(map(tuple, grid.board))
-    state = (board_tuple, is_cpu_turn)
-
-    if state in memo:
-        return memo[state]
-
-    components = get_all_components(grid)
-
-    if not components:
-        return 0
-
-    if is_cpu_turn:
-        best = float('-inf')
-        for comp in components:
-            sim = copy_grid(grid)
-            remove_component(sim, comp)
-            apply_gravity(sim)
-
-            gain = len(comp) ** 2
-            future = dp_score_difference(sim, memo, False)
-
-            best = max(best, gain - future)
-
-        memo[state] = best
-        return best
-
-    else:
-        worst = float('inf')
-        for comp in components:
-            sim = copy_grid(grid)
-            remove_component(sim, comp)
-            apply_gravity(sim)
-
-            gain = len(comp) ** 2
-            future = dp_score_difference(sim, memo, True)
-
-            worst = min(worst, future - gain)
-
-        memo[state] = worst
-        return worst
+    return negamax(grid, memo)
 
 # ==========================================================
 # HINT STRATEGY (Fast DP-based)
 # ==========================================================
 def get_optimal_hint(grid):
-    memo = {}
+    memo = score_memo
     components = get_all_components(grid)
 
     if not components:
         return None, 0
 
     best_component = None
-    best_total = -1
+    best_total = float('-inf')
 
     for comp in components:
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
 
-        future = -dp_score_difference(sim, memo, True)
+        future = -dp_score_difference(grid, memo)
+        undo_move(grid, undo)
         total = len(comp) ** 2 + future
 
         if total > best_total:
@@ -459,14 +270,13 @@ def conquer_region(grid, region_cols, memo):
     ]
 
     for comp in region_components:
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
 
         gain = len(comp) ** 2
 
         # Opponent turn next
-        future = dp_score_difference(sim, memo, False)
+        future = dp_score_difference(grid, memo)
+        undo_move(grid, undo)
 
         value = gain - future
 
@@ -500,19 +310,7 @@ def combine_results(results):
 # ==========================================================
 def cpu_best_move_greedy(grid):
     """Simple greedy CPU move using merge sort - avoids duplicate components"""
-    components = []
-    visited = set()
-
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            # FIXED: Use explicit None check instead of truthiness
-            if grid.board[r][c] is not None and (r, c) not in visited:
-                comp = []
-                dfs(grid, r, c, grid.board[r][c], visited, comp)
-                
-                if len(comp) > 1:
-                    score = len(comp) ** 2
-                    components.append((score, comp))
+    components = [(len(comp) ** 2, comp) for comp in get_all_components(grid)]
 
     if not components:
         return None
@@ -536,7 +334,7 @@ def cpu_best_move(grid):
     print("CPU TURN - HEURISTIC DIVIDE & CONQUER + DP")
     print("="*50)
 
-    memo = {}
+    memo = score_memo
 
     # -------- PHASE 1: DIVIDE --------
     print("\n🔹 PHASE 1: DIVIDE (Heuristic)")
@@ -579,6 +377,13 @@ def cpu_best_move(grid):
     print("="*50)
     return best_component
 
+# ==========================================================
+# PONDERING (search during the human's turn)
+# ==========================================================
+def ponder_position(board, stop):
+    """Search a position a human reply leads to (CPU to move) into score_memo"""
+    negamax(board, StoppableTable(score_memo, stop))
+
 # ==========================================================
 # INSTRUCTIONS
 # ==========================================================
@@ -671,6 +476,9 @@ def multiplayer():
     select_board_size()
     grid = GridADT(ROWS, COLS)
     human = cpu = 0
+    ponderer = Ponderer(ponder_position)
+    if PONDER:
+        ponderer.start(grid)
     print_instructions()
 
     while not is_game_over(grid):
@@ -680,6 +488,8 @@ def multiplayer():
         # HUMAN HINT OPTION
         choice = input("Do you want a hint? (y/n): ").lower()
         if choice == 'y':
+            # The hints search score_memo: the ponder thread must be done
+            ponderer.stop()
             print("\nChoose hint type:")
             print("1. Fast hint (DP-based) - works for all board sizes")
             print("2. Optimal hint (Backtracking) - best for small boards (≤ 8x8)")
@@ -701,6 +511,9 @@ def multiplayer():
                 print(f"\n[{hint_name} Hint] Optimal Move → Row {hint_cell[0]}, Column {hint_cell[1]}")
                 print(f"Immediate Score: {hint_score}")
                 print("Following hints maximizes your score.\n")
+            if PONDER:
+                # Back to the human's replies while they choose a move
+                ponderer.start(grid)
 
         # -------- HUMAN MOVE --------
         try:
@@ -728,6 +541,9 @@ def multiplayer():
             break
 
         # -------- CPU MOVE --------
+        pondered, ponder_time = ponderer.stop()
+        if ponder_time:
+            print(f"CPU pondered {pondered} of your replies in {ponder_time:.2f}s")
         cpu_comp = cpu_best_move(grid)
         if cpu_comp is not None:
             gain = len(cpu_comp) ** 2
@@ -735,10 +551,14 @@ def multiplayer():
             remove_component(grid, cpu_comp)
             apply_gravity(grid)
             print(f"CPU removed {len(cpu_comp)} blocks for {gain} points!\n")
+            if PONDER and not is_game_over(grid):
+                # Think about the human's replies while they choose one
+                ponderer.start(grid)
         else:
             print("CPU has no valid moves!\n")
             break
 
+    ponderer.stop()
     print("GAME OVER")
     print("Human:", human, "| CPU:", cpu)
     if human > cpu:
@@ -11,11 +11,26 @@
 #    - Greedy (Merge Sort based)
 #    - Divide & Conquer + Dynamic Programming
 #    - Backtracking + Memoization
+#    - Monte Carlo Tree Search (large boards)
+#    - Beam Search (tunable width / depth)
 # ==========================================================
 
 import random
 import time
 
+from samegame import BACKENDS, create_grid
+from samegame.engine import (get_component, get_all_components, remove_component,
+                             apply_gravity, is_game_over, copy_grid)
+from samegame.bench import move_engine_speedup
+from samegame.hashing import state_key
+from samegame.beam import beam_search
+from samegame.mcts import MCTS
+from samegame.moves import apply_move, undo_move
+from samegame.negamax import negamax
+from samegame.parallel import root_map, child_boards
+from samegame.ponder import Ponderer, StoppableTable
+from samegame.diskcache import solve_table, SCORE, DIFFERENCE
+
 # -------------------------------
 # GLOBAL GAME VARIABLES
 # -------------------------------
@@ -23,161 +38,25 @@ ROWS = 6
 COLS = 6
 COLORS = ['R', 'G', 'B', 'Y']
 STRATEGY_MODE = "dc_dp"  # Default strategy
+BOARD_BACKEND = "bitboard"  # "bitboard" (per-color masks), "columns" (column lists) or "list" (2D list)
+MCTS_TIME_LIMIT = 1.0    # Seconds of MCTS thinking per CPU move
+MCTS_PARALLEL = "none"   # MCTS over the process pool: "none", "root" (trees) or "leaf" (rollouts)
+BEAM_WIDTH = 10          # Beam search: positions kept per depth
+BEAM_DEPTH = None        # Beam search: moves looked ahead (None = to game end)
+PERSISTENT_CACHE = False # Keep exact solver results on disk across sessions (opt-in)
+PARALLEL_ROOT = False    # Backtracking: search the root moves in a process pool
+PARALLEL_WORKERS = None  # Pool size (None = one worker per CPU core)
+PONDER = False           # Multiplayer: search the human's likely replies during their turn
 
 # ==========================================================
-# GRID ADT
-# ==========================================================
-class GridADT:
-    """Abstract Data Type for Game Board"""
-
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = self.create_board()
-
-    def create_board(self):
-        return [[random.choice(COLORS) for _ in range(self.cols)]
-                for _ in range(self.rows)]
-
-    def display(self):
-        print("\nBoard:")
-        print("   ", end="")
-        for c in range(self.cols):
-            print(c, end=" ")
-        print()
-
-        for r in range(self.rows):
-            print(r, " ", end="")
-            for c in range(self.cols):
-                print(self.board[r][c] if self.board[r][c] is not None else '.', end=" ")
-            print()
-        print()
-
-# ==========================================================
-# GRAPH ADT (IMPLICIT GRID GRAPH)
-# ==========================================================
-class GraphADT:
-    @staticmethod
-    def neighbors(r, c):
-        return [(r+1, c), (r-1, c), (r, c+1), (r, c-1)]
-
-# ==========================================================
-# DFS (CONNECTED COMPONENT) - Renamed from BFS
-# ==========================================================
-def dfs(grid, r, c, color, visited, component):
-    """DFS to find connected component"""
-    if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
-        return
-    if (r, c) in visited:
-        return
-    if grid.board[r][c] != color:
-        return
-
-    visited.add((r, c))
-    component.append((r, c))
-
-    for nr, nc in GraphADT.neighbors(r, c):
-        dfs(grid, nr, nc, color, visited, component)
-
-# ==========================================================
-# GET COMPONENT - WITH BOUNDARY SAFETY - S SRIJITH CSE24044
+# GRID ADT + ENGINE (shared samegame package)
 # ==========================================================
-def get_component(grid, r, c):
-    """
-    Get connected component at position (r,c) with boundary safety.
-    """
-    # Boundary safety check
-    if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
-        return []
-    
-    # Empty cell check
-    if grid.board[r][c] is None:
-        return []
-
-    visited = set()
-    component = []
-    dfs(grid, r, c, grid.board[r][c], visited, component)
-    return component
-
-# ==========================================================
-# GET ALL COMPONENTS - Added missing function
-# ==========================================================
-def get_all_components(grid):
-    """
-    Returns list of all connected components (size > 1) on the board
-    """
-    visited = set()
-    components = []
-
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if (r, c) in visited:
-                continue
-            if grid.board[r][c] is None:
-                continue
-
-            comp = []
-            dfs(grid, r, c, grid.board[r][c], visited, comp)
-
-            if len(comp) > 1:  # Only keep removable components
-                components.append(comp)
-
-    return components
-
-# ==========================================================
-# REMOVE COMPONENT
-# ==========================================================
-def remove_component(grid, component):
-    for r, c in component:
-        grid.board[r][c] = None
-
-# ==========================================================
-# GRAVITY USING STACK ADT - Fixed with grid.rows/grid.cols
-# ==========================================================
-def apply_gravity(grid):
-    # Vertical Shift
-    for c in range(grid.cols):
-        stack = []
-
-        for r in range(grid.rows):
-            if grid.board[r][c] is not None:
-                stack.append(grid.board[r][c])
-
-        for r in range(grid.rows-1, -1, -1):
-            grid.board[r][c] = stack.pop() if stack else None
-
-    # Horizontal Shift 
-    write_col = 0
-    for read_col in range(grid.cols):
-        column_has_block = any(
-            grid.board[r][read_col] is not None
-            for r in range(grid.rows)
-        )
-        
-        if column_has_block:
-            if write_col != read_col:
-                for r in range(grid.rows):
-                    grid.board[r][write_col] = grid.board[r][read_col]
-                    grid.board[r][read_col] = None
-            write_col += 1
-
-# ==========================================================
-# GAME OVER CHECK - Fixed with get_all_components
-# ==========================================================
-def is_game_over(grid):
-    components = get_all_components(grid)
-    return len(components) == 0
-
-# ==========================================================
-# HELPER FUNCTION: DUPLICATE COPY OF THE GRID - Fixed
-# ==========================================================
-def copy_grid(grid):
-    """Create a deep copy of the grid"""
-    new_grid = GridADT.__new__(GridADT)
-    new_grid.rows = grid.rows
-    new_grid.cols = grid.cols
-    new_grid.board = [row[:] for row in grid.board]
-    return new_grid
+# GridADT, DFS components, gravity and copying come from
+# samegame.engine, so every strategy below runs on whichever
+# backend BOARD_BACKEND selects.
+def new_grid(rows, cols):
+    """Create a board using the selected BOARD_BACKEND"""
+    return create_grid(rows, cols, BOARD_BACKEND, COLORS)
 
 # ==========================================================
 # STRATEGY 1: GREEDY (Optimized with visited set)
@@ -190,22 +69,7 @@ def greedy_best_move(grid):
     - Sort by score (size^2) in descending order
     - Pick the largest component
     """
-    visited = set()
-    components = []
-
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if (r, c) in visited:
-                continue
-            if grid.board[r][c] is None:
-                continue
-
-            comp = []
-            dfs(grid, r, c, grid.board[r][c], visited, comp)
-
-            if len(comp) > 1:
-                score = len(comp) ** 2
-                components.append((score, comp))
+    components = [(len(comp) ** 2, comp) for comp in get_all_components(grid)]
 
     if not components:
         return None
@@ -225,50 +89,17 @@ def greedy_best_move(grid):
 # DP SCORE DIFFERENCE - Turn-aware optimal evaluation
 # CSE24058 VIDHYADHARAN RP
 # ==========================================================
-def dp_score_difference(grid, memo, is_cpu_turn):
+# One table for the CPU and hint searches: entries are keyed on
+# the board alone, so they stay valid for the whole session
+score_memo = solve_table(DIFFERENCE, persistent=PERSISTENT_CACHE)
+
+def dp_score_difference(grid, memo):
     """
-    Returns maximum score DIFFERENCE (current player - opponent)
-    from this board state.
+    Returns maximum score DIFFERENCE (player to move - opponent)
+    from this board state. Negamax on the board alone, see
+    samegame.negamax.
     """
-    state = (tuple(tuple(row) for row in grid.board), is_cpu_turn)
-
-    if state in memo:
-        return memo[state]
-
-    components = get_all_components(grid)
-
-    if not components:
-        return 0
-
-    if is_cpu_turn:
-        best = float('-inf')
-        for comp in components:
-            sim = copy_grid(grid)
-            remove_component(sim, comp)
-            apply_gravity(sim)
-
-            gain = len(comp) ** 2
-            future = dp_score_difference(sim, memo, False)
-
-            best = max(best, gain - future)
-
-        memo[state] = best
-        return best
-
-    else:
-        worst = float('inf')
-        for comp in components:
-            sim = copy_grid(grid)
-            remove_component(sim, comp)
-            apply_gravity(sim)
-
-            gain = len(comp) ** 2
-            future = dp_score_difference(sim, memo, True)
-
-            worst = min(worst, future - gain)
-
-        memo[state] = worst
-        return worst
+    return negamax(grid, memo)
 
 # ==========================================================
 # DIVIDE BOARD REGIONS
@@ -321,12 +152,11 @@ def conquer_region(grid, region_cols, memo):
     ]
 
     for comp in region_components:
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
 
         gain = len(comp) ** 2
-        future = dp_score_difference(sim, memo, False)
+        future = dp_score_difference(grid, memo)
+        undo_move(grid, undo)
         value = gain - future
 
         if value > best_value:
@@ -367,7 +197,7 @@ def cpu_best_move_dc_dp(grid):
     print("CPU TURN - TRUE DIVIDE & CONQUER + DP")
     print("="*50)
     
-    memo = {}
+    memo = score_memo
     
     # -------- PHASE 1: DIVIDE --------
     print("\n🔹 PHASE 1: DIVIDE")
@@ -410,16 +240,20 @@ def cpu_best_move_dc_dp(grid):
 # BACKTRACKING SCORE
 # CSE24058 & 37 - [Vidhyadharan & Pravin]
 # ==========================================================
-backtrack_cache = {}
+backtrack_cache = solve_table(SCORE, persistent=PERSISTENT_CACHE)
 
-def backtracking_score(grid):
+def backtracking_score(grid, memo=None):
     """
     Recursive backtracking to find maximum possible score
+    (memo: table to use instead of backtrack_cache)
     """
-    state = tuple(tuple(row) for row in grid.board)
+    if memo is None:
+        memo = backtrack_cache
+    state = state_key(grid)
 
-    if state in backtrack_cache:
-        return backtrack_cache[state]
+    if state in memo:
+        return memo[state]
+    start = memo.probes
 
     components = get_all_components(grid)
 
@@ -429,19 +263,22 @@ def backtracking_score(grid):
     best = 0
 
     for comp in components:
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
 
         gain = len(comp) ** 2
-        future = backtracking_score(sim)
+        future = backtracking_score(grid, memo)
+        undo_move(grid, undo)
         total = gain + future
 
         best = max(best, total)
 
-    backtrack_cache[state] = best
+    memo.store(state, best, memo.probes - start)
     return best
 
+def _backtracking_root_task(board):
+    """Pool worker: backtracking_score of the board after one root move"""
+    return backtracking_score(board)
+
 # ==========================================================
 # BACKTRACKING BEST MOVE
 # CSE24059 & 44 - [Vijay Sathappan & Srijith]
@@ -454,7 +291,9 @@ def backtracking_best_move(grid):
     - Return move that leads to maximum total score
     """
     global backtrack_cache
-    backtrack_cache = {}
+    if not PONDER:
+        # Pondering keeps the table: it holds the replies searched
+        backtrack_cache = solve_table(SCORE, persistent=PERSISTENT_CACHE)
 
     components = get_all_components(grid)
     
@@ -467,14 +306,21 @@ def backtracking_best_move(grid):
     print("\n" + "="*50)
     print("BACKTRACKING + MEMOIZATION")
     print("="*50)
-    
-    for comp in components:
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
 
+    futures = None
+    if PARALLEL_ROOT and len(components) > 1:
+        # Root moves searched in the process pool (exact, same order)
+        futures = root_map(_backtracking_root_task, child_boards(grid, components),
+                           PARALLEL_WORKERS)
+    
+    for i, comp in enumerate(components):
         gain = len(comp) ** 2
-        future = backtracking_score(sim)
+        if futures is None:
+            undo = apply_move(grid, comp)
+            future = backtracking_score(grid)
+            undo_move(grid, undo)
+        else:
+            future = futures[i]
         total = gain + future
 
         print(f"Component at {comp[0]}: immediate={gain}, future={future:.2f}, total={total:.2f}")
@@ -489,26 +335,64 @@ def backtracking_best_move(grid):
     print("="*50)
     return best_component
 
+# ==========================================================
+# ======== STRATEGY 4: MONTE CARLO TREE SEARCH =============
+# ==========================================================
+def mcts_best_move(grid):
+    """
+    MCTS Strategy:
+    - UCT selection over the moves searched so far
+    - Greedy-biased random rollouts on a bitboard copy
+    - Fixed time budget (MCTS_TIME_LIMIT), so 15x10 and 20x5
+      boards get a move as fast as small ones
+    """
+    search = MCTS(time_limit=MCTS_TIME_LIMIT, parallel=MCTS_PARALLEL, workers=PARALLEL_WORKERS)
+    best_component = search.best_move(grid)
+    if best_component is not None:
+        print(f"MCTS selected: size {len(best_component)} after "
+              f"{search.playouts} playouts ({search.nodes} nodes, {search.elapsed:.2f}s, "
+              f"{search.playouts_per_second:.0f}/s)")
+    return best_component
+
+# ==========================================================
+# ============ STRATEGY 5: BEAM SEARCH =====================
+# ==========================================================
+def beam_best_move(grid):
+    """
+    Beam Search Strategy:
+    - Expand every position kept at the current depth
+    - Keep the BEAM_WIDTH best by score + group-size heuristic
+    - Collapse duplicate positions by state hash
+    - Play the first move of the best line found
+    Cost grows linearly with BEAM_WIDTH and BEAM_DEPTH.
+    """
+    line_score, sequence = beam_search(grid, BEAM_WIDTH, BEAM_DEPTH)
+    if not sequence:
+        return None
+    best_component = sequence[0]
+    print(f"Beam selected: size {len(best_component)}, line of "
+          f"{len(sequence)} moves worth {line_score} (width {BEAM_WIDTH})")
+    return best_component
+
 # ==========================================================
 # HINT STRATEGY - VIJAY SATHAPPAN CSE24059 - FIXED
 # ==========================================================
 def get_optimal_hint(grid):
-    memo = {}
+    memo = score_memo
     components = get_all_components(grid)
     
     if not components:
         return None, 0
     
     best_component = None
-    best_total = -1
+    best_total = float('-inf')
     
     for comp in components:
-        sim = copy_grid(grid)
-        remove_component(sim, comp)
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
         
-        # FIXED: After human move, CPU plays next (is_cpu_turn=False)
-        future = -dp_score_difference(sim, memo, False)
+        # After the human move the CPU is to move: its best difference counts against us
+        future = -dp_score_difference(grid, memo)
+        undo_move(grid, undo)
         total = len(comp) ** 2 + future
         
         if total > best_total:
@@ -538,10 +422,32 @@ def cpu_best_move(grid):
         print("\n🤖 CPU Strategy: BACKTRACKING + MEMOIZATION")
         return backtracking_best_move(grid)
 
+    elif STRATEGY_MODE == "mcts":
+        print("\n🤖 CPU Strategy: MONTE CARLO TREE SEARCH")
+        return mcts_best_move(grid)
+
+    elif STRATEGY_MODE == "beam":
+        print("\n🤖 CPU Strategy: BEAM SEARCH")
+        return beam_best_move(grid)
+
     else:
         print("\n🤖 CPU Strategy: Default (DC+DP)")
         return cpu_best_move_dc_dp(grid)
 
+# ==========================================================
+# PONDERING (search during the human's turn)
+# ==========================================================
+def ponder_position(board, stop):
+    """
+    Search a position a human reply leads to (CPU to move) into
+    the table the CPU strategy reads. MCTS, beam and greedy keep
+    no table between moves, so they do not ponder.
+    """
+    if STRATEGY_MODE == "backtracking":
+        backtracking_score(board, StoppableTable(backtrack_cache, stop))
+    elif STRATEGY_MODE not in ("greedy", "mcts", "beam"):
+        negamax(board, StoppableTable(score_memo, stop))
+
 # ==========================================================
 # SELECT STRATEGY
 # ==========================================================
@@ -554,9 +460,11 @@ def select_strategy():
     print("1. Greedy Strategy")
     print("2. Divide & Conquer + Dynamic Programming")
     print("3. Backtracking + Memoization")
+    print("4. Monte Carlo Tree Search (best for 15x10 / 20x5)")
+    print("5. Beam Search")
     print("="*50)
 
-    choice = input("Choice (1-3): ")
+    choice = input("Choice (1-5): ")
 
     if choice == '1':
         STRATEGY_MODE = "greedy"
@@ -567,10 +475,28 @@ def select_strategy():
     elif choice == '3':
         STRATEGY_MODE = "backtracking"
         print("✅ Backtracking + Memoization selected")
+    elif choice == '4':
+        STRATEGY_MODE = "mcts"
+        print("✅ Monte Carlo Tree Search selected")
+    elif choice == '5':
+        STRATEGY_MODE = "beam"
+        select_beam_width()
+        print(f"✅ Beam Search selected (width {BEAM_WIDTH})")
     else:
         print("❌ Invalid choice. Using Divide & Conquer + DP.")
         STRATEGY_MODE = "dc_dp"
 
+def select_beam_width():
+    """Ask for the beam width: wider beams play better and cost more"""
+    global BEAM_WIDTH
+
+    try:
+        width = int(input(f"Beam width (1-100, Enter for {BEAM_WIDTH}): ") or BEAM_WIDTH)
+    except ValueError:
+        print("Invalid width! Keeping", BEAM_WIDTH)
+        return
+    BEAM_WIDTH = min(max(width, 1), 100)
+
 # ==========================================================
 # INSTRUCTIONS
 # ==========================================================
@@ -584,6 +510,8 @@ def print_instructions():
     print("   - Greedy: Largest component only")
     print("   - Divide & Conquer + DP: Optimal with region splitting")
     print("   - Backtracking + Memoization: Exhaustive search")
+    print("   - MCTS: Sampled search with a fixed time per move")
+    print("   - Beam Search: Best few positions per move, width sets the cost")
     print("6. Game ends when no moves exist")
     print("7. In Multiplayer mode, you can ask for optimal hints!")
     print("==================================\n")
@@ -618,7 +546,7 @@ def select_board_size():
 # ==========================================================
 def single_player():
     select_board_size()
-    grid = GridADT(ROWS, COLS)
+    grid = new_grid(ROWS, COLS)
     score = 0
     print_instructions()
 
@@ -656,8 +584,11 @@ def single_player():
 def multiplayer():
     select_board_size()
     select_strategy()
-    grid = GridADT(ROWS, COLS)
+    grid = new_grid(ROWS, COLS)
     human = cpu = 0
+    ponderer = Ponderer(ponder_position)
+    if PONDER:
+        ponderer.start(grid)
     print_instructions()
 
     while not is_game_over(grid):
@@ -667,6 +598,8 @@ def multiplayer():
         # HUMAN HINT OPTION
         choice = input("Do you want optimal hint? (y/n): ").lower()
         if choice == 'y':
+            # The hint searches score_memo: the ponder thread must be done
+            ponderer.stop()
             start_time = time.time()
             hint_cell, hint_score = get_optimal_hint(grid)
             end_time = time.time()
@@ -677,6 +610,9 @@ def multiplayer():
                 print(f"💡 Calculation time: {end_time - start_time:.2f}s\n")
             else:
                 print("No hints available - game might be ending soon!\n")
+            if PONDER:
+                # Back to the human's replies while they choose a move
+                ponderer.start(grid)
 
         # -------- HUMAN MOVE --------
         try:
@@ -704,6 +640,7 @@ def multiplayer():
 
         # -------- CPU MOVE --------
         print("\n🤖 CPU thinking...")
+        pondered, ponder_time = ponderer.stop()
         start_time = time.time()
         cpu_comp = cpu_best_move(grid)
         end_time = time.time()
@@ -713,11 +650,17 @@ def multiplayer():
             remove_component(grid, cpu_comp)
             apply_gravity(grid)
             print(f"✅ CPU played! (+{len(cpu_comp)**2} points)")
+            if ponder_time:
+                print(f"🧠 Pondered {pondered} of your replies in {ponder_time:.2f}s")
             print(f"⏱️  Thinking time: {end_time - start_time:.2f}s\n")
+            if PONDER and not is_game_over(grid):
+                # Think about the human's replies while they choose one
+                ponderer.start(grid)
         else:
             print("CPU has no valid moves!\n")
             break
 
+    ponderer.stop()
     print("\n" + "="*50)
     print("GAME OVER")
     print("="*50)
@@ -745,7 +688,7 @@ def benchmark_strategies():
     
     # Use fixed seed for reproducibility
     random.seed(42)
-    grid = GridADT(6, 6)
+    grid = new_grid(6, 6)
     
     print("\nInitial Board:")
     grid.display()
@@ -753,7 +696,9 @@ def benchmark_strategies():
     strategies = [
         ("Greedy", greedy_best_move),
         ("DC+DP", cpu_best_move_dc_dp),
-        ("Backtracking", backtracking_best_move)
+        ("Backtracking", backtracking_best_move),
+        ("MCTS", mcts_best_move),
+        ("Beam", beam_best_move)
     ]
     
     results = []
@@ -801,6 +746,13 @@ def benchmark_strategies():
     for r in results:
         print(f"{r['name']:<15} {r['score']:<10} {r['moves']:<10} {r['time']:<10.2f}")
     
+    # Move engine: copy per child vs make/unmake on the same board
+    engine_grid = BACKENDS[BOARD_BACKEND].from_board([list(row) for row in grid.board])
+    copy_rate, inplace_rate, speedup = move_engine_speedup(engine_grid)
+    print("-"*45)
+    print(f"Move engine ({BOARD_BACKEND}): copy {copy_rate:.0f} nodes/s, "
+          f"make/unmake {inplace_rate:.0f} nodes/s ({speedup:.1f}x)")
+    
     print("="*50)
 
 # ==========================================================
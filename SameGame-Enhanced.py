@@ -3,8 +3,17 @@
 # NOW WITH OPTIMAL DP + MERGE SORT
 # ==========================================================
 
-import random
 import sys
+
+from samegame import GridADT
+from samegame.engine import get_component, get_all_components, remove_component, is_game_over
+from samegame.engine import apply_gravity as engine_apply_gravity
+from samegame.hashing import state_key
+from samegame.moves import apply_move, undo_move
+from samegame.nmcs import NestedMonteCarlo
+from samegame.ponder import Ponderer, StoppableTable
+from samegame.ttable import TranspositionTable
+
 sys.setrecursionlimit(10000)
 
 # -------------------------------
@@ -14,101 +23,26 @@ ROWS = 6
 COLS = 6
 COLORS = ['R', 'G', 'B', 'Y']
 
-# ==========================================================
-# GRID ADT
-# ==========================================================
-class GridADT:
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = self.create_board()
-
-    def create_board(self):
-        return [[random.choice(COLORS) for _ in range(self.cols)]
-                for _ in range(self.rows)]
-
-    def display(self):
-        print("\nBoard:")
-        print("   ", end="")
-        for c in range(self.cols):
-            print(c, end=" ")
-        print()
+# Future score display: exact DP up to this many blocks,
+# Nested Monte Carlo Search (anytime) above it. A full 6x6
+# board can take seconds to solve exactly; at 28 blocks the
+# DP stays well under NMCS_TIME_LIMIT
+EXACT_SCORE_BLOCKS = 28
+NMCS_LEVEL = 2
+NMCS_TIME_LIMIT = 2.0
 
-        for r in range(self.rows):
-            print(r, " ", end="")
-            for c in range(self.cols):
-                print(self.board[r][c] if self.board[r][c] else '.', end=" ")
-            print()
-        print()
-
-# ==========================================================
-# GRAPH ADT
-# ==========================================================
-class GraphADT:
-    @staticmethod
-    def neighbors(r, c):
-        return [(r+1, c), (r-1, c), (r, c+1), (r, c-1)]
+# Multiplayer: search the human's likely replies during their turn
+PONDER = False
 
 # ==========================================================
-# DFS
+# GRID ADT + ENGINE (shared samegame package)
 # ==========================================================
-def dfs(grid, r, c, color, visited, component):
-    if r < 0 or r >= ROWS or c < 0 or c >= COLS:
-        return
-    if (r, c) in visited:
-        return
-    if grid.board[r][c] != color:
-        return
+# GridADT, DFS components and gravity come from samegame.engine.
+# This variant drops blocks but never shifts empty columns left.
+SHIFT_COLUMNS = False
 
-    visited.add((r, c))
-    component.append((r, c))
-
-    for nr, nc in GraphADT.neighbors(r, c):
-        dfs(grid, nr, nc, color, visited, component)
-
-def get_component(grid, r, c):
-    if grid.board[r][c] is None:
-        return []
-
-    visited = set()
-    component = []
-    dfs(grid, r, c, grid.board[r][c], visited, component)
-    return component
-
-# ==========================================================
-# REMOVE
-# ==========================================================
-def remove_component(grid, component):
-    for r, c in component:
-        grid.board[r][c] = None
-
-# ==========================================================
-# GRAVITY
-# ==========================================================
 def apply_gravity(grid):
-    for c in range(COLS):
-        stack = []
-        for r in range(ROWS):
-            if grid.board[r][c]:
-                stack.append(grid.board[r][c])
-
-        for r in range(ROWS-1, -1, -1):
-            grid.board[r][c] = stack.pop() if stack else None
-
-# ==========================================================
-# GAME OVER
-# ==========================================================
-def is_game_over(grid):
-    visited_global = set()
-    for r in range(ROWS):
-        for c in range(COLS):
-            if grid.board[r][c] and (r, c) not in visited_global:
-                comp = get_component(grid, r, c)
-                for cell in comp:
-                    visited_global.add(cell)
-                if len(comp) > 1:
-                    return False
-    return True
+    engine_apply_gravity(grid, shift_columns=SHIFT_COLUMNS)
 
 # ==========================================================
 # MERGE SORT (UNCHANGED)
@@ -149,73 +83,73 @@ def merge_sort_components(components):
 # DYNAMIC PROGRAMMING (OPTIMAL PLAY)
 # ==========================================================
 def board_to_tuple(grid):
-    return tuple(tuple(row) for row in grid.board)
-
-def copy_grid(grid):
-    new_grid = GridADT(ROWS, COLS)
-    new_grid.board = [row[:] for row in grid.board]
-    return new_grid
+    return state_key(grid)
 
 def dp_best_score(grid, memo):
     state = board_to_tuple(grid)
 
     if state in memo:
         return memo[state]
+    start = memo.probes
 
     if is_game_over(grid):
         memo[state] = 0
         return 0
 
     max_score = 0
-    visited_cells = set()
 
-    for r in range(ROWS):
-        for c in range(COLS):
-            if grid.board[r][c] and (r, c) not in visited_cells:
+    for comp in get_all_components(grid):
+        undo = apply_move(grid, comp, shift_columns=SHIFT_COLUMNS)
 
-                comp = get_component(grid, r, c)
-                for cell in comp:
-                    visited_cells.add(cell)
+        future_score = dp_best_score(grid, memo)
+        undo_move(grid, undo)
+        total_score = len(comp) ** 2 + future_score
 
-                if len(comp) > 1:
-                    temp = copy_grid(grid)
-                    remove_component(temp, comp)
-                    apply_gravity(temp)
+        if total_score > max_score:
+            max_score = total_score
+
+    memo.store(state, max_score, memo.probes - start)
+    return max_score
 
-                    future_score = dp_best_score(temp, memo)
-                    total_score = len(comp) ** 2 + future_score
+# ==========================================================
+# NESTED MONTE CARLO (LARGE BOARDS)
+# ==========================================================
+def count_blocks(grid):
+    return sum(cell is not None for row in grid.board for cell in row)
 
-                    if total_score > max_score:
-                        max_score = total_score
+def max_achievable_score(grid):
+    """
+    Best future score from this state: (score, sequence, exact).
+    Small boards are solved exactly; larger ones return the best
+    sequence NMCS finds within NMCS_TIME_LIMIT (a lower bound).
+    """
+    if count_blocks(grid) <= EXACT_SCORE_BLOCKS:
+        return dp_best_score(grid, TranspositionTable()), None, True
 
-    memo[state] = max_score
-    return max_score
+    solver = NestedMonteCarlo(level=NMCS_LEVEL, time_limit=NMCS_TIME_LIMIT,
+                              shift_columns=SHIFT_COLUMNS)
+    score, sequence = solver.search(grid)
+    return score, sequence, False
 
 # ==========================================================
 # CPU MOVE
 # ==========================================================
+# Kept across moves when pondering: dp_best_score entries are
+# keyed on the board alone, so the replies searched stay valid
+cpu_memo = TranspositionTable()
+
 def cpu_best_move(grid):
-    memo = {}
+    memo = cpu_memo if PONDER else TranspositionTable()
     components = []
-    visited_cells = set()
 
-    for r in range(ROWS):
-        for c in range(COLS):
-            if grid.board[r][c] and (r, c) not in visited_cells:
+    for comp in get_all_components(grid):
+        undo = apply_move(grid, comp, shift_columns=SHIFT_COLUMNS)
 
-                comp = get_component(grid, r, c)
-                for cell in comp:
-                    visited_cells.add(cell)
+        future_score = dp_best_score(grid, memo)
+        undo_move(grid, undo)
+        total_achievable = len(comp) ** 2 + future_score
 
-                if len(comp) > 1:
-                    temp = copy_grid(grid)
-                    remove_component(temp, comp)
-                    apply_gravity(temp)
-
-                    future_score = dp_best_score(temp, memo)
-                    total_achievable = len(comp) ** 2 + future_score
-
-                    components.append((total_achievable, comp))
+        components.append((total_achievable, comp))
 
     if not components:
         return [], 0, 0
@@ -227,6 +161,10 @@ def cpu_best_move(grid):
 
     return best_component, immediate_score, best_total
 
+def ponder_position(board, stop):
+    """Search a position a human reply leads to (CPU to move) into cpu_memo"""
+    dp_best_score(board, StoppableTable(cpu_memo, stop))
+
 # ==========================================================
 # INSTRUCTIONS
 # ==========================================================
@@ -252,11 +190,16 @@ def single_player():
         grid.display()
 
         # Show maximum possible achievable score from this state
-        memo = {}
-        max_possible = dp_best_score(grid, memo)
+        max_possible, sequence, exact = max_achievable_score(grid)
 
         print("Current Score:", score)
-        print("Maximum Achievable Score From This State:", max_possible)
+        if exact:
+            print("Maximum Achievable Score From This State:", max_possible)
+        else:
+            print(f"Maximum Achievable Score From This State: at least {max_possible} "
+                  f"(NMCS level {NMCS_LEVEL}, {len(sequence)} moves)")
+            if sequence:
+                print("Best line starts at:", sequence[0][0])
         print()
 
         try:
@@ -294,6 +237,9 @@ def single_player():
 def multiplayer():
     grid = GridADT(ROWS, COLS)
     human = cpu = 0
+    ponderer = Ponderer(ponder_position, shift_columns=SHIFT_COLUMNS)
+    if PONDER:
+        ponderer.start(grid)
     print_instructions()
 
     while not is_game_over(grid):
@@ -316,6 +262,7 @@ def multiplayer():
             break
 
         print("CPU thinking...")
+        ponderer.stop()
         cpu_comp, immediate_score, max_future = cpu_best_move(grid)
 
         print("Maximum Achievable Score From This State:", max_future)
@@ -326,7 +273,10 @@ def multiplayer():
 
         print("CPU gained:", immediate_score)
         print("CPU played...\n")
+        if PONDER and not is_game_over(grid):
+            ponderer.start(grid)
 
+    ponderer.stop()
     print("GAME OVER")
     print("Human:", human, "| CPU:", cpu)
     print("Winner:", "Human 🎉" if human > cpu else "CPU 🤖")
@@ -1,10 +1,16 @@
 import tkinter as tk
 from tkinter import messagebox
 import time
-import random
 from functools import lru_cache
 import math
 
+from samegame import GridADT
+from samegame.engine import get_component, get_all_components, apply_gravity, play_move
+from samegame.hashing import state_key, CPU_TURN_KEY
+from samegame.moves import apply_move, undo_move
+from samegame.ponder import Ponderer, StoppableTable
+from samegame.ttable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
 # ==========================================================
 # SAME GAME - PERFECT CPU STRATEGY
 # Complete Implementation for Optimal Play
@@ -18,29 +24,19 @@ COLOR_MAP = {
     'Y': '#eab308',  # Yellow
 }
 
+# Multiplayer: the CPU searches the human's likely replies during
+# their turn (its table is then kept from move to move)
+PONDER = False
+
 # ==========================================================
 # OPTIMAL GRID ADT WITH HASHING
 # ==========================================================
-class OptimalGrid:
-    __slots__ = ['rows', 'cols', 'board']
-    
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = [[random.choice(COLORS) for _ in range(cols)]
-                      for _ in range(rows)]
-    
-    def copy(self):
-        new_grid = OptimalGrid(self.rows, self.cols)
-        new_grid.board = [row[:] for row in self.board]
-        return new_grid
+class OptimalGrid(GridADT):
+    """Shared GridADT plus the helpers PerfectCPU uses"""
     
     def get_state_key(self):
-        """Fast hashable representation for memoization"""
-        return tuple(tuple(row) for row in self.board)
-    
-    def is_empty(self):
-        return all(cell is None for row in self.board for cell in row)
+        """64-bit column-hash key for memoization"""
+        return state_key(self)
     
     def get_all_cells(self):
         """Get all non-empty cells with their positions"""
@@ -55,85 +51,23 @@ class OptimalGrid:
         """Get count of blocks in a column"""
         return sum(1 for r in range(self.rows) if self.board[r][c] for c in [col])
 
-# ==========================================================
-# COMPONENT DETECTION (FAST DFS)
-# ==========================================================
-class ComponentFinder:
-    @staticmethod
-    def get_component(grid, start_r, start_c):
-        """Get connected component starting at position"""
-        if not grid.board[start_r][start_c]:
-            return []
-        
-        color = grid.board[start_r][start_c]
-        rows, cols = grid.rows, grid.cols
-        visited = set()
-        stack = [(start_r, start_c)]
-        component = []
-        
-        while stack:
-            r, c = stack.pop()
-            if (r, c) in visited:
-                continue
-            if r < 0 or r >= rows or c < 0 or c >= cols:
-                continue
-            if grid.board[r][c] != color:
-                continue
-            
-            visited.add((r, c))
-            component.append((r, c))
-            
-            # Add neighbors
-            stack.append((r+1, c))
-            stack.append((r-1, c))
-            stack.append((r, c+1))
-            stack.append((r, c-1))
-        
-        return component
-    
-    @staticmethod
-    def get_all_components(grid):
-        """Get all valid components (size >= 2)"""
-        rows, cols = grid.rows, grid.cols
-        visited = [[False] * cols for _ in range(rows)]
-        components = []
-        
-        for r in range(rows):
-            for c in range(cols):
-                if grid.board[r][c] and not visited[r][c]:
-                    # Get component using BFS/DFS
-                    color = grid.board[r][c]
-                    stack = [(r, c)]
-                    comp = []
-                    
-                    while stack:
-                        cr, cc = stack.pop()
-                        if cr < 0 or cr >= rows or cc < 0 or cc >= cols:
-                            continue
-                        if visited[cr][cc] or grid.board[cr][cc] != color:
-                            continue
-                        
-                        visited[cr][cc] = True
-                        comp.append((cr, cc))
-                        
-                        stack.append((cr+1, cc))
-                        stack.append((cr-1, cc))
-                        stack.append((cr, cc+1))
-                        stack.append((cr, cc-1))
-                    
-                    if len(comp) >= 2:
-                        components.append(comp)
-        
-        return components
-
 # ==========================================================
 # PERFECT CPU STRATEGY - FIXED VERSION
 # ==========================================================
+# Stored depth of finished games: exact for any search depth
+MAX_TT_DEPTH = 1000
+
 class PerfectCPU:
     def __init__(self, difficulty="hard"):
         self.difficulty = difficulty
-        self.memo = {}
+        # Keyed on (board, turn): (score, bound type, depth, best move);
+        # deeper searches are kept longer
+        self.memo = TranspositionTable()
+        self.timed_out = False
+        self.completed_depth = 0
         self.nodes_evaluated = 0
+        self.cutoffs = 0        # alpha-beta cutoffs
+        self.tt_cutoffs = 0     # probes answered by the table
         self.max_depth = self._get_max_depth()
         self.time_limit = self._get_time_limit()
         
@@ -185,7 +119,7 @@ class PerfectCPU:
         if grid.is_empty():
             return 10000  # Win
         
-        components = ComponentFinder.get_all_components(grid)
+        components = get_all_components(grid)
         if not components:
             return -10000  # Loss
         
@@ -228,131 +162,140 @@ class PerfectCPU:
     def apply_move(self, grid, component):
         """Apply a move and return new grid with gravity applied"""
         new_grid = grid.copy()
-        
-        # Remove component
-        for r, c in component:
-            new_grid.board[r][c] = None
-        
-        # Apply gravity and column shift
-        self._apply_gravity(new_grid)
-        
+        play_move(new_grid, component)
         return new_grid
     
-    def _apply_gravity(self, grid):
-        """Apply vertical gravity and horizontal column shift"""
-        rows, cols = grid.rows, grid.cols
-        
-        # Vertical gravity
-        for c in range(cols):
-            # Collect non-empty cells from bottom to top
-            column = []
-            for r in range(rows-1, -1, -1):
-                if grid.board[r][c]:
-                    column.append(grid.board[r][c])
-            
-            # Fill from bottom
-            for r in range(rows-1, -1, -1):
-                if column:
-                    grid.board[r][c] = column.pop(0)
-                else:
-                    grid.board[r][c] = None
-        
-        # Horizontal shift (move columns left)
-        non_empty_cols = []
-        for c in range(cols):
-            if any(grid.board[r][c] for r in range(rows)):
-                non_empty_cols.append(c)
-        
-        # Create new shifted board
-        new_board = [[None] * cols for _ in range(rows)]
-        for new_c, old_c in enumerate(non_empty_cols):
-            for r in range(rows):
-                new_board[r][new_c] = grid.board[r][old_c]
-        
-        grid.board = new_board
-    
     def minimax(self, grid, depth, alpha, beta, is_cpu_turn, start_time):
         """
         Optimal minimax with alpha-beta pruning
         Returns (best_score, best_move)
+        Scores are fail-soft: a score <= alpha is an upper bound, a
+        score >= beta a lower bound, anything between is exact.
         """
         self.nodes_evaluated += 1
         
-        # Time limit check
-        if time.time() - start_time > self.time_limit:
-            return self.evaluate_position(grid), None
-        
-        # Check memoization cache
-        state_key = (grid.get_state_key(), depth, is_cpu_turn)
-        if state_key in self.memo:
-            return self.memo[state_key]
+        # Time limit check: abort the whole search. Nothing on the way
+        # back up is memoized, so a timeout never reaches the cache.
+        if self.timed_out or time.time() - start_time > self.time_limit:
+            self.timed_out = True
+            return 0, None
+        
+        # Check the transposition table. Entries keep their bound type
+        # and search depth; a deeper entry can answer a shallower probe.
+        tt_key = state_key(grid, CPU_TURN_KEY if is_cpu_turn else 0)
+        hash_move = None
+        if tt_key in self.memo:
+            score, flag, stored_depth, hash_move = self.memo[tt_key]
+            if stored_depth >= depth:
+                if (flag == EXACT
+                        or (flag == LOWER_BOUND and score >= beta)
+                        or (flag == UPPER_BOUND and score <= alpha)):
+                    self.tt_cutoffs += 1
+                    return score, hash_move
         
         # Get all possible moves
-        components = ComponentFinder.get_all_components(grid)
+        components = get_all_components(grid)
         
         # Terminal node
         if depth == 0 or not components:
             score = self.evaluate_position(grid)
-            self.memo[state_key] = (score, None)
+            # A finished game is exact at any depth
+            self.memo.store(tt_key, (score, EXACT, depth if components else MAX_TT_DEPTH, None), depth)
             return score, None
         
+        # Sort moves for better pruning (largest components first),
+        # then try the cached best move (the previous iteration's PV)
+        components.sort(key=len, reverse=True)
+        if hash_move in components:
+            components.remove(hash_move)
+            components.insert(0, hash_move)
+        
+        alpha_orig, beta_orig = alpha, beta
+        
         if is_cpu_turn:  # Maximizing player (CPU)
-            max_score = float('-inf')
+            best_score = float('-inf')
             best_move = None
             
-            # Sort moves for better pruning (largest components first)
-            components.sort(key=len, reverse=True)
-            
             for comp in components:
-                # Apply move
-                new_grid = self.apply_move(grid, comp)
+                # Apply move in place
+                undo = apply_move(grid, comp)
                 
                 # Immediate gain
                 immediate_gain = len(comp) ** 2
                 
-                # Recurse
-                score, _ = self.minimax(new_grid, depth - 1, alpha, beta, False, start_time)
+                # Recurse with the window shifted by the gain, then
+                # restore the board
+                score, _ = self.minimax(grid, depth - 1, alpha - immediate_gain,
+                                        beta - immediate_gain, False, start_time)
+                undo_move(grid, undo)
+                if self.timed_out:
+                    return best_score, best_move
                 total_score = immediate_gain + score
                 
-                if total_score > max_score:
-                    max_score = total_score
+                if total_score > best_score:
+                    best_score = total_score
                     best_move = comp
                 
                 alpha = max(alpha, total_score)
                 if beta <= alpha:
+                    self.cutoffs += 1
                     break  # Beta cutoff
-            
-            self.memo[state_key] = (max_score, best_move)
-            return max_score, best_move
         
         else:  # Minimizing player (Human)
-            min_score = float('inf')
+            best_score = float('inf')
             best_move = None
             
-            # Sort moves for better pruning
-            components.sort(key=len, reverse=True)
-            
             for comp in components:
-                # Apply move
-                new_grid = self.apply_move(grid, comp)
+                # Apply move in place
+                undo = apply_move(grid, comp)
                 
                 # Human gain is negative for CPU
                 human_gain = len(comp) ** 2
                 
-                # Recurse
-                score, _ = self.minimax(new_grid, depth - 1, alpha, beta, True, start_time)
+                # Recurse, then restore the board
+                score, _ = self.minimax(grid, depth - 1, alpha + human_gain,
+                                        beta + human_gain, True, start_time)
+                undo_move(grid, undo)
+                if self.timed_out:
+                    return best_score, best_move
                 total_score = score - human_gain  # Subtract human's gain
                 
-                if total_score < min_score:
-                    min_score = total_score
+                if total_score < best_score:
+                    best_score = total_score
                     best_move = comp
                 
                 beta = min(beta, total_score)
                 if beta <= alpha:
+                    self.cutoffs += 1
                     break  # Alpha cutoff
-            
-            self.memo[state_key] = (min_score, best_move)
-            return min_score, best_move
+        
+        if best_score <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best_score >= beta_orig:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.memo.store(tt_key, (best_score, flag, depth, best_move), depth)
+        return best_score, best_move
+    
+    def iterative_deepening(self, grid, max_depth, start_time):
+        """
+        Search depth 1, 2, ... max_depth until the time limit runs out
+        Returns the best move of the last fully completed depth
+        (None if not even depth 1 finished)
+        """
+        best_move = None
+        self.timed_out = False
+        self.completed_depth = 0
+        
+        for depth in range(1, max_depth + 1):
+            _, move = self.minimax(grid, depth, float('-inf'), float('inf'), True, start_time)
+            if self.timed_out:
+                break
+            best_move = move
+            self.completed_depth = depth
+        
+        return best_move
     
     def get_best_move(self, grid):
         """
@@ -361,10 +304,13 @@ class PerfectCPU:
         """
         start_time = time.time()
         self.nodes_evaluated = 0
-        self.memo.clear()
+        self.cutoffs = 0
+        self.tt_cutoffs = 0
+        if not PONDER:
+            self.memo.clear()
         
         # Get all components
-        all_components = ComponentFinder.get_all_components(grid)
+        all_components = get_all_components(grid)
         
         if not all_components:
             return None
@@ -375,9 +321,8 @@ class PerfectCPU:
         # If board is small, use full minimax
         total_cells = grid.rows * grid.cols
         if total_cells <= 36:  # 6x6 or smaller
-            depth = min(self.max_depth, 8)
-            _, best_move = self.minimax(grid, depth, float('-inf'), float('inf'), True, start_time)
-            return best_move
+            best_move = self.iterative_deepening(grid, self.max_depth, start_time)
+            return best_move or all_components[0]
         
         # DIVIDE PHASE - Get regions
         regions = self.divide_into_regions(grid)
@@ -394,7 +339,7 @@ class PerfectCPU:
             
             # Quick future evaluation with limited depth
             new_grid = self.apply_move(grid, comp)
-            future_components = ComponentFinder.get_all_components(new_grid)
+            future_components = get_all_components(new_grid)
             
             if future_components:
                 # Look at best possible future move
@@ -428,7 +373,7 @@ class PerfectCPU:
                 if not any(best_in_region == cm[0] for cm in candidate_moves):
                     immediate_gain = len(best_in_region) ** 2
                     new_grid = self.apply_move(grid, best_in_region)
-                    future_components = ComponentFinder.get_all_components(new_grid)
+                    future_components = get_all_components(new_grid)
                     
                     if future_components:
                         best_future = max(len(fc) for fc in future_components)
@@ -454,9 +399,26 @@ class PerfectCPU:
         # Ultimate fallback - just take the largest component
         return max(all_components, key=len)
     
+    def ponder(self, grid, stop):
+        """
+        Search a position a human reply leads to (CPU to move) to
+        full depth, without the time limit, into the memo
+        get_best_move reads. Setting `stop` aborts it at the next
+        probe. Only boards get_best_move searches are pondered.
+        """
+        if grid.rows * grid.cols > 36:
+            return
+        memo, time_limit = self.memo, self.time_limit
+        self.memo = StoppableTable(memo, stop)
+        self.time_limit = float('inf')
+        try:
+            self.iterative_deepening(grid, self.max_depth, time.time())
+        finally:
+            self.memo, self.time_limit = memo, time_limit
+    
     def _greedy_move(self, grid):
         """Greedy fallback (largest component)"""
-        components = ComponentFinder.get_all_components(grid)
+        components = get_all_components(grid)
         if not components:
             return None
         return max(components, key=len)
@@ -484,6 +446,8 @@ class SameGameGUI:
         
         # CPU player
         self.cpu = PerfectCPU(difficulty="hard")
+        # Searches the human's replies into self.cpu's memo (PONDER)
+        self.ponderer = Ponderer(lambda board, stop: self.cpu.ponder(board, stop))
         
         # Cell size
         self.cell_size = 60
@@ -499,6 +463,7 @@ class SameGameGUI:
     
     # ================= MENU =================
     def show_menu(self):
+        self.ponderer.stop()
         self.clear_screen()
         
         # Main frame
@@ -646,6 +611,7 @@ class SameGameGUI:
         self.game_over = False
         self.selected_component = []
         self.show_game()
+        self.start_pondering()
     
     # ================= GAME SCREEN =================
     def show_game(self):
@@ -765,7 +731,7 @@ class SameGameGUI:
         if self.is_animating or self.game_over:
             return
         
-        comp = ComponentFinder.get_component(self.grid, r, c)
+        comp = get_component(self.grid, r, c)
         
         if len(comp) < 2:
             self.info_label.config(text="❌ Need at least 2 blocks!")
@@ -793,7 +759,7 @@ class SameGameGUI:
     
     def apply_gravity(self):
         """Apply gravity and shift columns"""
-        self.cpu._apply_gravity(self.grid)
+        apply_gravity(self.grid)
         self.draw_board()
         self.is_animating = False
         self.info_label.config(text="")
@@ -813,6 +779,9 @@ class SameGameGUI:
         self.info_label.config(text="🤖 CPU is thinking...")
         self.root.update()
         
+        # The search below reads the memo the ponder thread fills
+        self.ponderer.stop()
+        
         # Get best move from CPU
         best_move = self.cpu.get_best_move(self.grid)
         
@@ -833,12 +802,18 @@ class SameGameGUI:
         self.root.after(200, self.cpu_gravity)
     
     def cpu_gravity(self):
-        self.cpu._apply_gravity(self.grid)
+        apply_gravity(self.grid)
         self.draw_board()
         self.is_animating = False
         self.info_label.config(text="")
         self.update_scores()
         self.check_game_over()
+        self.start_pondering()
+    
+    def start_pondering(self):
+        """Let the CPU search the human's replies while they think"""
+        if PONDER and self.game_mode == 'multiplayer' and not self.game_over:
+            self.ponderer.start(self.grid)
     
     # ================= HINT =================
     def show_hint(self):
@@ -849,9 +824,12 @@ class SameGameGUI:
         self.info_label.config(text="💡 Calculating hint...")
         self.root.update()
         
-        # Use CPU's algorithm for hint
+        # Use CPU's algorithm for hint (its time limit gets the whole
+        # CPU: pondering pauses and starts over afterwards)
+        self.ponderer.stop()
         hint_cpu = PerfectCPU(difficulty="medium")
         best_move = hint_cpu.get_best_move(self.grid)
+        self.start_pondering()
         
         if best_move and len(best_move) > 0:
             r, c = best_move[0]
@@ -872,7 +850,7 @@ class SameGameGUI:
     
     # ================= GAME OVER =================
     def check_game_over(self):
-        components = ComponentFinder.get_all_components(self.grid)
+        components = get_all_components(self.grid)
         if not components:
             self.game_over = True
             self.show_game_over()
@@ -4,11 +4,31 @@ import random
 import time
 from functools import lru_cache
 
+from samegame import GridADT
+from samegame.engine import get_component, get_all_components, apply_gravity, copy_grid
+from samegame.hashing import state_key
+from samegame.mcts import MCTS
+from samegame.moves import apply_move, undo_move
+from samegame.negamax import negamax
+from samegame.parallel import root_map, child_boards
+from samegame.ponder import Ponderer, StoppableTable
+from samegame.diskcache import solve_table, SCORE, DIFFERENCE
+
 # ==========================================================
 # SAME GAME - GUI VERSION WITH ADT & DSA
 # ==========================================================
 
 COLORS = ['R', 'G', 'B', 'Y']
+# Keep exact solver results in ~/.samegame/solves.sqlite3 across
+# sessions (samegame.diskcache; opt-in)
+PERSISTENT_CACHE = False
+# Backtracking: search the root moves in a pool of PARALLEL_WORKERS
+# processes (None = one per CPU core, samegame.parallel)
+PARALLEL_ROOT = False
+PARALLEL_WORKERS = None
+# Multiplayer: the CPU searches the human's likely replies during
+# their turn (samegame.ponder)
+PONDER = False
 COLOR_MAP = {
     'R': '#ef4444',  # Red
     'G': '#22c55e',  # Green
@@ -17,190 +37,35 @@ COLOR_MAP = {
 }
 
 # ==========================================================
-# GRID ADT
-# ==========================================================
-class GridADT:
-    """Abstract Data Type for Game Board"""
-    
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.board = self.create_board()
-    
-    def create_board(self):
-        return [[random.choice(COLORS) for _ in range(self.cols)]
-                for _ in range(self.rows)]
-    
-    def display(self):
-        """Console display for debugging"""
-        print("\nBoard:")
-        for r in range(self.rows):
-            for c in range(self.cols):
-                print(self.board[r][c] if self.board[r][c] else '.', end=' ')
-            print()
-
-# ==========================================================
-# GRAPH ADT (IMPLICIT GRID GRAPH)
+# GRID ADT + ENGINE (shared samegame package)
 # ==========================================================
-class GraphADT:
-    @staticmethod
-    def neighbors(r, c):
-        return [(r+1, c), (r-1, c), (r, c+1), (r, c-1)]
-
-# ==========================================================
-# DFS (CONNECTED COMPONENT)
-# ==========================================================
-def dfs(grid, r, c, color, visited, component):
-    """DFS to find connected component"""
-    if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
-        return
-    if (r, c) in visited:
-        return
-    if grid.board[r][c] != color:
-        return
-    
-    visited.add((r, c))
-    component.append((r, c))
-    
-    for nr, nc in GraphADT.neighbors(r, c):
-        dfs(grid, nr, nc, color, visited, component)
-
-def get_component(grid, r, c):
-    """Get connected component at position (r,c)"""
-    if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
-        return []
-    if grid.board[r][c] is None:
-        return []
-    
-    visited = set()
-    component = []
-    dfs(grid, r, c, grid.board[r][c], visited, component)
-    return component
-
-def get_all_components(grid):
-    """Returns list of all connected components (size > 1)"""
-    visited = set()
-    components = []
-    
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if (r, c) in visited:
-                continue
-            if grid.board[r][c] is None:
-                continue
-            
-            comp = []
-            dfs(grid, r, c, grid.board[r][c], visited, comp)
-            
-            if len(comp) > 1:
-                components.append(comp)
-    
-    return components
-
-# ==========================================================
-# GRAVITY USING STACK ADT
-# ==========================================================
-def apply_gravity(grid):
-    """Apply gravity to the board"""
-    # Vertical Shift
-    for c in range(grid.cols):
-        stack = []
-        for r in range(grid.rows):
-            if grid.board[r][c] is not None:
-                stack.append(grid.board[r][c])
-        
-        for r in range(grid.rows-1, -1, -1):
-            grid.board[r][c] = stack.pop() if stack else None
-    
-    # Horizontal Shift
-    write_col = 0
-    for read_col in range(grid.cols):
-        column_has_block = any(
-            grid.board[r][read_col] is not None
-            for r in range(grid.rows)
-        )
-        
-        if column_has_block:
-            if write_col != read_col:
-                for r in range(grid.rows):
-                    grid.board[r][write_col] = grid.board[r][read_col]
-                    grid.board[r][read_col] = None
-            write_col += 1
-
-def copy_grid(grid):
-    """Create a deep copy of the grid"""
-    new_grid = GridADT.__new__(GridADT)
-    new_grid.rows = grid.rows
-    new_grid.cols = grid.cols
-    new_grid.board = [row[:] for row in grid.board]
-    return new_grid
+# GridADT, DFS components, gravity and copying come from
+# samegame.engine.
 
 # ==========================================================
 # STRATEGY 1: GREEDY
 # ==========================================================
 def greedy_best_move(grid):
     """Greedy Strategy: Pick largest component"""
-    visited = set()
     best_component = None
     best_size = 0
     
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if (r, c) in visited or grid.board[r][c] is None:
-                continue
-            
-            comp = []
-            dfs(grid, r, c, grid.board[r][c], visited, comp)
-            
-            if len(comp) > 1 and len(comp) > best_size:
-                best_size = len(comp)
-                best_component = comp
+    for comp in get_all_components(grid):
+        if len(comp) > best_size:
+            best_size = len(comp)
+            best_component = comp
     
     return best_component
 
 # ==========================================================
 # STRATEGY 2: DIVIDE & CONQUER + DP
 # ==========================================================
-def dp_score_difference(grid, memo, is_cpu_turn):
-    """Returns maximum score difference from this state"""
-    state = (tuple(tuple(row) for row in grid.board), is_cpu_turn)
-    
-    if state in memo:
-        return memo[state]
-    
-    components = get_all_components(grid)
-    
-    if not components:
-        return 0
-    
-    if is_cpu_turn:
-        best = float('-inf')
-        for comp in components:
-            sim = copy_grid(grid)
-            for r, c in comp:
-                sim.board[r][c] = None
-            apply_gravity(sim)
-            
-            gain = len(comp) ** 2
-            future = dp_score_difference(sim, memo, False)
-            best = max(best, gain - future)
-        
-        memo[state] = best
-        return best
-    else:
-        worst = float('inf')
-        for comp in components:
-            sim = copy_grid(grid)
-            for r, c in comp:
-                sim.board[r][c] = None
-            apply_gravity(sim)
-            
-            gain = len(comp) ** 2
-            future = dp_score_difference(sim, memo, True)
-            worst = min(worst, future - gain)
-        
-        memo[state] = worst
-        return worst
+# Shared by the CPU and hint searches (keyed on the board alone)
+score_memo = solve_table(DIFFERENCE, persistent=PERSISTENT_CACHE)
+
+def dp_score_difference(grid, memo):
+    """Returns maximum score difference (player to move - opponent), via negamax"""
+    return negamax(grid, memo)
 
 def divide_board_regions(grid):
     """Split board into independent column regions"""
@@ -237,13 +102,11 @@ def conquer_region(grid, region_cols, memo):
     ]
     
     for comp in region_components:
-        sim = copy_grid(grid)
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
         
         gain = len(comp) ** 2
-        future = dp_score_difference(sim, memo, False)
+        future = dp_score_difference(grid, memo)
+        undo_move(grid, undo)
         value = gain - future
         
         if value > best_value:
@@ -254,7 +117,7 @@ def conquer_region(grid, region_cols, memo):
 
 def cpu_best_move_dc_dp(grid):
     """CPU move using Divide & Conquer + DP"""
-    memo = {}
+    memo = score_memo
     regions = divide_board_regions(grid)
     
     if not regions:
@@ -279,14 +142,17 @@ def cpu_best_move_dc_dp(grid):
 # ==========================================================
 # STRATEGY 3: BACKTRACKING + MEMOIZATION
 # ==========================================================
-backtrack_cache = {}
+backtrack_cache = solve_table(SCORE, persistent=PERSISTENT_CACHE)
 
-def backtracking_score(grid):
-    """Recursive backtracking to find maximum possible score"""
-    state = tuple(tuple(row) for row in grid.board)
+def backtracking_score(grid, memo=None):
+    """Recursive backtracking to find maximum possible score (memo: default backtrack_cache)"""
+    if memo is None:
+        memo = backtrack_cache
+    state = state_key(grid)
     
-    if state in backtrack_cache:
-        return backtrack_cache[state]
+    if state in memo:
+        return memo[state]
+    start = memo.probes
     
     components = get_all_components(grid)
     
@@ -295,22 +161,26 @@ def backtracking_score(grid):
     
     best = 0
     for comp in components:
-        sim = copy_grid(grid)
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
         
         gain = len(comp) ** 2
-        total = gain + backtracking_score(sim)
+        total = gain + backtracking_score(grid, memo)
+        undo_move(grid, undo)
         best = max(best, total)
     
-    backtrack_cache[state] = best
+    memo.store(state, best, memo.probes - start)
     return best
 
+def _backtracking_root_task(board):
+    """Pool worker: backtracking_score of the board after one root move"""
+    return backtracking_score(board)
+
 def backtracking_best_move(grid):
     """Backtracking Strategy with memoization"""
     global backtrack_cache
-    backtrack_cache = {}
+    if not PONDER:
+        # Pondering keeps the table: it holds the replies searched
+        backtrack_cache = solve_table(SCORE, persistent=PERSISTENT_CACHE)
     
     components = get_all_components(grid)
     
@@ -319,14 +189,20 @@ def backtracking_best_move(grid):
     
     best_component = None
     best_total = -1
-    
-    for comp in components:
-        sim = copy_grid(grid)
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
-        
-        total = len(comp) ** 2 + backtracking_score(sim)
+
+    futures = None
+    if PARALLEL_ROOT and len(components) > 1:
+        # Root moves searched in the process pool (exact, same order)
+        futures = root_map(_backtracking_root_task, child_boards(grid, components),
+                           PARALLEL_WORKERS)
+    
+    for i, comp in enumerate(components):
+        if futures is None:
+            undo = apply_move(grid, comp)
+            total = len(comp) ** 2 + backtracking_score(grid)
+            undo_move(grid, undo)
+        else:
+            total = len(comp) ** 2 + futures[i]
         
         if total > best_total:
             best_total = total
@@ -334,27 +210,53 @@ def backtracking_best_move(grid):
     
     return best_component
 
+# ==========================================================
+# STRATEGY 4: MONTE CARLO TREE SEARCH
+# ==========================================================
+# Fixed thinking time per move, whatever the board size
+MCTS_TIME_LIMIT = 1.0
+# Spread the search over the PARALLEL_WORKERS pool: "none",
+# "root" (one tree per process) or "leaf" (rollouts per leaf)
+MCTS_PARALLEL = "none"
+
+def mcts_best_move(grid):
+    """MCTS Strategy: UCT search with greedy-biased rollouts"""
+    return MCTS(time_limit=MCTS_TIME_LIMIT, parallel=MCTS_PARALLEL,
+                workers=PARALLEL_WORKERS).best_move(grid)
+
+# ==========================================================
+# PONDERING (search during the human's turn)
+# ==========================================================
+def ponder_position(strategy, board, stop):
+    """
+    Search a position a human reply leads to (CPU to move) into
+    the table `strategy` reads. MCTS and greedy keep no table
+    between moves, so they do not ponder.
+    """
+    if strategy == "dc_dp":
+        negamax(board, StoppableTable(score_memo, stop))
+    elif strategy == "backtracking":
+        backtracking_score(board, StoppableTable(backtrack_cache, stop))
+
 # ==========================================================
 # HINT STRATEGY
 # ==========================================================
 def get_optimal_hint(grid):
     """Provide optimal hint for human player"""
-    memo = {}
+    memo = score_memo
     components = get_all_components(grid)
     
     if not components:
         return None, 0
     
     best_component = None
-    best_total = -1
+    best_total = float('-inf')
     
     for comp in components:
-        sim = copy_grid(grid)
-        for r, c in comp:
-            sim.board[r][c] = None
-        apply_gravity(sim)
+        undo = apply_move(grid, comp)
         
-        future = -dp_score_difference(sim, memo, False)
+        future = -dp_score_difference(grid, memo)
+        undo_move(grid, undo)
         total = len(comp) ** 2 + future
         
         if total > best_total:
@@ -388,6 +290,9 @@ class SameGameGUI:
         self.is_animating = False
         self.game_over = False
         self.hint_mode = False
+        # Searches the human's replies for self.cpu_strategy (PONDER)
+        self.ponderer = Ponderer(
+            lambda board, stop: ponder_position(self.cpu_strategy, board, stop))
         
         # Cell size (dynamic based on board size)
         self.cell_size = 60
@@ -396,6 +301,7 @@ class SameGameGUI:
     
     # ================= MENU =================
     def show_menu(self):
+        self.ponderer.stop()
         self.clear_screen()
         
         frame = tk.Frame(self.root, bg='#1e293b')
@@ -454,7 +360,8 @@ class SameGameGUI:
         strategies = [
             ("greedy", "Greedy (Largest Component)", "#22c55e"),
             ("dc_dp", "Divide & Conquer + DP", "#3b82f6"),
-            ("backtracking", "Backtracking + Memoization", "#eab308")
+            ("backtracking", "Backtracking + Memoization", "#eab308"),
+            ("mcts", "Monte Carlo Tree Search", "#a855f7")
         ]
         
         for strategy, label, color in strategies:
@@ -534,6 +441,7 @@ class SameGameGUI:
             "   • Greedy: Largest component only",
             "   • Divide & Conquer + DP: Optimal region-based",
             "   • Backtracking: Exhaustive search with memoization",
+            "   • MCTS: Monte Carlo search, fixed time on any board size",
             "💡 Press 'H' during game for optimal hint",
             "🏁 Game ends when no valid moves remain"
         ]
@@ -561,6 +469,7 @@ class SameGameGUI:
         self.selected_component = []
         self.hint_mode = False
         self.show_game()
+        self.start_pondering()
     
     # ================= GAME SCREEN =================
     def show_game(self):
@@ -586,7 +495,8 @@ class SameGameGUI:
             strategy_text = {
                 'greedy': 'Greedy',
                 'dc_dp': 'DC + DP',
-                'backtracking': 'Backtracking'
+                'backtracking': 'Backtracking',
+                'mcts': 'MCTS'
             }.get(self.cpu_strategy, 'Unknown')
             
             tk.Label(header, text=f"🤖 CPU: {strategy_text}",
@@ -771,6 +681,9 @@ class SameGameGUI:
         self.info_label.config(text="🤖 CPU thinking...")
         self.draw_board()
         
+        # The strategies read the tables the ponder thread fills
+        self.ponderer.stop()
+        
         # Use selected strategy
         start_time = time.time()
         
@@ -780,6 +693,8 @@ class SameGameGUI:
             move = cpu_best_move_dc_dp(self.grid)
         elif self.cpu_strategy == "backtracking":
             move = backtracking_best_move(self.grid)
+        elif self.cpu_strategy == "mcts":
+            move = mcts_best_move(self.grid)
         else:
             move = greedy_best_move(self.grid)
         
@@ -813,7 +728,13 @@ class SameGameGUI:
         self.is_animating = False
         self.info_label.config(text="")
         self.update_scores()
-        self.check_game_over()
+        if not self.check_game_over():
+            self.start_pondering()
+    
+    def start_pondering(self):
+        """Let the CPU search the human's replies while they think"""
+        if PONDER and self.game_mode == 'multiplayer' and not self.game_over:
+            self.ponderer.start(self.grid)
     
     # ================= HINT =================
     def show_hint(self):
@@ -823,9 +744,12 @@ class SameGameGUI:
         self.info_label.config(text="💡 Calculating optimal hint...")
         self.root.update()
         
+        # The hint searches score_memo: pause pondering around it
+        self.ponderer.stop()
         start_time = time.time()
         hint_cell, hint_score = get_optimal_hint(self.grid)
         end_time = time.time()
+        self.start_pondering()
         
         if hint_cell:
             r, c = hint_cell
@@ -979,7 +903,8 @@ class BenchmarkWindow:
         strategies = [
             ("Greedy", greedy_best_move),
             ("DC+DP", cpu_best_move_dc_dp),
-            ("Backtracking", backtracking_best_move)
+            ("Backtracking", backtracking_best_move),
+            ("MCTS", mcts_best_move)
         ]
         
         for name, strategy in strategies:
@@ -0,0 +1,38 @@
+# ==========================================================
+# SAME GAME ENGINE
+# ==========================================================
+# Board backends share one method interface (copy, get/set,
+# get_component, get_all_components, remove_component,
+# apply_gravity, has_moves, is_empty, successors, state_key,
+# display) and the get(r, c) / set(r, c, color) cell
+# accessors, so every strategy works with whichever backend
+# created the grid.
+# samegame.engine wraps the interface in the module-level
+# functions (get_component(grid, r, c), apply_gravity(grid), ...)
+# that the GUI and console scripts call.
+# Searches play moves in place through samegame.moves
+# (apply_move / undo_move), which uses a backend's own
+# make_move / unmake_move when it has them.
+# samegame.components keeps a search's component list up to
+# date across those moves (component_index(grid)).
+# ==========================================================
+
+from samegame.grid import GridADT, COLORS
+from samegame.bitboard import BitboardGrid
+from samegame.columns import ColumnGrid
+
+BACKENDS = {
+    'list': GridADT,
+    'columns': ColumnGrid,
+    'bitboard': BitboardGrid,
+}
+
+
+def register_backend(name, cls):
+    """Make a backend class available to create_grid under `name`"""
+    BACKENDS[name] = cls
+
+
+def create_grid(rows, cols, backend='list', colors=COLORS):
+    """Create a random board using the named backend"""
+    return BACKENDS[backend](rows, cols, colors=colors)
@@ -0,0 +1,98 @@
+# ==========================================================
+# BEAM SEARCH
+# ==========================================================
+# Deterministic middle ground between the greedy strategy and
+# the exhaustive solvers. Each depth expands every position of
+# the beam and keeps the `width` best children by
+#     accumulated score + heuristic(child)
+# where the heuristic is the sum of squares of the groups on
+# the board: what the next move could score at most, counted
+# once per group. Children reached by different move orders
+# are collapsed on their state hash (the higher score wins).
+#
+# Cost is predictable: at most width * (moves per position)
+# children per depth, so the time grows linearly in the width
+# and in the depth (depth=None searches to the end of the game).
+#
+# Runs on a BitboardGrid copy with (color, mask) moves; the
+# moves of a kept child are found once, for its heuristic, and
+# reused when it is expanded.
+#
+#     score, sequence = beam_search(grid, width=10)
+#     move = beam_best_move(grid, width=10, depth=8)
+# ==========================================================
+
+from samegame.bitboard import BitboardGrid, _popcount
+
+DEFAULT_WIDTH = 10
+DEFAULT_DEPTH = None
+
+
+def group_heuristic(moves):
+    """Sum of squared group sizes of a position's moves"""
+    return sum(_popcount(mask) ** 2 for _, mask in moves)
+
+
+def beam_search(grid, width=DEFAULT_WIDTH, depth=DEFAULT_DEPTH):
+    """
+    Best line found by a width-`width` beam, searched `depth` moves
+    deep (to the end of the game when depth is None).
+    Returns (score of the line, [component cells, in play order]).
+    """
+    if width < 1:
+        raise ValueError("beam width must be at least 1")
+    start = BitboardGrid.from_board(grid.to_board())
+    # (score, board, moves of board, line)
+    beam = [(0, start, start.get_all_component_masks(), [])]
+    best_score, best_line = -1, []
+    best_value = float('-inf')
+    level = 0
+
+    while beam and (depth is None or level < depth):
+        children = {}
+        for score, board, moves, line in beam:
+            if not moves:
+                # Finished game: its score is final
+                if score > best_value:
+                    best_value, best_score, best_line = score, score, line
+                continue
+            for color, mask in moves:
+                n = _popcount(mask)
+                child = board.copy()
+                child.play_mask(color, mask)
+                total = score + n * n
+                key = child.state_hash()
+                seen = children.get(key)
+                if seen is not None and seen[0] >= total:
+                    continue
+                children[key] = (total, child, None, line + [(color, mask)])
+
+        ranked = []
+        for total, child, _, line in children.values():
+            moves = child.get_all_component_masks()
+            ranked.append((total + group_heuristic(moves), total, child, moves, line))
+        # Stable sort on the value alone keeps ties in move order
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+        beam = [(total, child, moves, line)
+                for _, total, child, moves, line in ranked[:width]]
+        level += 1
+
+    # Depth cut-off: the beam's best unfinished line competes on
+    # the same score + heuristic value as finished games
+    for score, board, moves, line in beam:
+        value = score + group_heuristic(moves)
+        if value > best_value:
+            best_value, best_score, best_line = value, score, line
+
+    board = start.copy()
+    cells = []
+    for color, mask in best_line:
+        cells.append(board.mask_to_cells(mask))
+        board.play_mask(color, mask)
+    return max(best_score, 0), cells
+
+
+def beam_best_move(grid, width=DEFAULT_WIDTH, depth=DEFAULT_DEPTH):
+    """First move of the best beam line (None if no move is left)"""
+    _, sequence = beam_search(grid, width, depth)
+    return sequence[0] if sequence else None
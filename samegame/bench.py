@@ -0,0 +1,397 @@
+# ==========================================================
+# BACKEND BENCHMARK (NODES PER SECOND)
+# ==========================================================
+# Runs the same memoized maximum-score search on every board
+# backend over fixed seeded boards and reports search nodes
+# expanded per second.
+#
+# The move-engine table runs one search twice per backend:
+# copying the grid for every child, and playing every child
+# in place with apply_move/undo_move.
+#
+# The negamax table solves one two-player board with the old
+# turn-keyed score-difference search and with samegame.negamax,
+# and reports memo entries and time for both.
+#
+# The canonical-key table runs the maximum-score search with
+# plain and with color-canonical memo keys and reports the
+# memo hit rate and stored states of both.
+#
+# The divide table solves boards with and without splitting
+# independent regions (samegame.divide) and reports how many
+# solved states split, the states searched and the time.
+#
+# The MCTS table runs one timed search per parallel mode
+# (samegame.mcts) and reports playouts per second over all
+# processes of the pool.
+#
+#     python -m samegame.bench
+# ==========================================================
+
+import random
+import time
+
+from samegame import BACKENDS
+from samegame import hashing
+from samegame.divide import independent_regions, sub_board
+from samegame.hashing import state_key, CPU_TURN_KEY
+from samegame.mcts import MCTS, PARALLEL_MODES
+from samegame.moves import apply_move, undo_move
+from samegame.negamax import negamax
+from samegame.ttable import TranspositionTable
+
+
+class _Budget(Exception):
+    pass
+
+
+def _max_score(grid, memo, stats):
+    stats['nodes'] += 1
+    if stats['nodes'] >= stats['limit']:
+        raise _Budget()
+
+    key = state_key(grid)
+    if key in memo:
+        return memo[key]
+
+    best = 0
+    for size, child in grid.successors():
+        total = size * size + _max_score(child, memo, stats)
+        if total > best:
+            best = total
+
+    memo[key] = best
+    return best
+
+
+def _max_score_copy(grid, memo, stats):
+    """Same search, one grid copy per child"""
+    stats['nodes'] += 1
+    if stats['nodes'] >= stats['limit']:
+        raise _Budget()
+
+    key = state_key(grid)
+    if key in memo:
+        return memo[key]
+
+    best = 0
+    for comp in grid.get_all_components():
+        child = grid.copy()
+        child.remove_component(comp)
+        child.apply_gravity()
+        total = len(comp) ** 2 + _max_score_copy(child, memo, stats)
+        if total > best:
+            best = total
+
+    memo[key] = best
+    return best
+
+
+def _max_score_in_place(grid, memo, stats):
+    """Same search, every child played and undone on one grid"""
+    stats['nodes'] += 1
+    if stats['nodes'] >= stats['limit']:
+        raise _Budget()
+
+    key = state_key(grid)
+    if key in memo:
+        return memo[key]
+
+    best = 0
+    for comp in grid.get_all_components():
+        undo = apply_move(grid, comp)
+        total = len(comp) ** 2 + _max_score_in_place(grid, memo, stats)
+        undo_move(grid, undo)
+        if total > best:
+            best = total
+
+    memo[key] = best
+    return best
+
+
+def _max_score_divided(grid, memo, stats):
+    """Same search, independent regions solved apart and added up"""
+    stats['nodes'] += 1
+    if stats['nodes'] >= stats['limit']:
+        raise _Budget()
+
+    key = state_key(grid)
+    if key in memo:
+        return memo[key]
+
+    regions = independent_regions(grid)
+    if len(regions) > 1:
+        stats['splits'] += 1
+        best = sum(_max_score_divided(sub_board(grid, region), memo, stats)
+                   for region in regions)
+        memo[key] = best
+        return best
+
+    best = 0
+    for comp in grid.get_all_components():
+        undo = apply_move(grid, comp)
+        total = len(comp) ** 2 + _max_score_divided(grid, memo, stats)
+        undo_move(grid, undo)
+        if total > best:
+            best = total
+
+    memo[key] = best
+    return best
+
+
+def _turn_keyed_difference(grid, memo, is_cpu_turn):
+    """The score-difference search negamax replaced: one entry per (board, turn)"""
+    key = state_key(grid, CPU_TURN_KEY if is_cpu_turn else 0)
+    if key in memo:
+        return memo[key]
+
+    components = grid.get_all_components()
+    if not components:
+        return 0
+
+    values = []
+    for comp in components:
+        undo = apply_move(grid, comp)
+        future = _turn_keyed_difference(grid, memo, not is_cpu_turn)
+        undo_move(grid, undo)
+        gain = len(comp) ** 2
+        values.append(gain - future if is_cpu_turn else future - gain)
+
+    best = max(values) if is_cpu_turn else min(values)
+    memo[key] = best
+    return best
+
+
+def nodes_per_second(grid, node_limit=20000, search=_max_score):
+    """Expand up to node_limit search nodes and return (nodes, nodes/sec)"""
+    stats = {'nodes': 0, 'limit': node_limit}
+    start = time.perf_counter()
+    try:
+        search(grid, {}, stats)
+    except _Budget:
+        pass
+    elapsed = time.perf_counter() - start
+    return stats['nodes'], stats['nodes'] / elapsed if elapsed > 0 else 0.0
+
+
+def move_engine_speedup(grid, node_limit=20000):
+    """
+    Run the search with copy-per-child and with make/unmake.
+    Returns (copy nodes/sec, make/unmake nodes/sec, speedup).
+    """
+    _, copy_rate = nodes_per_second(grid.copy(), node_limit, _max_score_copy)
+    _, inplace_rate = nodes_per_second(grid.copy(), node_limit,
+                                       _max_score_in_place)
+    speedup = inplace_rate / copy_rate if copy_rate else 0.0
+    return copy_rate, inplace_rate, speedup
+
+
+def negamax_comparison(grid):
+    """
+    Solve grid with the turn-keyed search and with negamax.
+    Returns (old entries, new entries, old seconds, new seconds).
+    """
+    old_memo = TranspositionTable(1 << 22)
+    start = time.perf_counter()
+    _turn_keyed_difference(grid.copy(), old_memo, True)
+    old_time = time.perf_counter() - start
+
+    new_memo = TranspositionTable(1 << 22)
+    start = time.perf_counter()
+    negamax(grid.copy(), new_memo)
+    new_time = time.perf_counter() - start
+
+    return len(old_memo), len(new_memo), old_time, new_time
+
+
+def canonical_hit_rates(grid, node_limit=50000):
+    """
+    Run the in-place maximum-score search with plain and with
+    color-canonical keys (same node budget).
+    Returns ((plain hit rate, states), (canonical hit rate, states)).
+    """
+    saved = hashing.CANONICAL_COLORS
+    results = []
+    try:
+        for canonical in (False, True):
+            hashing.CANONICAL_COLORS = canonical
+            memo = TranspositionTable(1 << 22)
+            try:
+                _max_score_in_place(grid.copy(), memo,
+                                    {'nodes': 0, 'limit': node_limit})
+            except _Budget:
+                pass
+            results.append((memo.hit_rate(), len(memo)))
+    finally:
+        hashing.CANONICAL_COLORS = saved
+    return tuple(results)
+
+
+def divide_savings(grid):
+    """
+    Solve grid without and with splitting independent regions.
+    Returns (states, split states, divided states, plain seconds,
+    divided seconds); both searches find the same score.
+    """
+    results = []
+    for search in (_max_score_in_place, _max_score_divided):
+        stats = {'nodes': 0, 'limit': float('inf'), 'splits': 0}
+        start = time.perf_counter()
+        search(grid.copy(), {}, stats)
+        results.append((stats['nodes'], stats['splits'],
+                        time.perf_counter() - start))
+    (plain_n, _, plain_t), (divided_n, splits, divided_t) = results
+    return plain_n, splits, divided_n, plain_t, divided_t
+
+
+def run_mcts_benchmark(sizes=((10, 10), (15, 10)), seed=42, time_limit=1.0,
+                       workers=None):
+    """MCTS playouts / second for each parallel mode on seeded list boards"""
+    results = []
+    for rows, cols in sizes:
+        random.seed(seed)
+        board = [[random.choice(['R', 'G', 'B', 'Y']) for _ in range(cols)]
+                 for _ in range(rows)]
+        grid = BACKENDS['list'].from_board(board)
+        row = {'size': f"{rows}x{cols}"}
+        for mode in PARALLEL_MODES:
+            search = MCTS(time_limit=time_limit, seed=seed, workers=workers)
+            search.best_move(grid, parallel=mode)
+            row[mode] = search.playouts_per_second
+        results.append(row)
+    return results
+
+
+def run_divide_benchmark(sizes=((5, 6), (6, 6)), seeds=(0, 1, 2)):
+    """divide_savings() summed over seeded list boards"""
+    results = []
+    for rows, cols in sizes:
+        totals = [0, 0, 0, 0.0, 0.0]
+        for seed in seeds:
+            random.seed(seed)
+            board = [[random.choice(['R', 'G', 'B', 'Y']) for _ in range(cols)]
+                     for _ in range(rows)]
+            for i, value in enumerate(divide_savings(BACKENDS['list'].from_board(board))):
+                totals[i] += value
+        results.append((f"{rows}x{cols}",) + tuple(totals))
+    return results
+
+
+def run_canonical_benchmark(sizes=((6, 6), (8, 8)), seeds=(0, 1, 2),
+                            node_limit=50000):
+    """canonical_hit_rates() averaged over seeded list boards"""
+    results = []
+    for rows, cols in sizes:
+        totals = [0.0, 0, 0.0, 0]
+        for seed in seeds:
+            random.seed(seed)
+            board = [[random.choice(['R', 'G', 'B', 'Y']) for _ in range(cols)]
+                     for _ in range(rows)]
+            (plain_rate, plain_n), (canon_rate, canon_n) = canonical_hit_rates(
+                BACKENDS['list'].from_board(board), node_limit)
+            totals[0] += plain_rate
+            totals[1] += plain_n
+            totals[2] += canon_rate
+            totals[3] += canon_n
+        n = len(seeds)
+        results.append((f"{rows}x{cols}", totals[0] / n, totals[1] // n,
+                        totals[2] / n, totals[3] // n))
+    return results
+
+
+def run_negamax_benchmark(sizes=((4, 5), (5, 5)), seed=42):
+    """negamax_comparison() on seeded list boards"""
+    results = []
+    for rows, cols in sizes:
+        random.seed(seed)
+        board = [[random.choice(['R', 'G', 'B', 'Y']) for _ in range(cols)]
+                 for _ in range(rows)]
+        results.append((f"{rows}x{cols}",)
+                       + negamax_comparison(BACKENDS['list'].from_board(board)))
+    return results
+
+
+def run_benchmark(sizes=((8, 8), (10, 10)), seed=42, node_limit=20000):
+    results = []
+
+    for rows, cols in sizes:
+        random.seed(seed)
+        board = [[random.choice(['R', 'G', 'B', 'Y']) for _ in range(cols)]
+                 for _ in range(rows)]
+
+        row = {'size': f"{rows}x{cols}"}
+        for name, backend in BACKENDS.items():
+            nodes, rate = nodes_per_second(backend.from_board(board), node_limit)
+            row[name] = rate
+        results.append(row)
+
+    return results
+
+
+def run_move_engine_benchmark(rows=8, cols=8, seed=42, node_limit=20000):
+    """Copy vs make/unmake nodes/sec for every backend on one board"""
+    random.seed(seed)
+    board = [[random.choice(['R', 'G', 'B', 'Y']) for _ in range(cols)]
+             for _ in range(rows)]
+
+    return [(name,) + move_engine_speedup(backend.from_board(board), node_limit)
+            for name, backend in BACKENDS.items()]
+
+
+def main():
+    results = run_benchmark()
+    names = list(BACKENDS)
+    width = 8 + 14 * len(names)
+
+    print("=" * width)
+    print("BACKEND BENCHMARK (search nodes / second, speedup vs list)")
+    print("=" * width)
+    print(f"{'Board':<8}" + "".join(f"{n:>14}" for n in names))
+    print("-" * width)
+    for row in results:
+        print(f"{row['size']:<8}" + "".join(f"{row[n]:>14.0f}" for n in names))
+        base = row[names[0]]
+        print(f"{'':<8}" + "".join(f"{row[n] / base:>13.1f}x" for n in names))
+    print("=" * width)
+
+    print("\nMOVE ENGINE (8x8, nodes / second)")
+    print("-" * 50)
+    print(f"{'Backend':<10}{'copy':>14}{'make/unmake':>14}{'speedup':>12}")
+    for name, copy_rate, inplace_rate, speedup in run_move_engine_benchmark():
+        print(f"{name:<10}{copy_rate:>14.0f}{inplace_rate:>14.0f}{speedup:>11.1f}x")
+    print("-" * 50)
+
+    print("\nNEGAMAX (two-player score difference, full solve)")
+    print("-" * 62)
+    print(f"{'Board':<8}{'old states':>12}{'new states':>12}{'old s':>10}{'new s':>10}{'speedup':>10}")
+    for size, old_n, new_n, old_t, new_t in run_negamax_benchmark():
+        print(f"{size:<8}{old_n:>12}{new_n:>12}{old_t:>10.2f}{new_t:>10.2f}{old_t / new_t:>9.1f}x")
+    print("-" * 62)
+
+    print("\nCOLOR-CANONICAL KEYS (max-score search, memo hit rate)")
+    print("-" * 62)
+    print(f"{'Board':<8}{'plain hit':>11}{'states':>9}{'canon hit':>11}{'states':>9}{'gain':>10}")
+    for size, plain_rate, plain_n, canon_rate, canon_n in run_canonical_benchmark():
+        print(f"{size:<8}{plain_rate:>10.1%}{plain_n:>9}{canon_rate:>10.1%}{canon_n:>9}"
+              f"{(canon_rate - plain_rate) * 100:>+8.2f}pt")
+    print("-" * 62)
+
+    print("\nDIVIDE (independent regions, max-score full solve)")
+    print("-" * 62)
+    print(f"{'Board':<8}{'states':>10}{'splits':>8}{'divided':>10}{'plain s':>9}{'divided s':>11}{'saved':>8}")
+    for size, plain_n, splits, divided_n, plain_t, divided_t in run_divide_benchmark():
+        print(f"{size:<8}{plain_n:>10}{splits:>8}{divided_n:>10}{plain_t:>9.2f}{divided_t:>11.2f}"
+              f"{1 - divided_n / plain_n:>8.1%}")
+    print("-" * 62)
+
+    print("\nMCTS (playouts / second, all processes, speedup vs serial)")
+    print("-" * 50)
+    print(f"{'Board':<8}" + "".join(f"{mode:>14}" for mode in PARALLEL_MODES))
+    for row in run_mcts_benchmark():
+        print(f"{row['size']:<8}" + "".join(f"{row[mode]:>14.0f}" for mode in PARALLEL_MODES))
+        print(f"{'':<8}" + "".join(f"{row[mode] / row['none']:>13.1f}x" for mode in PARALLEL_MODES))
+    print("-" * 50)
+
+
+if __name__ == "__main__":
+    main()
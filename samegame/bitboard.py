@@ -0,0 +1,380 @@
+# ==========================================================
+# BITBOARD GRID ADT
+# ==========================================================
+# One integer bitmask per color. Cell (r, c) lives at bit
+#     c * (rows + 1) + (rows - 1 - r)
+# so every column is a contiguous run of bits with the bottom
+# row in the lowest bit, followed by one always-empty guard bit.
+# The guard bit stops vertical shifts from leaking into the
+# neighbouring column, which lets flood fill, gravity and
+# column compaction run as plain integer operations.
+#
+# hashes[c] caches the Zobrist hash of column c; play_mask()
+# only rehashes the columns it touched (see samegame.hashing).
+# ==========================================================
+
+import random
+
+from samegame.hashing import ZOBRIST
+from samegame.views import BoardView
+
+COLORS = ['R', 'G', 'B', 'Y']
+
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(mask):
+        return bin(mask).count('1')
+
+
+class BitboardGrid:
+    """Grid ADT backed by one bitmask per color"""
+
+    __slots__ = ('rows', 'cols', 'height', 'masks', 'hashes')
+
+    def __init__(self, rows, cols, board=None, colors=COLORS):
+        self.rows = rows
+        self.cols = cols
+        self.height = rows + 1
+        self.masks = {}
+        if board is None:
+            board = [[random.choice(colors) for _ in range(cols)]
+                     for _ in range(rows)]
+        self.load_board(board)
+
+    @classmethod
+    def from_board(cls, board):
+        """Build a bitboard from a row-major list of lists"""
+        return cls(len(board), len(board[0]) if board else 0, board)
+
+    def load_board(self, board):
+        masks = {}
+        for r in range(self.rows):
+            for c in range(self.cols):
+                color = board[r][c]
+                if color is not None:
+                    masks[color] = masks.get(color, 0) | (1 << self.bit(r, c))
+        self.masks = masks
+        self.hashes = None
+
+    def to_board(self):
+        """Row-major list of lists snapshot"""
+        board = [[None] * self.cols for _ in range(self.rows)]
+        for color, mask in self.masks.items():
+            for r, c in self.mask_to_cells(mask):
+                board[r][c] = color
+        return board
+
+    def copy(self):
+        new_grid = BitboardGrid.__new__(BitboardGrid)
+        new_grid.rows = self.rows
+        new_grid.cols = self.cols
+        new_grid.height = self.height
+        new_grid.masks = dict(self.masks)
+        new_grid.hashes = self.hashes[:] if self.hashes is not None else None
+        return new_grid
+
+    @property
+    def board(self):
+        return BoardView(self)
+
+    # ---------------- cell access ----------------
+    def bit(self, r, c):
+        return c * self.height + (self.rows - 1 - r)
+
+    def get(self, r, c):
+        b = 1 << (c * self.height + (self.rows - 1 - r))
+        for color, mask in self.masks.items():
+            if mask & b:
+                return color
+        return None
+
+    def set(self, r, c, color):
+        b = 1 << (c * self.height + (self.rows - 1 - r))
+        for key, mask in list(self.masks.items()):
+            if mask & b:
+                self._store(key, mask & ~b)
+        if color is not None:
+            self.masks[color] = self.masks.get(color, 0) | b
+        self.hashes = None
+
+    def _store(self, color, mask):
+        # Keep only non-empty masks so equal boards have equal keys
+        self.hashes = None
+        if mask:
+            self.masks[color] = mask
+        else:
+            self.masks.pop(color, None)
+
+    def occupied(self):
+        occ = 0
+        for mask in self.masks.values():
+            occ |= mask
+        return occ
+
+    def mask_to_cells(self, mask):
+        """Convert a bitmask into (r, c) cells in row-major order"""
+        cells = []
+        h = self.height
+        last = self.rows - 1
+        while mask:
+            low = mask & -mask
+            c, b = divmod(low.bit_length() - 1, h)
+            cells.append((last - b, c))
+            mask ^= low
+        cells.sort()
+        return cells
+
+    def cells_to_mask(self, cells):
+        mask = 0
+        for r, c in cells:
+            mask |= 1 << (c * self.height + (self.rows - 1 - r))
+        return mask
+
+    # ---------------- flood fill ----------------
+    def flood(self, seed, mask):
+        """Grow seed inside mask through 4-neighbour adjacency"""
+        h = self.height
+        comp = seed
+        while True:
+            grown = (comp | (comp << 1) | (comp >> 1)
+                     | (comp << h) | (comp >> h)) & mask
+            if grown == comp:
+                return comp
+            comp = grown
+
+    def get_all_component_masks(self):
+        """Return (color, mask) for every component of size > 1"""
+        h = self.height
+        result = []
+        for color, mask in self.masks.items():
+            # Cells with no same-colored neighbour can never be moves
+            rest = mask & ((mask << 1) | (mask >> 1) | (mask << h) | (mask >> h))
+            while rest:
+                comp = rest & -rest
+                # Inline flood fill (hot path)
+                while True:
+                    grown = (comp | (comp << 1) | (comp >> 1)
+                             | (comp << h) | (comp >> h)) & mask
+                    if grown == comp:
+                        break
+                    comp = grown
+                rest &= ~comp
+                result.append((color, comp))
+        return result
+
+    def has_moves(self):
+        """True if any component of size > 1 exists"""
+        h = self.height
+        for mask in self.masks.values():
+            # A cell with a same-colored right or upper neighbour
+            if mask & ((mask >> 1) | (mask >> h)):
+                return True
+        return False
+
+    def get_component(self, r, c):
+        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
+            return []
+        b = 1 << self.bit(r, c)
+        for mask in self.masks.values():
+            if mask & b:
+                return self.mask_to_cells(self.flood(b, mask))
+        return []
+
+    def get_all_components(self):
+        """All components (size > 1) as row-major (r, c) lists"""
+        components = [self.mask_to_cells(comp)
+                      for _, comp in self.get_all_component_masks()]
+        # Same order as a row-major DFS scan over a list board
+        components.sort()
+        return components
+
+    # ---------------- moves ----------------
+    def remove_mask(self, color, comp):
+        self._store(color, self.masks[color] & ~comp)
+
+    def remove_component(self, component):
+        comp = self.cells_to_mask(component)
+        for color, mask in list(self.masks.items()):
+            if mask & comp:
+                self._store(color, mask & ~comp)
+
+    def apply_gravity(self, shift_columns=True):
+        """Vertical drop per column, then shift empty columns out (unless shift_columns is False)"""
+        h = self.height
+        col_bits = (1 << self.rows) - 1
+        masks = self.masks
+        occ_all = self.occupied()
+        c = 0
+
+        while occ_all >> (c * h):
+            base = c * h
+            occ = (occ_all >> base) & col_bits
+
+            if not occ and shift_columns:
+                # Empty column: slide everything to its right down by one column
+                low = (1 << base) - 1
+                for color, mask in masks.items():
+                    masks[color] = (mask & low) | ((mask >> (base + h)) << base)
+                occ_all = (occ_all & low) | ((occ_all >> (base + h)) << base)
+                continue
+
+            if occ & (occ + 1):
+                # Column has holes: compact its segment bottom-up.
+                # Holes are removed from the highest downwards so lower
+                # hole positions stay valid while compacting.
+                clear = ~(col_bits << base)
+                holes = ~occ & ((1 << occ.bit_length()) - 1)
+                for color, mask in masks.items():
+                    seg = (mask >> base) & col_bits
+                    if not seg:
+                        continue
+                    rest = holes
+                    while rest:
+                        p = rest.bit_length() - 1
+                        keep = (1 << p) - 1
+                        seg = (seg & keep) | ((seg >> (p + 1)) << p)
+                        rest &= keep
+                    masks[color] = (mask & clear) | (seg << base)
+                filled = (1 << _popcount(occ)) - 1
+                occ_all = (occ_all & clear) | (filled << base)
+
+            c += 1
+
+        self.hashes = None
+
+    def play_mask(self, color, comp):
+        """
+        Remove a component given as a mask and apply gravity.
+        Only the columns the component touches are compacted, and
+        a column is deleted with one shift when it becomes empty.
+        """
+        masks = self.masks
+        hashes = self.hashes
+        self._store(color, masks[color] & ~comp)
+        self.hashes = hashes
+        h = self.height
+        col_bits = (1 << self.rows) - 1
+
+        # Visit touched columns right to left so deleting a column
+        # never moves a column still waiting to be compacted
+        while comp:
+            base = ((comp.bit_length() - 1) // h) * h
+            removed = comp >> base
+            comp &= (1 << base) - 1
+
+            occ = 0
+            for mask in masks.values():
+                occ |= mask >> base
+            if not occ & col_bits:
+                low = (1 << base) - 1
+                for key, mask in masks.items():
+                    masks[key] = (mask & low) | ((mask >> (base + h)) << base)
+                if hashes is not None:
+                    del hashes[base // h]
+                continue
+
+            # Split the removed cells into vertical runs (top, bottom)
+            runs = []
+            rest = removed & col_bits
+            while rest:
+                top = rest.bit_length()
+                bottom = (~rest & ((1 << top) - 1)).bit_length()
+                runs.append((top, bottom))
+                rest &= (1 << bottom) - 1
+
+            first = runs[-1][1]
+            clear = ~(col_bits << base)
+            for key, mask in masks.items():
+                seg = (mask >> base) & col_bits
+                if not seg >> first:
+                    continue
+                for top, bottom in runs:
+                    seg = (seg & ((1 << bottom) - 1)) | ((seg >> top) << bottom)
+                masks[key] = (mask & clear) | (seg << base)
+
+            if hashes is not None:
+                hashes[base // h] = self._column_hash(base)
+
+    def make_move(self, component):
+        """Play a component given as cells; returns an undo token"""
+        r, c = component[0]
+        return self.make_mask_move(self.get(r, c), self.cells_to_mask(component))
+
+    def make_mask_move(self, color, comp):
+        """Play a component given as a mask; returns an undo token"""
+        token = (self.masks, self.hashes)
+        self.masks = dict(self.masks)
+        if self.hashes is not None:
+            self.hashes = self.hashes[:]
+        self.play_mask(color, comp)
+        return token
+
+    def unmake_move(self, token):
+        self.masks, self.hashes = token
+
+    def successors(self):
+        """Yield (component size, child grid) for every legal move"""
+        for color, comp in self.get_all_component_masks():
+            child = self.copy()
+            child.play_mask(color, comp)
+            yield _popcount(comp), child
+
+    # ---------------- state ----------------
+    def is_empty(self):
+        return not any(self.masks.values())
+
+    def state_key(self):
+        return tuple(sorted(self.masks.items()))
+
+    def _column_hash(self, base):
+        col_bits = (1 << self.rows) - 1
+        h = 0
+        for color, mask in self.masks.items():
+            seg = (mask >> base) & col_bits
+            if seg:
+                h ^= ZOBRIST.segment_hash(color, seg)
+        return h
+
+    def state_hash(self):
+        """64-bit board hash from the cached column hashes"""
+        if self.hashes is None:
+            self.hashes = [self._column_hash(c * self.height)
+                           for c in range(self.cols)]
+        return ZOBRIST.combine(self.hashes)
+
+    def canonical_hash(self):
+        """
+        Board hash with colors relabelled in first-appearance order.
+        A color's first cell is its mask's lowest bit (columns left
+        to right, each from the bottom up).
+        """
+        h = self.height
+        col_bits = (1 << self.rows) - 1
+        hashes = [0] * self.cols
+        order = sorted(self.masks.values(), key=lambda mask: mask & -mask)
+        for label, mask in enumerate(order):
+            c = 0
+            while mask:
+                seg = mask & col_bits
+                if seg:
+                    hashes[c] ^= ZOBRIST.segment_hash(label, seg)
+                mask >>= h
+                c += 1
+        return ZOBRIST.combine(hashes)
+
+    def display(self):
+        print("\nBoard:")
+        print("   ", end="")
+        for c in range(self.cols):
+            print(c, end=" ")
+        print()
+
+        for r in range(self.rows):
+            print(r, " ", end="")
+            for c in range(self.cols):
+                cell = self.get(r, c)
+                print(cell if cell is not None else '.', end=" ")
+            print()
+        print()
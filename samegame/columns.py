@@ -0,0 +1,296 @@
+# ==========================================================
+# COLUMN-MAJOR GRID ADT
+# ==========================================================
+# columns[c] is the list of colors in column c from the bottom
+# up. After gravity every column is compact (no None inside)
+# and empty columns are deleted from the list, so:
+#     vertical gravity   -> filter the touched columns
+#     horizontal shift   -> del columns[c]
+# Cells are still addressed as (r, c) with r counted from the
+# top, through the get/set accessors.
+#
+# hashes[c] caches the Zobrist hash of columns[c]; play() only
+# rehashes the columns it touched (see samegame.hashing).
+# ==========================================================
+
+import random
+
+from samegame.hashing import ZOBRIST
+from samegame.views import BoardView
+
+COLORS = ['R', 'G', 'B', 'Y']
+
+
+class ColumnGrid:
+    """Grid ADT stored as bottom-up column lists"""
+
+    __slots__ = ('rows', 'cols', 'columns', 'hashes')
+
+    def __init__(self, rows, cols, board=None, colors=COLORS):
+        self.rows = rows
+        self.cols = cols
+        if board is None:
+            board = [[random.choice(colors) for _ in range(cols)]
+                     for _ in range(rows)]
+        self.load_board(board)
+
+    @classmethod
+    def from_board(cls, board):
+        return cls(len(board), len(board[0]) if board else 0, board)
+
+    def load_board(self, board):
+        columns = []
+        for c in range(self.cols):
+            col = [board[r][c] for r in range(self.rows - 1, -1, -1)]
+            while col and col[-1] is None:
+                col.pop()
+            columns.append(col)
+        while columns and not columns[-1]:
+            columns.pop()
+        self.columns = columns
+        self.hashes = None
+
+    def to_board(self):
+        board = [[None] * self.cols for _ in range(self.rows)]
+        last = self.rows - 1
+        for c, col in enumerate(self.columns):
+            for b, color in enumerate(col):
+                board[last - b][c] = color
+        return board
+
+    def copy(self):
+        new_grid = ColumnGrid.__new__(ColumnGrid)
+        new_grid.rows = self.rows
+        new_grid.cols = self.cols
+        new_grid.columns = [col[:] for col in self.columns]
+        new_grid.hashes = self.hashes[:] if self.hashes is not None else None
+        return new_grid
+
+    @property
+    def board(self):
+        return BoardView(self)
+
+    # ---------------- accessors ----------------
+    def column(self, c):
+        """Bottom-up colors of column c (empty list past the last column)"""
+        if c < len(self.columns):
+            return self.columns[c]
+        return []
+
+    def height(self, c):
+        return len(self.column(c))
+
+    def get(self, r, c):
+        if c < len(self.columns):
+            col = self.columns[c]
+            b = self.rows - 1 - r
+            if b < len(col):
+                return col[b]
+        return None
+
+    def set(self, r, c, color):
+        columns = self.columns
+        while len(columns) <= c:
+            columns.append([])
+        col = columns[c]
+        b = self.rows - 1 - r
+        while len(col) <= b:
+            col.append(None)
+        col[b] = color
+        while col and col[-1] is None:
+            col.pop()
+        self.hashes = None
+
+    # ---------------- components ----------------
+    def _flood(self, c, b, color, visited, component):
+        columns = self.columns
+        ncols = len(columns)
+        rows = self.rows
+        last = rows - 1
+        stack = [(c, b)]
+
+        while stack:
+            cc, cb = stack.pop()
+            key = cc * rows + cb
+            if key in visited:
+                continue
+            visited.add(key)
+            component.append((last - cb, cc))
+
+            col = columns[cc]
+            if cb + 1 < len(col) and col[cb + 1] == color:
+                stack.append((cc, cb + 1))
+            if cb > 0 and col[cb - 1] == color:
+                stack.append((cc, cb - 1))
+            if cc + 1 < ncols:
+                right = columns[cc + 1]
+                if cb < len(right) and right[cb] == color:
+                    stack.append((cc + 1, cb))
+            if cc > 0:
+                left = columns[cc - 1]
+                if cb < len(left) and left[cb] == color:
+                    stack.append((cc - 1, cb))
+
+    def get_component(self, r, c):
+        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
+            return []
+        color = self.get(r, c)
+        if color is None:
+            return []
+
+        component = []
+        self._flood(c, self.rows - 1 - r, color, set(), component)
+        component.sort()
+        return component
+
+    def get_all_components(self):
+        """All components (size > 1) as row-major (r, c) lists"""
+        visited = set()
+        components = []
+        rows = self.rows
+
+        for c, col in enumerate(self.columns):
+            for b, color in enumerate(col):
+                if color is None or c * rows + b in visited:
+                    continue
+                comp = []
+                self._flood(c, b, color, visited, comp)
+                if len(comp) > 1:
+                    comp.sort()
+                    components.append(comp)
+
+        # Same order as a row-major DFS scan over a list board
+        components.sort()
+        return components
+
+    def has_moves(self):
+        columns = self.columns
+        for c, col in enumerate(columns):
+            right = columns[c + 1] if c + 1 < len(columns) else []
+            for b, color in enumerate(col):
+                if color is None:
+                    continue
+                if b + 1 < len(col) and col[b + 1] == color:
+                    return True
+                if b < len(right) and right[b] == color:
+                    return True
+        return False
+
+    # ---------------- moves ----------------
+    def remove_component(self, component):
+        last = self.rows - 1
+        for r, c in component:
+            self.columns[c][last - r] = None
+        self.hashes = None
+
+    def apply_gravity(self, shift_columns=True):
+        """
+        Filter every column, then delete the empty ones.
+        shift_columns=False keeps them in place as empty lists.
+        """
+        columns = self.columns
+        for c in range(len(columns) - 1, -1, -1):
+            col = [color for color in columns[c] if color is not None]
+            if col or not shift_columns:
+                columns[c] = col
+            else:
+                del columns[c]
+        while columns and not columns[-1]:
+            columns.pop()
+        self.hashes = None
+
+    def make_move(self, component):
+        """
+        Remove a component and apply gravity to the touched columns only.
+        Returns an undo token: the replaced column lists (never mutated,
+        only swapped out) plus their cached hashes.
+        """
+        columns = self.columns
+        if self.hashes is None:
+            self.hashes = [ZOBRIST.column_hash(col) for col in columns]
+        hashes = self.hashes
+        last = self.rows - 1
+
+        touched = {}
+        for r, c in component:
+            touched.setdefault(c, set()).add(last - r)
+
+        undo = []
+        for c in sorted(touched, reverse=True):
+            old = columns[c]
+            removed = touched[c]
+            col = [color for b, color in enumerate(old)
+                   if color is not None and b not in removed]
+            if col:
+                undo.append((c, old, hashes[c], False))
+                columns[c] = col
+                hashes[c] = ZOBRIST.column_hash(col)
+            else:
+                undo.append((c, old, hashes[c], True))
+                del columns[c]
+                del hashes[c]
+        return undo
+
+    def unmake_move(self, undo):
+        columns = self.columns
+        hashes = self.hashes
+        for c, old, old_hash, deleted in reversed(undo):
+            if deleted:
+                columns.insert(c, old)
+                hashes.insert(c, old_hash)
+            else:
+                columns[c] = old
+                hashes[c] = old_hash
+
+    def play(self, component):
+        """Remove a component and apply gravity to the touched columns only"""
+        self.make_move(component)
+
+    def successors(self):
+        """Yield (component size, child grid) for every legal move"""
+        for comp in self.get_all_components():
+            child = self.copy()
+            child.play(comp)
+            yield len(comp), child
+
+    # ---------------- state ----------------
+    def is_empty(self):
+        return not any(self.columns)
+
+    def state_key(self):
+        return tuple(map(tuple, self.columns))
+
+    def state_hash(self):
+        """64-bit board hash from the cached column hashes"""
+        if self.hashes is None:
+            self.hashes = [ZOBRIST.column_hash(col) for col in self.columns]
+        return ZOBRIST.combine(self.hashes)
+
+    def canonical_hash(self):
+        """Board hash with colors relabelled in first-appearance order"""
+        labels = {}
+        hashes = []
+        for col in self.columns:
+            relabelled = []
+            for color in col:
+                label = labels.get(color)
+                if label is None:
+                    label = labels[color] = len(labels)
+                relabelled.append(label)
+            hashes.append(ZOBRIST.column_hash(relabelled))
+        return ZOBRIST.combine(hashes)
+
+    def display(self):
+        print("\nBoard:")
+        print("   ", end="")
+        for c in range(self.cols):
+            print(c, end=" ")
+        print()
+
+        for r in range(self.rows):
+            print(r, " ", end="")
+            for c in range(self.cols):
+                cell = self.get(r, c)
+                print(cell if cell is not None else '.', end=" ")
+            print()
+        print()
@@ -0,0 +1,79 @@
+# ==========================================================
+# COMMUTING MOVES (PARTIAL-ORDER REDUCTION)
+# ==========================================================
+# A move only changes the columns it removes blocks from, and
+# only the cells beside those columns can join or leave a
+# neighbouring group. So two moves commute -- either order
+# scores the same and reaches the same board -- when
+#     neither empties a column (no column shift), and
+#     at least one untouched column lies between their spans
+# (disjoint but adjacent spans do not commute: the blocks that
+# drop in one column can merge with the group next to it).
+#
+# Exhaustive single-player search uses this with sleep sets:
+# once move a has been searched, its later siblings b that
+# commute with a put a to sleep in b's subtree, where a is not
+# generated again -- a after b reaches the board b after a
+# already covered. Sleeping moves stay asleep down the tree
+# until a dependent move is played. Every move order class is
+# still searched once, so the best score is unchanged.
+#
+# Only for searches without a memo keyed on the board alone
+# (a value found with sleeping moves misses some lines) and
+# for one player (in the two-player game swapping moves swaps
+# who scores them).
+#
+#     for comp, sleep_after in commuting_moves(grid, components, sleep):
+#         undo = apply_move(grid, comp)
+#         ... search(grid, sleep_after) ...
+#         undo_move(grid, undo)
+# ==========================================================
+
+
+def _column_height(grid, c):
+    """Blocks in column c (columns are compact after gravity)"""
+    r = grid.rows - 1
+    while r >= 0 and grid.get(r, c) is not None:
+        r -= 1
+    return grid.rows - 1 - r
+
+
+def move_span(grid, component):
+    """(first column, last column, empties a column) of a move"""
+    counts = {}
+    for _, c in component:
+        counts[c] = counts.get(c, 0) + 1
+    empties = any(n == _column_height(grid, c) for c, n in counts.items())
+    return min(counts), max(counts), empties
+
+
+def independent(a, b):
+    """True if the moves with spans a and b commute"""
+    if a[2] or b[2]:
+        return False
+    return a[1] + 1 < b[0] or b[1] + 1 < a[0]
+
+
+def commuting_moves(grid, components, sleep=None):
+    """
+    The components of `grid` that are not asleep, each with the
+    sleep set of its child, as [(component, sleep set)].
+    A sleep set maps a move's first cell to its span; a group is
+    identified by its first cell since groups never share cells.
+    """
+    spans = [(min(comp), comp, move_span(grid, comp)) for comp in components]
+    sleep = sleep or {}
+    searched = []
+    result = []
+
+    for key, comp, span in spans:
+        if key in sleep:
+            continue
+        child = {k: s for k, s in sleep.items() if independent(s, span)}
+        for k, s in searched:
+            if independent(s, span):
+                child[k] = s
+        searched.append((key, span))
+        result.append((comp, child))
+
+    return result
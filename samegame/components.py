@@ -0,0 +1,91 @@
+# ==========================================================
+# SEARCH MOVE INDEX
+# ==========================================================
+# Tracks a grid's moves through a search: play() and undo()
+# play moves in place (samegame.moves) and moves() lists the
+# components of the current board from the backend's own
+# get_all_components().
+#
+#     index = component_index(grid)
+#     for comp in index.moves():
+#         token = index.play(comp)      # also plays it on grid
+#         ...
+#         index.undo(token)
+#
+# The index also counts the blocks of each color, which gives
+# the branch-and-bound score bound
+#     upper_bound() = sum over colors of count ** 2
+# It is admissible: the groups removed from one color score
+# sum(size ** 2) <= (sum(size)) ** 2 <= count ** 2.
+# ==========================================================
+
+from samegame.moves import apply_move, undo_move
+
+
+def _count_colors(grid):
+    counts = {}
+    for r in range(grid.rows):
+        for c in range(grid.cols):
+            color = grid.get(r, c)
+            if color is not None:
+                counts[color] = counts.get(color, 0) + 1
+    return counts
+
+
+class _ColorCounts:
+    """Per-color block counts and their sum of squares (the score bound)"""
+
+    def _init_counts(self, counts):
+        self.counts = counts
+        self.squares = sum(n * n for n in counts.values())
+
+    def upper_bound(self):
+        """Admissible bound on the score still available on the board"""
+        return self.squares
+
+    def bound_after(self, color, size):
+        """upper_bound() once a `size`-block group of `color` is removed"""
+        n = self.counts[color]
+        return self.squares - n * n + (n - size) * (n - size)
+
+    def _remove_blocks(self, color, size):
+        self.squares = self.bound_after(color, size)
+        self.counts[color] -= size
+
+    def _restore_blocks(self, color, size):
+        n = self.counts[color]
+        self.squares += (n + size) * (n + size) - n * n
+        self.counts[color] = n + size
+
+
+class GridMoves(_ColorCounts):
+    """Moves of a grid and its per-color block counts, across play/undo"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._init_counts(_count_colors(grid))
+
+    def moves(self):
+        return self.grid.get_all_components()
+
+    def has_moves(self):
+        return self.grid.has_moves()
+
+    def color_of(self, component):
+        r, c = component[0]
+        return self.grid.get(r, c)
+
+    def play(self, component):
+        color = self.color_of(component)
+        self._remove_blocks(color, len(component))
+        return color, len(component), apply_move(self.grid, component)
+
+    def undo(self, token):
+        color, size, grid_token = token
+        self._restore_blocks(color, size)
+        undo_move(self.grid, grid_token)
+
+
+def component_index(grid):
+    """Move index for a search over `grid` (any backend)"""
+    return GridMoves(grid)
@@ -0,0 +1,242 @@
+# ==========================================================
+# PERSISTENT SOLVE CACHE
+# ==========================================================
+# Exact solver results outlive the process: a SolveCache keeps
+#     (kind, color-canonical state key) -> value
+# in one SQLite file, so a board seen in an earlier session (the
+# seeded benchmark boards, a replayed game) is answered from the
+# cache instead of being searched again. Two kinds of value are
+# stored, both for boards whose columns shift left:
+#     SCORE       best single-player score from the board
+#     DIFFERENCE  negamax score difference (player to move - opponent)
+#
+# The rows are loaded into a dict when the file is opened, so a
+# probe never waits on the database. New results go to a pending
+# dict that a background thread writes out in one transaction
+# every FLUSH_INTERVAL seconds (write-behind); close(), which
+# also runs at exit, writes what is left. Past max_entries the
+# oldest rows are dropped. The file carries SCHEMA_VERSION in
+# PRAGMA user_version; a file with another version is emptied
+# and rebuilt, it only ever holds a cache.
+#
+# PersistentTable is a TranspositionTable whose misses fall back
+# to the cache and whose costly stores (subtree of at least
+# min_weight probes) are written to it, so the solvers use it
+# unchanged:
+#     memo = solve_table(SCORE, persistent=True)
+# ==========================================================
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+from samegame.ttable import TranspositionTable, DEFAULT_ENTRIES
+
+SCHEMA_VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".samegame", "solves.sqlite3")
+DEFAULT_MAX_ENTRIES = 200000
+FLUSH_INTERVAL = 1.0
+# Results of smaller subtrees are cheaper to search than to store
+MIN_WEIGHT = 32
+
+SCORE = 0
+DIFFERENCE = 1
+
+_SIGN = 1 << 63
+
+
+def _signed(key):
+    """64-bit key as the signed integer SQLite stores"""
+    key = int(key)
+    return key - (1 << 64) if key >= _SIGN else key
+
+
+class SolveCache:
+    """Single-file store of exact solver results with write-behind"""
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 flush_interval=FLUSH_INTERVAL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._open_schema()
+
+        self._rows = {}
+        for kind, key, value in self._db.execute(
+                "SELECT kind, key, value FROM solves ORDER BY stored"):
+            self._rows[(kind, key)] = value
+        while len(self._rows) > max_entries:
+            del self._rows[next(iter(self._rows))]
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._pid = os.getpid()
+        self._closed = False
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._write_behind, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _open_schema(self):
+        db = self._db
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            db.execute("DROP TABLE IF EXISTS solves")
+            db.execute("CREATE TABLE solves (kind INTEGER, key INTEGER, value INTEGER, "
+                       "stored REAL, PRIMARY KEY (kind, key)) WITHOUT ROWID")
+            db.execute("CREATE INDEX solves_stored ON solves (stored)")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.commit()
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = NORMAL")
+
+    # ---------------- lookup / store ----------------
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, kind, key):
+        """Stored value of (kind, key), or None"""
+        value = self._rows.get((kind, _signed(key)))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, kind, key, value):
+        """Remember a value; written to disk by the background thread"""
+        item = (kind, _signed(key))
+        if self._rows.get(item) == value:
+            return
+        with self._lock:
+            self._rows[item] = value
+            self._pending[item] = value
+
+    # ---------------- write-behind ----------------
+    def _write_behind(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Disk full or file locked: this batch is only lost
+                # from later sessions
+                pass
+
+    def flush(self):
+        """Write the pending results and trim the file to max_entries"""
+        if os.getpid() != self._pid:
+            # Forked worker: the connection belongs to the parent
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending or self._db is None:
+                return
+            now = time.time()
+            db = self._db
+            db.executemany("INSERT OR REPLACE INTO solves VALUES (?, ?, ?, ?)",
+                           [(kind, key, value, now)
+                            for (kind, key), value in pending.items()])
+            self.writes += len(pending)
+            excess = db.execute("SELECT COUNT(*) FROM solves").fetchone()[0] - self.max_entries
+            if excess > 0:
+                db.execute("DELETE FROM solves WHERE (kind, key) IN "
+                           "(SELECT kind, key FROM solves ORDER BY stored LIMIT ?)",
+                           (excess,))
+            db.commit()
+
+            # The dict keeps insertion order: the oldest rows go first
+            rows = self._rows
+            while len(rows) > self.max_entries:
+                del rows[next(iter(rows))]
+
+    def clear(self):
+        """Drop every stored result"""
+        with self._lock:
+            self._pending = {}
+            self._rows = {}
+            if self._db is None:
+                return
+            self._db.execute("DELETE FROM solves")
+            self._db.commit()
+
+    def close(self):
+        """Write what is pending and close the file (safe to call twice)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        with self._lock:
+            self._db.close()
+            self._db = None
+
+
+class PersistentTable(TranspositionTable):
+    """TranspositionTable that falls back to, and feeds, a SolveCache"""
+
+    def __init__(self, cache, kind, max_entries=DEFAULT_ENTRIES,
+                 min_weight=MIN_WEIGHT):
+        TranspositionTable.__init__(self, max_entries)
+        self.cache = cache
+        self.kind = kind
+        self.min_weight = min_weight
+        self.disk_hits = 0
+
+    def __contains__(self, key):
+        if TranspositionTable.__contains__(self, key):
+            return True
+        value = self.cache.get(self.kind, key)
+        if value is None:
+            return False
+        self.disk_hits += 1
+        # Kept like a costly result so the next probe stays in memory
+        TranspositionTable.store(self, key, value, self.min_weight)
+        self._last = self._find(key)
+        return True
+
+    def store(self, key, value, weight=0):
+        TranspositionTable.store(self, key, value, weight)
+        if weight >= self.min_weight:
+            self.cache.put(self.kind, key, value)
+
+    def stats(self):
+        stats = TranspositionTable.stats(self)
+        stats['disk_hits'] = self.disk_hits
+        return stats
+
+
+_shared = {}
+
+
+def shared_cache(path=DEFAULT_PATH):
+    """The process-wide SolveCache at `path` (None if it cannot be opened)"""
+    if path not in _shared:
+        try:
+            _shared[path] = SolveCache(path)
+        except (OSError, sqlite3.Error):
+            _shared[path] = None
+    return _shared[path]
+
+
+def solve_table(kind, max_entries=DEFAULT_ENTRIES, persistent=True, path=DEFAULT_PATH):
+    """
+    Memo table for exact `kind` values: a PersistentTable on the
+    shared cache, or a plain TranspositionTable when persistent is
+    False or the cache file cannot be opened.
+    """
+    cache = shared_cache(path) if persistent else None
+    if cache is None:
+        return TranspositionTable(max_entries)
+    return PersistentTable(cache, kind, max_entries)
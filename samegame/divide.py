@@ -0,0 +1,64 @@
+# ==========================================================
+# INDEPENDENT REGIONS (DIVIDE PHASE)
+# ==========================================================
+# Gravity keeps the columns packed to the left, so splitting on
+# empty columns never finds more than one region. What does
+# separate a board is color: blocks of different colors never
+# join, so if no color has blocks on both sides of a column
+# boundary, no move on one side can ever change a group on the
+# other (gravity is per column, and a column shift moves the
+# whole right side as one piece).
+#
+#     regions = merged column intervals [first, last] of every
+#               color with at least two blocks
+#
+# A color with a single block can never be removed, so it only
+# sits in its column and does not join intervals. Columns left
+# outside every interval hold no playable block at all.
+#
+# The single-player maximum score then adds up exactly:
+#     best(board) = sum of best(sub_board(board, region))
+# and each sub-board is solved (and memoized) on its own.
+# The two-player score difference does not add up this way:
+# the players alternate between the regions.
+# ==========================================================
+
+
+def independent_regions(grid):
+    """
+    Column lists of the regions that play as independent games,
+    left to right ([] when no color has two blocks).
+    """
+    get = grid.get
+    first = {}
+    last = {}
+    count = {}
+    for c in range(grid.cols):
+        # Columns are compact: read from the bottom up to the first gap
+        for r in range(grid.rows - 1, -1, -1):
+            color = get(r, c)
+            if color is None:
+                break
+            if color in count:
+                count[color] += 1
+            else:
+                first[color] = c
+                count[color] = 1
+            last[color] = c
+
+    intervals = sorted((first[color], last[color])
+                       for color in first if count[color] > 1)
+    regions = []
+    for lo, hi in intervals:
+        if regions and lo <= regions[-1][1]:
+            regions[-1][1] = max(regions[-1][1], hi)
+        else:
+            regions.append([lo, hi])
+
+    return [list(range(lo, hi + 1)) for lo, hi in regions]
+
+
+def sub_board(grid, columns):
+    """The given columns of grid as a board of their own (same backend)"""
+    board = grid.to_board()
+    return type(grid).from_board([[row[c] for c in columns] for row in board])
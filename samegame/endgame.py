@@ -0,0 +1,344 @@
+# ==========================================================
+# ENDGAME SOLVER AND TABLEBASE
+# ==========================================================
+# Once few blocks are left (ENDGAME_CELLS or fewer) the solvers
+# hand the position to this module instead of recursing on the
+# board themselves: flood fills over small tuples are cheaper
+# than the generic board recursion, and one solve gives both the
+# single-player and the two-player value.
+#
+# An endgame position is a tuple of bottom-up column tuples
+# with canonical color labels (0, 1, 2, ... in first-appearance
+# order), which is all that matters for its value: the board
+# height, the trailing empty columns and the color letters do
+# not. Each solved position stores
+#     (best score, best score difference, score move, difference move)
+# with the moves as one (column, height) cell of the group to
+# play, or None when no move is left. Both values assume the
+# columns shift left when one empties.
+#
+# The tablebase is a precomputed file of solved positions with
+# up to TABLEBASE_CELLS blocks, memory-mapped at load and
+# binary-searched on the position's color-canonical Zobrist hash
+# (the same key as state_key):
+#     header  b"SGTB", version, cell limit, record count
+#     records sorted by key, RECORD = <QHhBBBB (16 bytes)
+# Positions missing from the file are solved here and kept in
+# an in-process table.
+#
+#     python -m samegame.endgame          # build TABLEBASE_PATH
+#     entry = solve_grid(grid)            # exact, any endgame
+#     entry = lookup(grid)                # tablebase / solved only
+#     entry = probe(grid)                 # tablebase only
+#     value = entry[0]                    # or entry[1] for two players
+# ==========================================================
+
+import mmap
+import os
+import random
+import struct
+import time
+
+from samegame.hashing import ZOBRIST, canonical_hash
+from samegame.ttable import TranspositionTable
+
+ENDGAME_CELLS = 16
+TABLEBASE_CELLS = 12
+ENDGAME_ENTRIES = 1 << 18
+TABLEBASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'endgame.tb')
+
+MAGIC = b"SGTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct("<QHhBBBB")
+NO_MOVE = 0xFF
+
+# Positions solved in this process (position tuple -> entry)
+_solved = TranspositionTable(ENDGAME_ENTRIES)
+# Loaded tablebase (None until load_tablebase(), False if missing)
+_tablebase = None
+
+
+# ---------------- positions ----------------
+def block_count(grid):
+    """Blocks on the board"""
+    masks = getattr(grid, 'masks', None)
+    if masks is not None:
+        return sum(bin(mask).count("1") for mask in masks.values())
+    get = grid.get
+    count = 0
+    for c in range(grid.cols):
+        for r in range(grid.rows - 1, -1, -1):
+            if get(r, c) is not None:
+                count += 1
+    return count
+
+
+def board_position(grid):
+    """Endgame position of a grid (canonical labels, no trailing empty columns)"""
+    get = grid.get
+    labels = {}
+    columns = []
+    for c in range(grid.cols):
+        column = []
+        for r in range(grid.rows - 1, -1, -1):
+            color = get(r, c)
+            if color is None:
+                break
+            label = labels.get(color)
+            if label is None:
+                label = labels[color] = len(labels)
+            column.append(label)
+        columns.append(tuple(column))
+    while columns and not columns[-1]:
+        columns.pop()
+    return tuple(columns)
+
+
+def position_hash(position):
+    """Color-canonical hash of a position (equals canonical_hash of its board)"""
+    return ZOBRIST.combine([ZOBRIST.column_hash(column) for column in position])
+
+
+def _canonical(columns):
+    """Relabel colors in first-appearance order; empty columns dropped"""
+    labels = {}
+    result = []
+    for column in columns:
+        if not column:
+            continue
+        relabelled = []
+        for color in column:
+            label = labels.get(color)
+            if label is None:
+                label = labels[color] = len(labels)
+            relabelled.append(label)
+        result.append(tuple(relabelled))
+    return tuple(result)
+
+
+def _groups(position):
+    """Groups of two or more blocks, as lists of (column, height) cells"""
+    seen = set()
+    groups = []
+    width = len(position)
+    for c, column in enumerate(position):
+        for h, color in enumerate(column):
+            if (c, h) in seen:
+                continue
+            seen.add((c, h))
+            group = [(c, h)]
+            stack = [(c, h)]
+            while stack:
+                x, y = stack.pop()
+                for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                    if (0 <= nx < width and 0 <= ny < len(position[nx])
+                            and (nx, ny) not in seen
+                            and position[nx][ny] == color):
+                        seen.add((nx, ny))
+                        group.append((nx, ny))
+                        stack.append((nx, ny))
+            if len(group) > 1:
+                groups.append(group)
+    return groups
+
+
+def _play(position, group):
+    """Position after removing `group` (gravity and column shift)"""
+    removed = {}
+    for c, h in group:
+        removed.setdefault(c, set()).add(h)
+    columns = []
+    for c, column in enumerate(position):
+        heights = removed.get(c)
+        if heights:
+            column = tuple(color for h, color in enumerate(column)
+                           if h not in heights)
+        columns.append(column)
+    return _canonical(columns)
+
+
+# ---------------- solver ----------------
+def solve(position, memo=None):
+    """
+    Exact (score, difference, score move, difference move) of a
+    position, for one player and for two alternating players.
+    """
+    if memo is None:
+        memo = _solved
+    if position in memo:
+        return memo[position]
+
+    score, difference = 0, 0
+    score_move = difference_move = None
+    groups = _groups(position)
+    if groups:
+        difference = float('-inf')
+        for group in groups:
+            gain = len(group) ** 2
+            child = solve(_play(position, group), memo)
+            if gain + child[0] > score:
+                score, score_move = gain + child[0], group[0]
+            if gain - child[1] > difference:
+                difference, difference_move = gain - child[1], group[0]
+
+    entry = (score, difference, score_move, difference_move)
+    memo[position] = entry
+    return entry
+
+
+# ---------------- tablebase ----------------
+class Tablebase:
+    """Read-only, memory-mapped tablebase file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_cells, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        if len(self.data) < HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError(f"{path} is truncated")
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.count
+
+    def probe(self, key):
+        """Entry stored under the 64-bit key, or None"""
+        data = self.data
+        unpack = RECORD.unpack_from
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = unpack(data, HEADER.size + mid * RECORD.size)
+            if record[0] < key:
+                lo = mid + 1
+            elif record[0] > key:
+                hi = mid
+            else:
+                self.hits += 1
+                _, score, difference, sc, sh, dc, dh = record
+                return (score, difference,
+                        None if sc == NO_MOVE else (sc, sh),
+                        None if dc == NO_MOVE else (dc, dh))
+        self.misses += 1
+        return None
+
+    def close(self):
+        self.data.close()
+
+
+def write_tablebase(path, entries, max_cells=TABLEBASE_CELLS):
+    """
+    Write {position: entry} as a tablebase file (positions with
+    more than max_cells blocks are left out). Returns the record count.
+    """
+    records = {}
+    for position, (score, difference, score_move, difference_move) in entries.items():
+        if sum(len(column) for column in position) > max_cells:
+            continue
+        sc, sh = score_move or (NO_MOVE, NO_MOVE)
+        dc, dh = difference_move or (NO_MOVE, NO_MOVE)
+        records[position_hash(position)] = (score, difference, sc, sh, dc, dh)
+
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_cells, len(records)))
+        for key in sorted(records):
+            f.write(RECORD.pack(key, *records[key]))
+    os.replace(tmp, path)
+    return len(records)
+
+
+def build_tablebase(path=TABLEBASE_PATH, max_cells=TABLEBASE_CELLS,
+                    sizes=((5, 5), (6, 6), (8, 8), (10, 10)), seeds=range(50),
+                    playouts=20, colors=('R', 'G', 'B', 'Y')):
+    """
+    Solve the endgames that random games on seeded boards reach and
+    write every position solved on the way. Returns the record count.
+    """
+    from samegame.bitboard import BitboardGrid
+
+    memo = {}
+    for rows, cols in sizes:
+        for seed in seeds:
+            rng = random.Random(f"{rows}x{cols}:{seed}")
+            board = [[rng.choice(colors) for _ in range(cols)] for _ in range(rows)]
+            for _ in range(playouts):
+                grid = BitboardGrid.from_board(board)
+                while block_count(grid) > max_cells:
+                    moves = grid.get_all_component_masks()
+                    if not moves:
+                        break
+                    grid.play_mask(*moves[rng.randrange(len(moves))])
+                solve(board_position(grid), memo)
+    return write_tablebase(path, memo, max_cells)
+
+
+def load_tablebase(path=TABLEBASE_PATH):
+    """The tablebase at `path`, mapped once per process (None if missing)"""
+    global _tablebase
+    if _tablebase is None:
+        try:
+            _tablebase = Tablebase(path)
+        except (OSError, ValueError):
+            _tablebase = False
+    return _tablebase or None
+
+
+# ---------------- probing ----------------
+def probe(grid, blocks=None):
+    """Tablebase entry of the board, or None (blocks: block count if known)"""
+    tablebase = load_tablebase()
+    if tablebase is None:
+        return None
+    if blocks is None:
+        blocks = block_count(grid)
+    if blocks > tablebase.max_cells:
+        return None
+    return tablebase.probe(canonical_hash(grid))
+
+
+def lookup(grid, blocks=None):
+    """
+    Entry of a position already known (tablebase or solved in
+    this process), else None. blocks: block count if known.
+    """
+    entry = probe(grid, blocks)
+    if entry is None:
+        position = board_position(grid)
+        if position in _solved:
+            entry = _solved[position]
+    return entry
+
+
+def solve_grid(grid, blocks=None):
+    """Exact entry of an endgame board: from the tablebase, else solved"""
+    entry = probe(grid, blocks)
+    if entry is None:
+        entry = solve(board_position(grid))
+    return entry
+
+
+def move_cells(grid, cell):
+    """Cells of the group an entry's (column, height) move points at"""
+    c, h = cell
+    return grid.get_component(grid.rows - 1 - h, c)
+
+
+def main():
+    start = time.perf_counter()
+    count = build_tablebase()
+    size = os.path.getsize(TABLEBASE_PATH)
+    print(f"Wrote {count} positions ({size / 1024:.0f} KiB) to {TABLEBASE_PATH} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
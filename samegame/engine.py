@@ -0,0 +1,54 @@
+# ==========================================================
+# SHARED GAME ENGINE
+# ==========================================================
+# The module-level game functions every entry point used to
+# carry its own copy of. They take a grid from any backend in
+# samegame.BACKENDS and dispatch to its methods, so scripts
+# keep the get_component(grid, r, c) / apply_gravity(grid)
+# call style while the hot paths live in one place.
+# ==========================================================
+
+
+def get_component(grid, r, c):
+    """Connected same-colored cells at (r, c) ([] if empty/outside)"""
+    return grid.get_component(r, c)
+
+
+def get_all_components(grid):
+    """All valid components (size > 1) in row-major scan order"""
+    return grid.get_all_components()
+
+
+def remove_component(grid, component):
+    """Clear the component's cells (no gravity)"""
+    grid.remove_component(component)
+
+
+def apply_gravity(grid, shift_columns=True):
+    """
+    Drop blocks down, then shift empty columns left.
+    shift_columns=False keeps empty columns in place.
+    """
+    grid.apply_gravity(shift_columns)
+
+
+def play_move(grid, component, shift_columns=True):
+    """Remove a component and apply gravity; returns the points scored"""
+    remove_component(grid, component)
+    apply_gravity(grid, shift_columns)
+    return len(component) ** 2
+
+
+def copy_grid(grid):
+    """Independent copy of the grid"""
+    return grid.copy()
+
+
+def is_game_over(grid):
+    """True when no component of size > 1 remains"""
+    return not grid.has_moves()
+
+
+def is_board_empty(grid):
+    """True when every block has been cleared"""
+    return grid.is_empty()
@@ -0,0 +1,174 @@
+# ==========================================================
+# GRID ADT (2D LIST BACKEND)
+# ==========================================================
+# Reference backend: a row-major list of lists of color
+# letters, None for empty cells. Every backend exposes the
+# same methods so solvers can switch between them.
+# ==========================================================
+
+import random
+
+COLORS = ['R', 'G', 'B', 'Y']
+
+
+class GridADT:
+    """Abstract Data Type for Game Board"""
+
+    def __init__(self, rows, cols, board=None, colors=COLORS):
+        self.rows = rows
+        self.cols = cols
+        if board is None:
+            board = [[random.choice(colors) for _ in range(cols)]
+                     for _ in range(rows)]
+        else:
+            board = [list(row) for row in board]
+        self.board = board
+
+    @classmethod
+    def from_board(cls, board):
+        return cls(len(board), len(board[0]) if board else 0, board)
+
+    def to_board(self):
+        return [row[:] for row in self.board]
+
+    def copy(self):
+        """Create a deep copy of the grid"""
+        new_grid = type(self).__new__(type(self))
+        new_grid.rows = self.rows
+        new_grid.cols = self.cols
+        new_grid.board = [row[:] for row in self.board]
+        return new_grid
+
+    # ---------------- cell access ----------------
+    def get(self, r, c):
+        return self.board[r][c]
+
+    def set(self, r, c, color):
+        self.board[r][c] = color
+
+    # ---------------- components (iterative DFS) ----------------
+    def _dfs(self, r, c, color, visited, component):
+        board = self.board
+        rows, cols = self.rows, self.cols
+        stack = [(r, c)]
+
+        while stack:
+            cr, cc = stack.pop()
+
+            if cr < 0 or cr >= rows or cc < 0 or cc >= cols:
+                continue
+            if (cr, cc) in visited:
+                continue
+            if board[cr][cc] != color:
+                continue
+
+            visited.add((cr, cc))
+            component.append((cr, cc))
+
+            stack.append((cr - 1, cc))
+            stack.append((cr + 1, cc))
+            stack.append((cr, cc - 1))
+            stack.append((cr, cc + 1))
+
+    def get_component(self, r, c):
+        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
+            return []
+        if self.board[r][c] is None:
+            return []
+
+        visited = set()
+        component = []
+        self._dfs(r, c, self.board[r][c], visited, component)
+        return component
+
+    def get_all_components(self):
+        """Get all valid components (size > 1)"""
+        visited = set()
+        components = []
+
+        for r in range(self.rows):
+            for c in range(self.cols):
+                if self.board[r][c] is not None and (r, c) not in visited:
+                    comp = []
+                    self._dfs(r, c, self.board[r][c], visited, comp)
+                    if len(comp) > 1:
+                        components.append(comp)
+
+        return components
+
+    def has_moves(self):
+        board = self.board
+        for r in range(self.rows):
+            row = board[r]
+            below = board[r + 1] if r + 1 < self.rows else None
+            for c in range(self.cols):
+                color = row[c]
+                if color is None:
+                    continue
+                if c + 1 < self.cols and row[c + 1] == color:
+                    return True
+                if below is not None and below[c] == color:
+                    return True
+        return False
+
+    # ---------------- moves ----------------
+    def remove_component(self, component):
+        for r, c in component:
+            self.board[r][c] = None
+
+    def apply_gravity(self, shift_columns=True):
+        """Apply vertical and horizontal gravity"""
+        board = self.board
+        rows = self.rows
+
+        # Vertical gravity (stack-based)
+        for c in range(self.cols):
+            stack = []
+            for r in range(rows):
+                if board[r][c] is not None:
+                    stack.append(board[r][c])
+
+            for r in range(rows - 1, -1, -1):
+                board[r][c] = stack.pop() if stack else None
+
+        if not shift_columns:
+            return
+
+        # Horizontal shift
+        write_col = 0
+        for read_col in range(self.cols):
+            if board[rows - 1][read_col] is not None:
+                if write_col != read_col:
+                    for r in range(rows):
+                        board[r][write_col] = board[r][read_col]
+                        board[r][read_col] = None
+                write_col += 1
+
+    def successors(self):
+        """Yield (component size, child grid) for every legal move"""
+        for comp in self.get_all_components():
+            child = self.copy()
+            child.remove_component(comp)
+            child.apply_gravity()
+            yield len(comp), child
+
+    # ---------------- state ----------------
+    def is_empty(self):
+        return all(cell is None for row in self.board for cell in row)
+
+    def state_key(self):
+        return tuple(tuple(row) for row in self.board)
+
+    def display(self):
+        print("\nBoard:")
+        print("   ", end="")
+        for c in range(self.cols):
+            print(c, end=" ")
+        print()
+
+        for r in range(self.rows):
+            print(r, " ", end="")
+            for c in range(self.cols):
+                print(self.board[r][c] if self.board[r][c] is not None else '.', end=" ")
+            print()
+        print()
@@ -0,0 +1,219 @@
+# ==========================================================
+# COLUMN ZOBRIST HASHING
+# ==========================================================
+# Every (height, color) pair has a fixed random 64-bit key.
+#     column hash = XOR of the keys of the cells in the column
+#     board hash  = XOR of mix(column hash, column index)
+# A move only changes the columns it touched, so backends that
+# keep a list of column hashes rehash those columns and then
+# recombine the list (a column shift is just a list delete).
+#
+# Keys are derived from fixed string seeds so hashes are the
+# same in every run and can be stored on disk.
+#
+# Scores never depend on which letter a color is, so memo keys
+# are color-canonical: canonical_hash() relabels the colors
+# 0, 1, 2, ... in order of first appearance (columns left to
+# right, each from the bottom up) before hashing. A board and
+# any recoloring of it share one key and one memo entry.
+# ==========================================================
+
+import random
+
+MASK64 = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15
+
+# Salt for states that also depend on whose turn it is
+CPU_TURN_KEY = 0x5BD1E9955BD1E995
+
+# Set to True to make state_key() return keys that compare the
+# full board on equal hashes, so memo collisions are detected
+VERIFY_COLLISIONS = False
+collision_stats = {'collisions': 0}
+
+# Set to False to key memos on the colors as they are
+CANONICAL_COLORS = True
+
+
+class ZobristHasher:
+    """Deterministic column/board hashing for any board height"""
+
+    def __init__(self, seed="samegame"):
+        self.seed = seed
+        self.cell_keys = {}
+        self.seg_cache = {}
+        self.pos_keys = []
+        self.height_tables = []
+
+    def cell_key(self, b, color):
+        """Key of a block of `color` at height b (0 = bottom row)"""
+        keys = self.cell_keys.get(color)
+        if keys is None:
+            keys = self.cell_keys[color] = []
+        while len(keys) <= b:
+            rng = random.Random(f"{self.seed}:{color}:{len(keys)}")
+            keys.append(rng.getrandbits(64))
+        return keys[b]
+
+    def pos_key(self, c):
+        while len(self.pos_keys) <= c:
+            rng = random.Random(f"{self.seed}:col:{len(self.pos_keys)}")
+            self.pos_keys.append(rng.getrandbits(64))
+        return self.pos_keys[c]
+
+    def column_hash(self, column):
+        """Hash of a bottom-up column (None entries are skipped)"""
+        h = 0
+        for b, color in enumerate(column):
+            if color is not None:
+                h ^= self.cell_key(b, color)
+        return h
+
+    def segment_hash(self, color, seg):
+        """Hash of one color's bits in a bitboard column segment"""
+        key = (color, seg)
+        h = self.seg_cache.get(key)
+        if h is None:
+            h = 0
+            bits = seg
+            while bits:
+                low = bits & -bits
+                h ^= self.cell_key(low.bit_length() - 1, color)
+                bits ^= low
+            self.seg_cache[key] = h
+        return h
+
+    def combine(self, column_hashes):
+        """Board hash from the list of column hashes (left to right)"""
+        if len(self.pos_keys) < len(column_hashes):
+            self.pos_key(len(column_hashes) - 1)
+        h = 0
+        for ch, pk in zip(column_hashes, self.pos_keys):
+            if ch:
+                x = ((ch ^ pk) * _MIX) & MASK64
+                h ^= x ^ (x >> 29)
+        return h
+
+    def height_table(self, b):
+        """color -> key mapping for height b (filled on demand)"""
+        while len(self.height_tables) <= b:
+            self.height_tables.append(_HeightTable(self, len(self.height_tables)))
+        return self.height_tables[b]
+
+    def board_column_hashes(self, board, rows, cols):
+        """Column hashes of a row-major 2D list"""
+        last = rows - 1
+        hashes = [0] * cols
+        for r in range(rows):
+            keys = self.height_table(last - r)
+            row = board[r]
+            for c in range(cols):
+                color = row[c]
+                if color is not None:
+                    hashes[c] ^= keys[color]
+        return hashes
+
+
+class _HeightTable(dict):
+    __slots__ = ('hasher', 'b')
+
+    def __init__(self, hasher, b):
+        dict.__init__(self)
+        self.hasher = hasher
+        self.b = b
+
+    def __missing__(self, color):
+        key = self[color] = self.hasher.cell_key(self.b, color)
+        return key
+
+
+ZOBRIST = ZobristHasher()
+
+
+def state_hash(grid):
+    """64-bit hash of any grid (backend hash if it keeps one)"""
+    if hasattr(grid, 'state_hash'):
+        return grid.state_hash()
+    return ZOBRIST.combine(
+        ZOBRIST.board_column_hashes(grid.board, grid.rows, grid.cols))
+
+
+def canonical_colors(grid):
+    """color -> canonical label, in first-appearance order"""
+    labels = {}
+    board = grid.board
+    last = grid.rows - 1
+    for c in range(grid.cols):
+        for r in range(last, -1, -1):
+            color = board[r][c]
+            if color is not None and color not in labels:
+                labels[color] = len(labels)
+    return labels
+
+
+def canonical_hash(grid):
+    """64-bit hash of the grid with its colors relabelled canonically"""
+    if hasattr(grid, 'canonical_hash'):
+        return grid.canonical_hash()
+    board = grid.board
+    last = grid.rows - 1
+    tables = [ZOBRIST.height_table(b) for b in range(grid.rows)]
+    labels = {}
+    hashes = []
+    # One column-major pass labels and hashes together
+    for c in range(grid.cols):
+        h = 0
+        for b, keys in enumerate(tables):
+            color = board[last - b][c]
+            if color is None:
+                continue
+            label = labels.get(color)
+            if label is None:
+                label = labels[color] = len(labels)
+            h ^= keys[label]
+        hashes.append(h)
+    return ZOBRIST.combine(hashes)
+
+
+class VerifiedKey(int):
+    """64-bit hash key that also compares the full board on equality"""
+
+    def __new__(cls, h, full):
+        key = int.__new__(cls, h)
+        key.full = full
+        return key
+
+    def __eq__(self, other):
+        if not int.__eq__(self, other):
+            return False
+        full = getattr(other, 'full', None)
+        if full is None or full == self.full:
+            return True
+        collision_stats['collisions'] += 1
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = int.__hash__
+
+
+def state_key(grid, salt=0):
+    """
+    Memo key for a board: its 64-bit hash (XOR salt), taken over
+    the canonical coloring unless CANONICAL_COLORS is off.
+    With VERIFY_COLLISIONS the key carries the full board so a
+    hash collision is detected instead of returning a wrong value.
+    """
+    if CANONICAL_COLORS:
+        h = canonical_hash(grid) ^ salt
+    else:
+        h = state_hash(grid) ^ salt
+    if VERIFY_COLLISIONS:
+        if CANONICAL_COLORS:
+            labels = canonical_colors(grid)
+            full = tuple(tuple(labels.get(cell) for cell in row) for row in grid.board)
+        else:
+            full = tuple(tuple(row) for row in grid.board)
+        return VerifiedKey(h, (full, salt))
+    return h
@@ -0,0 +1,367 @@
+# ==========================================================
+# MONTE CARLO TREE SEARCH
+# ==========================================================
+# Anytime move search for boards too large for the exact DP
+# and backtracking solvers (10x10, 15x10, 20x5). Each iteration
+#     select    -> walk down by UCT while every move is expanded
+#     expand    -> add one untried move as a new node
+#     rollout   -> play the game out with a cheap policy
+#     backup    -> fold the gains back up the path
+# and the move played is the root child with the most visits.
+#
+# The search copies the board into a BitboardGrid once and
+# plays every move as (color, mask) with play_mask(), so a
+# rollout never builds cell lists.
+#
+# Values are negamax score differences (player to move -
+# opponent) for the two-player game, or plain score sums with
+# two_player=False. UCT divides them by the largest magnitude
+# seen so far, which keeps the exploration constant independent
+# of the board size.
+#
+# A rollout that gets down to endgame.TABLEBASE_CELLS blocks
+# probes the endgame tablebase once; on a hit the rest of the
+# game is worth its exact value instead of a playout. Without a
+# tablebase file (or with use_endgame=False) rollouts never probe.
+#
+# One process caps the playout rate, so the search can also run
+# in the warm solver pool of samegame.parallel (parallel=...):
+#     'root'  every process grows its own tree from the root for
+#             the whole budget; the root children are merged by
+#             visit counts (value sums break ties)
+#     'leaf'  one tree; each new leaf is evaluated by `batch`
+#             rollouts split over the processes, and backed up
+#             as `batch` visits at once
+# The pool workers keep the engine imported and the tablebase
+# mapped between calls.
+#
+#     search = MCTS(time_limit=1.0, parallel='root')
+#     move = search.best_move(grid)      # (r, c) cells or None
+#     move = search.best_move(grid, parallel='leaf')
+#     search.iterations, search.nodes, search.elapsed
+#     search.playouts, search.playouts_per_second   # all processes
+#     search.endgame_hits     # rollouts ended by an endgame probe
+# ==========================================================
+
+import math
+import random
+import time
+
+from samegame import endgame
+from samegame.bitboard import BitboardGrid, _popcount
+from samegame.parallel import solver_pool, DEFAULT_WORKERS
+
+DEFAULT_TIME_LIMIT = 1.0
+DEFAULT_EXPLORATION = 0.5
+# Chance that a 'greedy' rollout plays the largest group
+# instead of a random one
+DEFAULT_GREEDY_BIAS = 0.5
+
+ROLLOUTS = ('random', 'greedy')
+PARALLEL_MODES = ('none', 'root', 'leaf')
+# Leaf parallelization: rollouts per new leaf
+DEFAULT_BATCH = 32
+
+
+class _Node:
+    __slots__ = ('color', 'mask', 'gain', 'untried', 'children',
+                 'visits', 'total')
+
+    def __init__(self, color, mask, gain, moves):
+        self.color = color
+        self.mask = mask
+        self.gain = gain            # points of the move into this node
+        self.untried = moves        # (color, mask) not expanded yet
+        self.children = []
+        self.visits = 0
+        self.total = 0.0            # value sum for the player who moved here
+
+
+class MCTS:
+    """UCT search with a time and/or iteration budget"""
+
+    def __init__(self, time_limit=DEFAULT_TIME_LIMIT, max_iterations=None,
+                 rollout='greedy', exploration=DEFAULT_EXPLORATION,
+                 greedy_bias=DEFAULT_GREEDY_BIAS, two_player=True,
+                 use_endgame=True, seed=None, parallel='none', workers=None,
+                 batch=DEFAULT_BATCH):
+        if rollout not in ROLLOUTS:
+            raise ValueError(f"unknown rollout policy: {rollout}")
+        if parallel not in PARALLEL_MODES:
+            raise ValueError(f"unknown parallel mode: {parallel}")
+        if time_limit is None and max_iterations is None:
+            raise ValueError("MCTS needs a time_limit or max_iterations")
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.rollout = rollout
+        self.exploration = exploration
+        self.greedy_bias = greedy_bias
+        self.two_player = two_player
+        self.use_endgame = use_endgame
+        self.probe_endgame = False
+        self.rng = random.Random(seed)
+        self.parallel = parallel
+        self.workers = workers
+        self.batch = batch
+
+        # Statistics of the last search
+        self.iterations = 0
+        self.nodes = 0
+        self.playouts = 0
+        self.endgame_hits = 0
+        self.elapsed = 0.0
+        self.scale = 1.0
+
+    @property
+    def playouts_per_second(self):
+        """Rollouts of the last search per second (all processes)"""
+        return self.playouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def _settings(self):
+        """Constructor arguments of an equivalent serial search (for pool workers)"""
+        return {
+            'time_limit': self.time_limit,
+            'max_iterations': self.max_iterations,
+            'rollout': self.rollout,
+            'exploration': self.exploration,
+            'greedy_bias': self.greedy_bias,
+            'two_player': self.two_player,
+            'use_endgame': self.use_endgame,
+        }
+
+    # ---------------- policies ----------------
+    def _select(self, node):
+        """UCT child of a fully expanded node"""
+        log_n = math.log(node.visits)
+        c = self.exploration
+        scale = self.scale
+        best = None
+        best_value = float('-inf')
+        for child in node.children:
+            value = (child.total / child.visits / scale
+                     + c * math.sqrt(log_n / child.visits))
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def _playout(self, board):
+        """
+        Play the game out on `board`; returns (gains in move order,
+        exact value of the rest of the game or 0 if played out).
+        """
+        rng = self.rng
+        greedy = self.rollout == 'greedy'
+        bias = self.greedy_bias
+        gains = []
+        blocks = endgame.block_count(board) if self.probe_endgame else -1
+        while True:
+            if 0 <= blocks <= endgame.TABLEBASE_CELLS:
+                entry = endgame.probe(board, blocks)
+                blocks = -1     # probe once per rollout
+                if entry is not None:
+                    self.endgame_hits += 1
+                    return gains, entry[1] if self.two_player else entry[0]
+            moves = board.get_all_component_masks()
+            if not moves:
+                return gains, 0
+            if greedy and rng.random() < bias:
+                color, comp = max(moves, key=lambda m: _popcount(m[1]))
+            else:
+                color, comp = moves[rng.randrange(len(moves))]
+            n = _popcount(comp)
+            board.play_mask(color, comp)
+            gains.append(n * n)
+            if blocks >= 0:
+                blocks -= n
+
+    def _fold(self, value, gain, count=1):
+        """
+        Value of a move worth `gain` followed by a line worth `value`
+        (or the sum of `count` such values)
+        """
+        if self.two_player:
+            return gain * count - value
+        return gain * count + value
+
+    def _rollouts(self, board, count):
+        """Sum of the values of `count` rollouts from board"""
+        total = 0
+        for _ in range(count):
+            gains, value = self._playout(board.copy())
+            for gain in reversed(gains):
+                value = self._fold(value, gain)
+            total += value
+        return total
+
+    # ---------------- search ----------------
+    def _descend(self, root, start):
+        """Select and expand: (board at the new leaf, path from the root)"""
+        board = start.copy()
+        node = root
+        path = [root]
+
+        while not node.untried and node.children:
+            node = self._select(node)
+            board.play_mask(node.color, node.mask)
+            path.append(node)
+
+        if node.untried:
+            moves = node.untried
+            color, mask = moves.pop(self.rng.randrange(len(moves)))
+            board.play_mask(color, mask)
+            n = _popcount(mask)
+            child = _Node(color, mask, n * n, board.get_all_component_masks())
+            node.children.append(child)
+            path.append(child)
+            self.nodes += 1
+        return board, path
+
+    def _backup(self, path, value, count=1):
+        """Fold the sum of `count` rollout values from the leaf up the path"""
+        # path[0] is the root, which no player moved into
+        for node in reversed(path[1:]):
+            value = self._fold(value, node.gain, count)
+            node.visits += count
+            node.total += value
+            if abs(value) > self.scale * count:
+                self.scale = abs(value) / count
+        path[0].visits += count
+        self.playouts += count
+
+    def _iterate(self, root, start):
+        board, path = self._descend(root, start)
+        gains, value = self._playout(board)
+        for gain in reversed(gains):
+            value = self._fold(value, gain)
+        self._backup(path, value)
+
+    def _iterate_batch(self, root, start, pool, workers):
+        """Leaf parallelization: one leaf, self.batch rollouts over the pool"""
+        board, path = self._descend(root, start)
+        shares = [self.batch // workers + (i < self.batch % workers)
+                  for i in range(workers)]
+        settings = self._settings()
+        futures = [pool.submit(_rollout_task,
+                               (board, share, self.rng.getrandbits(64), settings))
+                   for share in shares[1:] if share]
+        value = self._rollouts(board, shares[0])
+        for future in futures:
+            total, hits = future.result()
+            value += total
+            self.endgame_hits += hits
+        self._backup(path, value, self.batch)
+
+    def _run(self, root, start, step):
+        """Call step(root, start) until the time or iteration budget is spent"""
+        deadline = (time.time() + self.time_limit
+                    if self.time_limit is not None else None)
+        while True:
+            step(root, start)
+            self.iterations += 1
+            if (self.max_iterations is not None
+                    and self.iterations >= self.max_iterations):
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+
+    def best_move(self, grid, parallel=None):
+        """
+        Best move for the player to move as (r, c) cells, or None.
+        parallel: 'none', 'root' or 'leaf' for this call (default: self.parallel)
+        """
+        mode = parallel or self.parallel
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f"unknown parallel mode: {mode}")
+        start_time = time.time()
+        start = BitboardGrid.from_board(grid.to_board())
+        root = _Node(None, 0, 0, start.get_all_component_masks())
+        self.iterations = 0
+        self.nodes = 1
+        self.playouts = 0
+        self.endgame_hits = 0
+        self.scale = 1.0
+        self.probe_endgame = (self.use_endgame
+                              and endgame.load_tablebase() is not None)
+
+        if not root.untried:
+            self.elapsed = time.time() - start_time
+            return None
+
+        workers = self.workers or DEFAULT_WORKERS
+        if len(root.untried) == 1:
+            _, mask = root.untried[0]
+        elif mode == 'root' and workers > 1:
+            _, mask = self._root_parallel(root, start, grid.to_board(), workers)
+        else:
+            if mode == 'leaf' and workers > 1:
+                pool = solver_pool(self.workers)
+                self._run(root, start, lambda r, s: self._iterate_batch(r, s, pool, workers))
+            else:
+                self._run(root, start, self._iterate)
+            best = max(root.children,
+                       key=lambda child: (child.visits, child.total / child.visits))
+            mask = best.mask
+
+        self.elapsed = time.time() - start_time
+        return start.mask_to_cells(mask)
+
+    def _root_parallel(self, root, start, board, workers):
+        """Root parallelization: (color, mask) with the most visits over all trees"""
+        settings = self._settings()
+        pool = solver_pool(self.workers)
+        futures = [pool.submit(_tree_task, (board, self.rng.getrandbits(64), settings))
+                   for _ in range(workers - 1)]
+        self._run(root, start, self._iterate)
+
+        merged = {}
+        for child in root.children:
+            merged[(child.color, child.mask)] = [child.visits, child.total]
+        for future in futures:
+            children, iterations, nodes, playouts, hits = future.result()
+            self.iterations += iterations
+            self.nodes += nodes
+            self.playouts += playouts
+            self.endgame_hits += hits
+            for color, mask, visits, total in children:
+                entry = merged.setdefault((color, mask), [0, 0.0])
+                entry[0] += visits
+                entry[1] += total
+        # First best in this tree's order, then the workers' extra moves
+        (color, mask), _ = max(merged.items(),
+                               key=lambda item: (item[1][0], item[1][1] / item[1][0]))
+        return color, mask
+
+
+def _tree_task(job):
+    """Pool worker: one root-parallel tree; its root children and counters"""
+    board, seed, settings = job
+    search = MCTS(seed=seed, **settings)
+    start = BitboardGrid.from_board(board)
+    root = _Node(None, 0, 0, start.get_all_component_masks())
+    search.probe_endgame = (search.use_endgame
+                            and endgame.load_tablebase() is not None)
+    search._run(root, start, search._iterate)
+    children = [(child.color, child.mask, child.visits, child.total)
+                for child in root.children]
+    return (children, search.iterations, search.nodes, search.playouts,
+            search.endgame_hits)
+
+
+def _rollout_task(job):
+    """Pool worker: value sum of a batch of rollouts from one leaf"""
+    board, count, seed, settings = job
+    search = MCTS(seed=seed, **settings)
+    search.probe_endgame = (search.use_endgame
+                            and endgame.load_tablebase() is not None)
+    return search._rollouts(board, count), search.endgame_hits
+
+
+def mcts_best_move(grid, time_limit=DEFAULT_TIME_LIMIT, max_iterations=None,
+                   rollout='greedy', two_player=True, seed=None, parallel='none',
+                   workers=None):
+    """One-shot MCTS move (see MCTS for the parameters)"""
+    search = MCTS(time_limit=time_limit, max_iterations=max_iterations,
+                  rollout=rollout, two_player=two_player, seed=seed,
+                  parallel=parallel, workers=workers)
+    return search.best_move(grid)
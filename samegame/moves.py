@@ -0,0 +1,88 @@
+# ==========================================================
+# MAKE / UNMAKE MOVE ENGINE
+# ==========================================================
+# apply_move(grid, comp) plays a move in place and returns an
+# undo token; undo_move(grid, token) restores the exact board.
+# Searches walk one board down and back up the tree instead of
+# copying the grid for every child.
+#
+# The token only holds what the move changed:
+#     list boards   -> old contents of the touched columns and
+#                      the indices of the columns deleted
+#     column grid   -> the replaced column lists
+#     bitboard      -> the previous color masks
+# ==========================================================
+
+
+class ListUndo:
+    """Undo record for row-major list boards"""
+
+    __slots__ = ('saved', 'emptied')
+
+    def __init__(self, saved, emptied):
+        self.saved = saved
+        self.emptied = emptied
+
+
+def apply_move(grid, component, shift_columns=True):
+    """
+    Remove `component`, apply gravity in place and return an undo token.
+    shift_columns=False keeps empty columns in place (no horizontal shift).
+    """
+    if shift_columns and hasattr(grid, 'make_move'):
+        return grid.make_move(component)
+
+    board = grid.board
+    rows = grid.rows
+
+    touched = {}
+    for r, c in component:
+        touched.setdefault(c, set()).add(r)
+
+    saved = []
+    emptied = []
+    for c in sorted(touched, reverse=True):
+        removed = touched[c]
+        old = [board[r][c] for r in range(rows)]
+        saved.append((c, old))
+
+        # Survivors keep their order and drop to the bottom
+        survivors = [old[r] for r in range(rows)
+                     if old[r] is not None and r not in removed]
+        gap = rows - len(survivors)
+        for r in range(gap):
+            board[r][c] = None
+        for r, color in enumerate(survivors, gap):
+            board[r][c] = color
+
+        if not survivors:
+            emptied.append(c)
+
+    if shift_columns:
+        # Highest index first so the remaining indices stay valid
+        for c in emptied:
+            for row in board:
+                del row[c]
+                row.append(None)
+    else:
+        emptied = []
+
+    return ListUndo(saved, emptied)
+
+
+def undo_move(grid, token):
+    """Restore the board exactly as it was before apply_move"""
+    if not isinstance(token, ListUndo):
+        grid.unmake_move(token)
+        return
+
+    board = grid.board
+
+    for c in reversed(token.emptied):
+        for row in board:
+            row.pop()
+            row.insert(c, None)
+
+    for c, old in token.saved:
+        for r, color in enumerate(old):
+            board[r][c] = color
@@ -0,0 +1,53 @@
+# ==========================================================
+# NEGAMAX SCORE DIFFERENCE
+# ==========================================================
+# Two-player Same Game is zero-sum on the score difference, so
+#     value(board) = max over moves of (gain - value(child))
+# is the difference (player to move - opponent) whoever is to
+# move. The memo is keyed on the board alone: one entry serves
+# the CPU search and the human's hint search, where the old
+# turn-aware search stored every board once per is_cpu_turn.
+#
+# Boards with endgame.ENDGAME_CELLS blocks or fewer are answered
+# by samegame.endgame (tablebase, else its endgame solver).
+# ==========================================================
+
+from samegame import endgame
+from samegame.engine import get_all_components
+from samegame.hashing import state_key
+from samegame.moves import apply_move, undo_move
+
+
+def negamax(grid, memo, blocks=None):
+    """
+    Best score difference (player to move - opponent) from this board.
+    memo is a TranspositionTable; entries are weighted by subtree size.
+    blocks: blocks on the board (counted on the first call)
+    """
+    key = state_key(grid)
+    if key in memo:
+        return memo[key]
+    start = memo.probes
+
+    if blocks is None:
+        blocks = endgame.block_count(grid)
+    if blocks <= endgame.ENDGAME_CELLS:
+        value = endgame.solve_grid(grid, blocks)[1]
+        memo.store(key, value, 0)
+        return value
+
+    components = get_all_components(grid)
+    if not components:
+        return 0
+
+    best = float('-inf')
+    for comp in components:
+        undo = apply_move(grid, comp)
+        value = len(comp) ** 2 - negamax(grid, memo, blocks - len(comp))
+        undo_move(grid, undo)
+        if value > best:
+            best = value
+
+    memo.store(key, best, memo.probes - start)
+    return best
+
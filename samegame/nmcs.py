@@ -0,0 +1,170 @@
+# ==========================================================
+# NESTED MONTE CARLO SEARCH
+# ==========================================================
+# Anytime single-player solver for boards where the exact
+# dp_best_score search cannot finish (anything past ~6x6).
+#     level 0 -> one random playout
+#     level n -> at every step try each move with a level n-1
+#                search, remember the best complete sequence
+#                seen so far and play its next move
+# Following the remembered sequence means a level never ends
+# below the best line its sub-searches found.
+#
+# search() runs level 1, 2, ... up to `level` and keeps the
+# best sequence of all of them, so a time limit that cuts the
+# deepest level short still returns the best line found. When
+# time runs out, pending sub-searches shrink to single playouts
+# and each level finishes by following its best sequence.
+#
+# Boards with the column shift are searched on a BitboardGrid
+# copy with (color, mask) moves; shift_columns=False searches
+# copies of the grid itself with the list engine.
+#
+#     solver = NestedMonteCarlo(level=2, time_limit=2.0)
+#     score, sequence = solver.search(grid)   # sequence of (r, c) cell lists
+# ==========================================================
+
+import random
+import time
+
+from samegame.bitboard import BitboardGrid, _popcount
+from samegame.moves import apply_move
+
+DEFAULT_LEVEL = 2
+DEFAULT_TIME_LIMIT = 2.0
+
+
+class NestedMonteCarlo:
+    """Level-N Nested Monte Carlo Search for the best single-player score"""
+
+    def __init__(self, level=DEFAULT_LEVEL, time_limit=DEFAULT_TIME_LIMIT,
+                 shift_columns=True, seed=None):
+        if level < 1:
+            raise ValueError("NMCS level must be at least 1")
+        self.level = level
+        self.time_limit = time_limit
+        self.shift_columns = shift_columns
+        self.rng = random.Random(seed)
+        self.deadline = None
+
+        # Statistics of the last search
+        self.playouts = 0
+        self.completed_level = 0
+        self.timed_out = False
+        self.elapsed = 0.0
+
+    # ---------------- move engine ----------------
+    def _moves(self, board):
+        if self.shift_columns:
+            return board.get_all_component_masks()
+        return board.get_all_components()
+
+    def _play(self, board, move):
+        """Play a move on `board` in place; returns the points scored"""
+        if self.shift_columns:
+            color, mask = move
+            board.play_mask(color, mask)
+            n = _popcount(mask)
+        else:
+            apply_move(board, move, shift_columns=False)
+            n = len(move)
+        return n * n
+
+    def _cells(self, board, move):
+        if self.shift_columns:
+            return board.mask_to_cells(move[1])
+        return move
+
+    # ---------------- search ----------------
+    def _out_of_time(self):
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def _playout(self, board):
+        """Random playout on `board`; returns (score, moves)"""
+        rng = self.rng
+        self.playouts += 1
+        score = 0
+        sequence = []
+        while True:
+            moves = self._moves(board)
+            if not moves:
+                return score, sequence
+            move = moves[rng.randrange(len(moves))]
+            score += self._play(board, move)
+            sequence.append(move)
+
+    def _nested(self, board, level):
+        """Level `level` search from `board` (consumed); returns (score, moves)"""
+        best_score = -1
+        best_sequence = []
+        played = []
+        score = 0
+
+        while True:
+            moves = self._moves(board)
+            if not moves:
+                break
+            for move in moves:
+                if best_score >= 0 and self._out_of_time():
+                    break
+                child = board.copy()
+                gain = self._play(child, move)
+                if level == 1 or self.timed_out:
+                    child_score, child_sequence = self._playout(child)
+                else:
+                    child_score, child_sequence = self._nested(child, level - 1)
+                if score + gain + child_score > best_score:
+                    best_score = score + gain + child_score
+                    best_sequence = played + [move] + child_sequence
+
+            move = best_sequence[len(played)]
+            score += self._play(board, move)
+            played.append(move)
+
+        return score, played
+
+    def search(self, grid):
+        """
+        Best sequence found from this board within the level and
+        time limit: (score, [component cells, in play order]).
+        """
+        start_time = time.time()
+        self.deadline = (start_time + self.time_limit
+                         if self.time_limit is not None else None)
+        self.playouts = 0
+        self.completed_level = 0
+        self.timed_out = False
+
+        if self.shift_columns:
+            start = BitboardGrid.from_board(grid.to_board())
+        else:
+            start = grid.copy()
+
+        best_score, best_sequence = -1, []
+        for level in range(1, self.level + 1):
+            score, sequence = self._nested(start.copy(), level)
+            if score > best_score:
+                best_score, best_sequence = score, sequence
+            if self.timed_out:
+                break
+            self.completed_level = level
+
+        # Replay to turn the moves into cells on the board they are played on
+        board = start.copy()
+        cells = []
+        for move in best_sequence:
+            cells.append(self._cells(board, move))
+            self._play(board, move)
+
+        self.elapsed = time.time() - start_time
+        return best_score, cells
+
+
+def nested_search(grid, level=DEFAULT_LEVEL, time_limit=DEFAULT_TIME_LIMIT,
+                  shift_columns=True, seed=None):
+    """One-shot NMCS: (best score found, move sequence as cell lists)"""
+    solver = NestedMonteCarlo(level=level, time_limit=time_limit,
+                              shift_columns=shift_columns, seed=seed)
+    return solver.search(grid)
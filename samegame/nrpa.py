@@ -0,0 +1,173 @@
+# ==========================================================
+# NESTED ROLLOUT POLICY ADAPTATION
+# ==========================================================
+# NRPA learns the rollout policy instead of sampling moves
+# uniformly like NMCS. A move is coded as
+#     (color, size bucket, leftmost column)
+# and the policy holds one weight per code; a playout picks
+# each move with probability proportional to exp(weight).
+#     level 0 -> one playout with the current policy
+#     level n -> `iterations` times: run level n-1 on a copy of
+#                the policy, keep the best sequence, and adapt
+#                the policy towards it (gradient step `alpha`)
+#
+# The learned weights outlive a search: NRPA.policy carries
+# them into the next search of the same game, and
+# remember_policy() / warm_policy() keep them per board size,
+# so a new game on that size starts from the last one's policy.
+#
+# Like samegame.nmcs, the search runs on a BitboardGrid copy
+# and stops at `time_limit` with the best sequence found.
+#
+#     solver = NRPA(policy=warm_policy(rows, cols))
+#     score, sequence = solver.search(grid)   # (r, c) cell lists
+#     remember_policy(rows, cols, solver.policy)
+# ==========================================================
+
+import math
+import random
+import time
+
+from samegame.bitboard import BitboardGrid, _popcount
+
+DEFAULT_LEVEL = 2
+DEFAULT_ITERATIONS = 50
+DEFAULT_ALPHA = 1.0
+DEFAULT_TIME_LIMIT = 3.0
+
+# Learned policies per (rows, cols), for warm starts
+_policies = {}
+
+
+def warm_policy(rows, cols):
+    """Copy of the last policy remembered for this board size ({} if none)"""
+    return dict(_policies.get((rows, cols), {}))
+
+
+def remember_policy(rows, cols, policy):
+    """Keep `policy` as the warm start for later games on this board size"""
+    _policies[(rows, cols)] = dict(policy)
+
+
+class NRPA:
+    """Nested Rollout Policy Adaptation for the best single-player score"""
+
+    def __init__(self, level=DEFAULT_LEVEL, iterations=DEFAULT_ITERATIONS,
+                 alpha=DEFAULT_ALPHA, time_limit=DEFAULT_TIME_LIMIT,
+                 policy=None, seed=None):
+        if level < 1:
+            raise ValueError("NRPA level must be at least 1")
+        self.level = level
+        self.iterations = iterations
+        self.alpha = alpha
+        self.time_limit = time_limit
+        self.policy = policy if policy is not None else {}
+        self.rng = random.Random(seed)
+        self.deadline = None
+
+        # Statistics of the last search
+        self.playouts = 0
+        self.timed_out = False
+        self.elapsed = 0.0
+
+    # ---------------- move codes ----------------
+    @staticmethod
+    def _code(color, mask, height):
+        """(color, size bucket, leftmost column) of a component mask"""
+        bucket = _popcount(mask).bit_length()
+        column = ((mask & -mask).bit_length() - 1) // height
+        return color, bucket, column
+
+    # ---------------- playouts ----------------
+    def _playout(self, board, policy):
+        """
+        Playout on `board` following `policy`; returns (score, steps)
+        where each step is (move, code, codes of all legal moves).
+        """
+        rng = self.rng
+        height = board.height
+        code = self._code
+        exp = math.exp
+        self.playouts += 1
+        score = 0
+        steps = []
+        while True:
+            moves = board.get_all_component_masks()
+            if not moves:
+                return score, steps
+            codes = [code(color, mask, height) for color, mask in moves]
+            weights = [exp(policy.get(c, 0.0)) for c in codes]
+            pick = rng.random() * sum(weights)
+            i = 0
+            while i < len(moves) - 1 and pick >= weights[i]:
+                pick -= weights[i]
+                i += 1
+            color, mask = moves[i]
+            board.play_mask(color, mask)
+            n = _popcount(mask)
+            score += n * n
+            steps.append((moves[i], codes[i], codes))
+
+    def _adapt(self, policy, steps):
+        """Policy moved one gradient step towards the sequence `steps`"""
+        alpha = self.alpha
+        exp = math.exp
+        new = dict(policy)
+        for _, played, codes in steps:
+            weights = [exp(policy.get(c, 0.0)) for c in codes]
+            z = sum(weights)
+            new[played] = new.get(played, 0.0) + alpha
+            for c, w in zip(codes, weights):
+                new[c] = new.get(c, 0.0) - alpha * w / z
+        return new
+
+    # ---------------- search ----------------
+    def _out_of_time(self):
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def _nested(self, start, level, policy):
+        """Level `level` search; returns (score, steps, adapted policy)"""
+        if level == 0:
+            score, steps = self._playout(start.copy(), policy)
+            return score, steps, policy
+
+        best_score, best_steps = -1, []
+        for _ in range(self.iterations):
+            score, steps, _ = self._nested(start, level - 1, policy)
+            if score >= best_score:
+                best_score, best_steps = score, steps
+            policy = self._adapt(policy, best_steps)
+            if self._out_of_time():
+                break
+        return best_score, best_steps, policy
+
+    def search(self, grid):
+        """
+        Best sequence found from this board: (score, [component
+        cells, in play order]). self.policy is updated with the
+        adapted top-level policy.
+        """
+        start_time = time.time()
+        self.deadline = (start_time + self.time_limit
+                         if self.time_limit is not None else None)
+        self.playouts = 0
+        self.timed_out = False
+
+        start = BitboardGrid.from_board(grid.to_board())
+        score, steps, self.policy = self._nested(start, self.level, self.policy)
+
+        board = start.copy()
+        cells = []
+        for (color, mask), _, _ in steps:
+            cells.append(board.mask_to_cells(mask))
+            board.play_mask(color, mask)
+
+        self.elapsed = time.time() - start_time
+        return max(score, 0), cells
+
+    def best_move(self, grid):
+        """First move of the best sequence (None if no move is left)"""
+        _, sequence = self.search(grid)
+        return sequence[0] if sequence else None
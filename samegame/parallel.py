@@ -0,0 +1,116 @@
+# ==========================================================
+# PROCESS-PARALLEL ROOT SPLITTING
+# ==========================================================
+# Every root move of an exhaustive search roots an independent
+# subtree, so the subtrees can be searched in other processes.
+# One persistent pool is shared by all solvers: the workers are
+# started once, keep their imports and module-level memo tables
+# warm between searches, and are shut down at exit.
+#
+#     values = root_map(task, child_boards(grid, moves), workers)
+#
+# runs task(job) for every job in the pool (one job per task, so
+# an unbalanced tree spreads over the workers) and returns the
+# results in job order. `task` must be a module-level function:
+# in the scripts that means a function of the script run as
+# __main__, which the workers get by fork or, on platforms that
+# spawn, by re-importing the script (its entry point is behind
+# `if __name__ == "__main__"`).
+#
+# The caller picks the first best result in its own move order,
+# the way the serial loop does, so both answer the same move.
+#
+# Lazy SMP runs the other way round: the caller searches serially
+# while helper jobs, started with start_helpers(), search the same
+# tree into a shared table (samegame.sharedtt) and only warm it.
+# stop_helpers() stops them through the table and collects what
+# each helper returns.
+# ==========================================================
+
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+
+from samegame.moves import apply_move
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+_pool = None
+_pool_workers = 0
+
+
+def solver_pool(workers=None):
+    """The shared process pool (restarted if `workers` changes)"""
+    global _pool, _pool_workers
+    workers = workers or DEFAULT_WORKERS
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        # Forked workers share the parent's resource tracker instead
+        # of each starting one that frees shared tables on exit
+        resource_tracker.ensure_running()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the shared pool's workers"""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def root_map(task, jobs, workers=None):
+    """task(job) for every job, run in the shared pool; results in job order"""
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    try:
+        return list(solver_pool(workers).map(task, jobs, chunksize=1))
+    except BrokenProcessPool:
+        # A worker died: start a fresh pool for the next search
+        shutdown_pool()
+        raise
+
+
+def child_boards(grid, components):
+    """A copy of grid after each component is played (columns shift)"""
+    boards = []
+    for comp in components:
+        board = grid.copy()
+        apply_move(board, comp)
+        boards.append(board)
+    return boards
+
+
+def merge_stats(stats, worker_stats):
+    """Add the counters of worker searches into `stats` (max_depth: maximum)"""
+    for ws in worker_stats:
+        for name, value in ws.items():
+            if name == 'max_depth':
+                stats[name] = max(stats.get(name, 0), value)
+            else:
+                stats[name] = stats.get(name, 0) + value
+    return stats
+
+
+def start_helpers(task, jobs, workers=None):
+    """Start task(job) for every job in the shared pool; returns the futures"""
+    pool = solver_pool(workers)
+    return [pool.submit(task, job) for job in jobs]
+
+
+def stop_helpers(table, futures):
+    """Stop the helpers searching into `table`; their results, in job order"""
+    table.stop()
+    try:
+        return [future.result() for future in futures]
+    finally:
+        table.resume()
@@ -0,0 +1,125 @@
+# ==========================================================
+# PONDERING
+# ==========================================================
+# In multiplayer the CPU only searches once the human has moved,
+# and sits idle while the human thinks. A Ponderer uses that time:
+# right after the CPU's move it starts a background thread that
+# plays each likely human reply (largest groups first) on a copy
+# of the board and searches the position the CPU will then face,
+# so the search fills the table the CPU's next move reads. When
+# the human's move arrives, its subtree is already in the table.
+#
+#     ponderer = Ponderer(search)
+#     ponderer.start(grid)          # after the CPU has moved
+#     ...                           # human thinks
+#     ponderer.stop()               # before the CPU (or hint) searches
+#
+# search(board, stop) searches one reply position; it gets the
+# stop event and should probe its table through
+# StoppableTable(table, stop), whose probes raise PonderStopped
+# once stop() is called, so a deep search ends at its next node.
+# Entries are only stored for finished subtrees, so a stopped
+# search leaves nothing wrong behind.
+#
+# The thread shares the in-process table, which is not locked:
+# the main thread must call stop() (it joins the thread) before
+# it searches that table itself.
+# ==========================================================
+
+import threading
+import time
+
+from samegame.engine import get_all_components
+from samegame.moves import apply_move
+
+
+class PonderStopped(Exception):
+    """Raised from a StoppableTable probe once pondering is stopped"""
+
+
+class StoppableTable:
+    """View of a memo table whose probes raise PonderStopped once `stop` is set"""
+
+    def __init__(self, table, stop):
+        self.table = table
+        self.stop = stop
+
+    def __contains__(self, key):
+        if self.stop.is_set():
+            raise PonderStopped()
+        return key in self.table
+
+    def __getitem__(self, key):
+        return self.table[key]
+
+    def get(self, key, default=None):
+        if self.stop.is_set():
+            raise PonderStopped()
+        return self.table.get(key, default)
+
+    def __setitem__(self, key, value):
+        self.table[key] = value
+
+    def store(self, key, value, *args, **kwargs):
+        self.table.store(key, value, *args, **kwargs)
+
+    @property
+    def probes(self):
+        return self.table.probes
+
+
+def likely_replies(grid, limit=None):
+    """The human's moves from this board, largest groups first (at most `limit`)"""
+    components = sorted(get_all_components(grid), key=len, reverse=True)
+    return components if limit is None else components[:limit]
+
+
+class Ponderer:
+    """Background search of the positions the human's replies lead to"""
+
+    def __init__(self, search, replies=None, shift_columns=True):
+        self.search = search
+        self.replies = replies
+        self.shift_columns = shift_columns
+        self._stop = threading.Event()
+        self._thread = None
+        # Last ponder: reply positions searched to the end, and time spent
+        self.positions = 0
+        self.seconds = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, grid):
+        """Search the replies to this board (human to move) in the background"""
+        self.stop()
+        self._stop.clear()
+        self.positions = 0
+        self.seconds = 0.0
+        self._thread = threading.Thread(target=self._run, args=(grid.copy(),),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, board):
+        start = time.perf_counter()
+        try:
+            for comp in likely_replies(board, self.replies):
+                if self._stop.is_set():
+                    break
+                child = board.copy()
+                apply_move(child, comp, shift_columns=self.shift_columns)
+                self.search(child, self._stop)
+                self.positions += 1
+        except PonderStopped:
+            pass
+        finally:
+            self.seconds = time.perf_counter() - start
+
+    def stop(self):
+        """Stop pondering and wait for the thread; (positions, seconds) searched"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.positions, self.seconds
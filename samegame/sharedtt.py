@@ -0,0 +1,283 @@
+# ==========================================================
+# SHARED-MEMORY TRANSPOSITION TABLE
+# ==========================================================
+# A TranspositionTable lives in one interpreter, so processes of
+# the solver pool (samegame.parallel) re-solve every subtree the
+# others already solved. A SharedTranspositionTable keeps its
+# entries in one multiprocessing.shared_memory block that every
+# process of the pool probes and stores into.
+#
+# Each entry is a fixed-width 16-byte slot of two 64-bit words:
+#     check = key ^ data
+#     data  = value + 2**31   (bits  0-31)
+#             bound           (bits 32-39, ttable EXACT / LOWER / UPPER)
+#             move            (bits 40-55, one (a, b) cell, 0xFF = none)
+#             weight class    (bits 56-63, bit length of the weight)
+# with two-slot buckets and the replacement of TranspositionTable
+# (depth-preferred slot 0, always-replace slot 1). There is no
+# lock: a slot torn by two processes writing at once fails the
+# key ^ data check and reads as a miss, and a racing store may be
+# lost. Both only cost a re-search, never a wrong value.
+#
+# The keys are the 64-bit memo keys (state_key); the full board
+# of a VerifiedKey is not shared, so collisions go unchecked.
+#
+# A table pickles as its shared-memory name: the copy a worker
+# unpickles attaches to the same block (Lazy SMP helpers). The
+# pools start the parent's resource tracker before forking, so
+# workers share it and their exit never deletes the block. A
+# helper copy raises SearchStopped from its probes once the
+# owner calls stop(), so helpers quit when the main search is
+# done.
+#
+#     table = SharedTranspositionTable(1 << 18)
+#     pool.submit(helper_task, table, ...)   # probes / stores
+#     if key in table:                       # EXACT entries only
+#         return table[key]
+#     table.store(key, value, weight)
+#     table.stop()
+# ==========================================================
+
+import atexit
+import struct
+from multiprocessing import shared_memory
+
+from samegame.ttable import DEFAULT_ENTRIES, EXACT
+
+MAGIC = b"SGTT"
+HEADER = struct.Struct("<4sIQ")     # magic, stop flag, buckets
+HEADER_BYTES = 32
+SLOT = struct.Struct("<QQ")         # check, data
+STOP = struct.Struct("<I")
+STOP_OFFSET = 4
+
+MASK = (1 << 64) - 1
+VALUE_OFFSET = 1 << 31
+NO_MOVE = 0xFF
+# Helpers look at the stop flag once per this many probes
+STOP_CHECK_INTERVAL = 256
+
+
+class SearchStopped(Exception):
+    """Raised in a helper whose table's owner called stop()"""
+
+
+def _pack(value, bound, move, weight):
+    a, b = move if move is not None else (NO_MOVE, NO_MOVE)
+    return ((value + VALUE_OFFSET) & 0xFFFFFFFF
+            | bound << 32 | a << 40 | b << 48
+            | min(weight.bit_length(), 255) << 56)
+
+
+def _unpack(data):
+    """(value, bound, move, weight class) of a data word"""
+    a = (data >> 40) & 0xFF
+    b = (data >> 48) & 0xFF
+    move = None if a == NO_MOVE else (a, b)
+    return ((data & 0xFFFFFFFF) - VALUE_OFFSET, (data >> 32) & 0xFF,
+            move, data >> 56)
+
+
+class SharedTranspositionTable:
+    """Fixed-capacity memo table in shared memory, probed by every pool process"""
+
+    def __init__(self, max_entries=DEFAULT_ENTRIES, name=None, helper=False):
+        if name is None:
+            buckets = max(1, max_entries // 2)
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=HEADER_BYTES + 2 * buckets * SLOT.size)
+            HEADER.pack_into(self._shm.buf, 0, MAGIC, 0, buckets)
+            self.owner = True
+            atexit.register(self.unlink)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            magic, _, buckets = HEADER.unpack_from(self._shm.buf, 0)
+            if magic != MAGIC:
+                self._shm.close()
+                raise ValueError(f"{name} is not a shared transposition table")
+            self.owner = False
+        self.name = self._shm.name
+        self.buckets = buckets
+        self.helper = helper
+        self._buf = self._shm.buf
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._last = None
+
+    def __reduce__(self):
+        # Unpickled in a worker: attach to the same block, as a helper
+        return (attach, (self.name,))
+
+    @property
+    def capacity(self):
+        return 2 * self.buckets
+
+    @property
+    def probes(self):
+        """Lookups in this process; the difference across a search is its subtree size"""
+        return self.hits + self.misses
+
+    # ---------------- slots ----------------
+    def _slot(self, i):
+        """(key, data) of slot i; (None, 0) if empty or torn"""
+        check, data = SLOT.unpack_from(self._buf, HEADER_BYTES + i * SLOT.size)
+        if not data:
+            return None, 0
+        return check ^ data, data
+
+    def _write(self, i, key, data):
+        SLOT.pack_into(self._buf, HEADER_BYTES + i * SLOT.size, key ^ data, data)
+
+    def _find(self, key):
+        """Data word stored under key, or 0"""
+        key = int(key) & MASK
+        i = (key % self.buckets) * 2
+        found, data = self._slot(i)
+        if found == key:
+            return data
+        found, data = self._slot(i + 1)
+        if found == key:
+            return data
+        return 0
+
+    # ---------------- lookup ----------------
+    def probe(self, key):
+        """(value, bound, move) stored under key, or None"""
+        if self.helper and self.probes % STOP_CHECK_INTERVAL == 0 and self.stopped():
+            raise SearchStopped(self.name)
+        data = self._find(key)
+        if not data:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _unpack(data)[:3]
+
+    def __contains__(self, key):
+        entry = self.probe(key)
+        if entry is None or entry[1] != EXACT:
+            return False
+        # Remembered for the table[key] that usually follows
+        self._last = (key, entry[0])
+        return True
+
+    def __getitem__(self, key):
+        last = self._last
+        if last is not None and last[0] == key:
+            return last[1]
+        data = self._find(key)
+        if not data or (data >> 32) & 0xFF != EXACT:
+            raise KeyError(key)
+        return _unpack(data)[0]
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._last[1]
+        return default
+
+    # ---------------- store ----------------
+    def __setitem__(self, key, value):
+        self.store(key, value, 0)
+
+    def store(self, key, value, weight=0, bound=EXACT, move=None):
+        """Insert or update an entry; heavier entries are kept longer"""
+        self._last = None
+        key = int(key) & MASK
+        data = _pack(value, bound, move, weight)
+        weight = data >> 56
+        i = (key % self.buckets) * 2
+        deep_key, deep = self._slot(i)
+        recent_key, recent = self._slot(i + 1)
+
+        if recent and recent_key == key:
+            self._write(i + 1, 0, 0)
+            recent = 0
+
+        if deep and deep_key == key:
+            if weight < deep >> 56:
+                # Keep the costlier weight with the new value
+                data = data & ~(0xFF << 56) | deep & (0xFF << 56)
+            self._write(i, key, data)
+            return
+
+        if not deep or weight >= deep >> 56:
+            self._write(i, key, data)
+            if not deep:
+                return
+            key, data = deep_key, deep      # demoted to the always-replace slot
+
+        if recent:
+            self.evictions += 1
+        self._write(i + 1, key, data)
+
+    # ---------------- helpers ----------------
+    def stop(self):
+        """Make every helper's next stop check raise SearchStopped"""
+        STOP.pack_into(self._buf, STOP_OFFSET, 1)
+
+    def resume(self):
+        STOP.pack_into(self._buf, STOP_OFFSET, 0)
+
+    def stopped(self):
+        return STOP.unpack_from(self._buf, STOP_OFFSET)[0] != 0
+
+    # ---------------- housekeeping ----------------
+    def __len__(self):
+        data = self._buf[HEADER_BYTES:HEADER_BYTES + 2 * self.buckets * SLOT.size].cast('Q')
+        try:
+            return sum(1 for word in data[1::2] if word)
+        finally:
+            data.release()
+
+    def clear(self):
+        """Drop every entry (in every process; the counters keep running)"""
+        size = 2 * self.buckets * SLOT.size
+        self._buf[HEADER_BYTES:HEADER_BYTES + size] = bytes(size)
+        self._last = None
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Counters as a dict: entries, capacity, hits, misses, evictions (this process)"""
+        return {
+            'entries': len(self),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def close(self):
+        """Detach this process from the block"""
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+            self._shm.close()
+
+    def unlink(self):
+        """Close and free the block (owner only; safe to call twice)"""
+        if self._buf is None:
+            return
+        self.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                # Already removed (by another process or the tracker)
+                pass
+
+
+# Tables this process attached to (name -> helper table)
+_attached = {}
+
+
+def attach(name):
+    """Helper view of the shared table `name`, attached once per process"""
+    table = _attached.get(name)
+    if table is None or table._buf is None:
+        table = _attached[name] = SharedTranspositionTable(name=name, helper=True)
+    return table
@@ -0,0 +1,326 @@
+# ==========================================================
+# WORK-STEALING PARALLEL DEPTH-FIRST SEARCH
+# ==========================================================
+# Root splitting (samegame.parallel) gives each worker one root
+# move, but single-player trees are very unbalanced: some root
+# moves end in two plies, others run twenty deep, and the workers
+# that drew the small ones sit idle. Here the workers share the
+# tree instead:
+#
+#   * every worker runs an explicit-stack DFS over the items it
+#     holds (an item is a board with the score and sleep set that
+#     led to it, and the root move it descends from);
+#   * a worker with nothing left marks itself hungry and waits on
+#     the shared item queue;
+#   * every SYNC_INTERVAL nodes a busy worker looks for hungry
+#     workers and, if there are any, gives away the shallowest
+#     unexplored sibling on its stack (the largest piece of work
+#     it can hand over) as a new item;
+#   * at the same point it publishes its best leaf score and reads
+#     the best of all workers. With a bound, a child whose score
+#     plus the color-count bound (samegame.components) is below
+#     that best is cut off. The cut is strict, so every root move
+#     that reaches the maximum still gets its exact value.
+#
+# The value of a root move is the best leaf score found below it,
+# so the workers only merge maxima; the search ends when every
+# item handed out has been searched.
+#
+#     search = work_stealing(workers)
+#     values, reports = search.run(items, children, bound=True)
+#
+# `children(board, sleep)` lists the moves to search from a board
+# as [(component, child sleep)] (a module-level function, like the
+# tasks of samegame.parallel). `reports` has one dict per worker:
+# nodes, pruned, items (searched), donated, idle and busy seconds.
+# ==========================================================
+
+import atexit
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+
+from samegame.moves import apply_move, undo_move
+from samegame.parallel import DEFAULT_WORKERS
+
+# Nodes between two looks at the hungry workers and the best score
+SYNC_INTERVAL = 64
+# Seconds an idle worker waits on the queue between termination checks
+POLL_INTERVAL = 0.005
+
+# Shared state of the executor, installed in each worker
+_shared = None
+
+
+def _install(shared):
+    global _shared
+    _shared = shared
+
+
+def _color_counts(grid):
+    """Blocks of each color (columns are compact: read bottom-up to the first gap)"""
+    get = grid.get
+    counts = {}
+    for c in range(grid.cols):
+        for r in range(grid.rows - 1, -1, -1):
+            color = get(r, c)
+            if color is None:
+                break
+            counts[color] = counts.get(color, 0) + 1
+    return counts
+
+
+class _Worker:
+    """Search state of one worker process during one run"""
+
+    def __init__(self, worker, children, bound):
+        self.worker = worker
+        self.children = children
+        self.bound = bound
+        self.items, self.pending, self.hungry, self.best = _shared
+        self.values = {}            # root move -> best leaf score found
+        self.local_best = -1
+        self.global_best = -1
+        self.nodes = 0
+        self.pruned = 0
+        self.searched = 0
+        self.donated = 0
+        self.max_depth = 0
+        self.idle = 0.0
+
+    # ---------------- coordination ----------------
+    def next_item(self):
+        """The next item from the queue, or None once the search is over"""
+        start = time.perf_counter()
+        with self.hungry.get_lock():
+            self.hungry.value += 1
+        item = None
+        try:
+            while item is None:
+                try:
+                    item = self.items.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if self.pending.value == 0:
+                        break
+        finally:
+            with self.hungry.get_lock():
+                self.hungry.value -= 1
+            self.idle += time.perf_counter() - start
+        return item
+
+    def finish_item(self):
+        with self.pending.get_lock():
+            self.pending.value -= 1
+        self.searched += 1
+
+    def sync(self, origin, path, stack, job):
+        """Share the best score; hand work to a hungry worker"""
+        with self.best.get_lock():
+            if self.local_best > self.best.value:
+                self.best.value = self.local_best
+            self.global_best = self.best.value
+        if self.hungry.value > 0:
+            self.donate(origin, path, stack, job)
+
+    def donate(self, origin, path, stack, job):
+        """Give away the shallowest unexplored sibling on the stack"""
+        for k, frame in enumerate(stack):
+            if frame[1] < len(frame[0]):
+                break
+        else:
+            return
+        comp, child_sleep = stack[k][0].pop()
+        board = origin.copy()
+        for played in path[:k]:
+            apply_move(board, played)
+        apply_move(board, comp)
+        with self.pending.get_lock():
+            self.pending.value += 1
+        self.items.put((job, board, stack[k][4] + len(comp) ** 2,
+                        child_sleep, stack[k][5] + 1))
+        self.donated += 1
+
+    # ---------------- search ----------------
+    def leaf(self, job, score):
+        if score > self.values.get(job, -1):
+            self.values[job] = score
+        if score > self.local_best:
+            self.local_best = score
+
+    def search(self, item):
+        """Explore one item depth-first until its subtree is done or given away"""
+        job, board, score, sleep, depth = item
+        self.nodes += 1
+        self.max_depth = max(self.max_depth, depth)
+        moves = self.children(board, sleep)
+        if not moves:
+            self.leaf(job, score)
+            return
+
+        origin = board.copy()
+        counts = _color_counts(board)
+        squares = sum(n * n for n in counts.values())
+        path = []
+        # frame: [moves, next move, undo token, (color, size), score, depth]
+        stack = [[moves, 0, None, None, score, depth]]
+        while stack:
+            frame = stack[-1]
+            moves, i = frame[0], frame[1]
+            if i >= len(moves):
+                stack.pop()
+                if frame[2] is not None:
+                    undo_move(board, frame[2])
+                    color, size = frame[3]
+                    n = counts[color]
+                    squares += (n + size) * (n + size) - n * n
+                    counts[color] = n + size
+                    path.pop()
+                continue
+            frame[1] = i + 1
+            comp, child_sleep = moves[i]
+
+            size = len(comp)
+            r, c = comp[0]
+            color = board.get(r, c)
+            n = counts[color]
+            child_squares = squares - n * n + (n - size) * (n - size)
+            child_score = frame[4] + size * size
+            if self.bound and child_score + child_squares < max(self.global_best, self.local_best):
+                self.pruned += 1
+                continue
+
+            token = apply_move(board, comp)
+            self.nodes += 1
+            self.max_depth = max(self.max_depth, frame[5] + 1)
+            grandchildren = self.children(board, child_sleep)
+            if not grandchildren:
+                self.leaf(job, child_score)
+                undo_move(board, token)
+            else:
+                counts[color] = n - size
+                squares = child_squares
+                path.append(comp)
+                stack.append([grandchildren, 0, token, (color, size),
+                              child_score, frame[5] + 1])
+
+            if self.nodes % SYNC_INTERVAL == 0:
+                self.sync(origin, path, stack, job)
+
+    def report(self, busy):
+        return {
+            'worker': self.worker,
+            'pid': os.getpid(),
+            'nodes': self.nodes,
+            'pruned': self.pruned,
+            'items': self.searched,
+            'donated': self.donated,
+            'max_depth': self.max_depth,
+            'idle': self.idle,
+            'busy': busy - self.idle,
+        }
+
+
+def _steal_task(job):
+    """Pool worker: search items until none are left; (values, report, stats)"""
+    worker, children, bound, stats = job
+    start = time.perf_counter()
+    if stats is not None:
+        stats()
+    state = _Worker(worker, children, bound)
+    while True:
+        item = state.next_item()
+        if item is None:
+            break
+        state.search(item)
+        state.finish_item()
+    return (state.values, state.report(time.perf_counter() - start),
+            stats() if stats is not None else None)
+
+
+class WorkStealingSearch:
+    """Warm worker processes sharing one DFS through an item queue"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or DEFAULT_WORKERS
+        context = multiprocessing.get_context()
+        self._items = context.Queue()
+        self._pending = context.Value('q', 0)
+        self._hungry = context.Value('i', 0)
+        self._best = context.Value('q', -1)
+        # Share the parent's resource tracker (see samegame.parallel)
+        resource_tracker.ensure_running()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_install,
+            initargs=((self._items, self._pending, self._hungry, self._best),))
+
+    def run(self, items, children, bound=False, stats=None):
+        """
+        Best leaf score below each item (root moves), and the
+        per-worker reports. items: [(board, score, sleep)]; a root
+        move whose subtree was cut off entirely gets -1. stats: a
+        module-level function returning (and resetting) a worker's
+        search counters, collected in each report's 'stats' entry.
+        """
+        self._pending.value = len(items)
+        self._best.value = -1
+        for job, (board, score, sleep) in enumerate(items):
+            self._items.put((job, board, score, sleep, 0))
+
+        futures = [self._pool.submit(_steal_task, (worker, children, bound, stats))
+                   for worker in range(self.workers)]
+        values = [-1] * len(items)
+        reports = []
+        for future in futures:
+            found, report, worker_stats = future.result()
+            for job, value in found.items():
+                values[job] = max(values[job], value)
+            report['stats'] = worker_stats
+            reports.append(report)
+        return values, reports
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_search = None
+
+
+def work_stealing(workers=None):
+    """The shared WorkStealingSearch (restarted if `workers` changes)"""
+    global _search
+    workers = workers or DEFAULT_WORKERS
+    if _search is None or _search.workers != workers:
+        shutdown_search()
+        _search = WorkStealingSearch(workers)
+    return _search
+
+
+def shutdown_search():
+    global _search
+    if _search is not None:
+        _search.shutdown()
+        _search = None
+
+
+atexit.register(shutdown_search)
+
+
+def merge_reports(totals, reports):
+    """Add per-worker reports into totals (worker -> summed report)"""
+    for report in reports:
+        total = totals.setdefault(report['worker'], {'worker': report['worker']})
+        for name in ('nodes', 'pruned', 'items', 'donated', 'idle', 'busy'):
+            total[name] = total.get(name, 0) + report[name]
+        total['max_depth'] = max(total.get('max_depth', 0), report['max_depth'])
+    return totals
+
+
+def format_reports(reports):
+    """One line per worker: nodes, items, donations and idle time"""
+    return [f"Worker {r['worker']}: {r['nodes']} nodes, {r['pruned']} cut off, "
+            f"{r['items']} subtrees ({r['donated']} given away), "
+            f"idle {r['idle']:.2f}s of {r['idle'] + r['busy']:.2f}s"
+            for r in reports]
@@ -0,0 +1,156 @@
+# ==========================================================
+# BOUNDED TRANSPOSITION TABLE
+# ==========================================================
+# Drop-in replacement for the plain memo dicts the solvers used
+# to grow without limit. The table holds at most max_entries
+# entries in two-slot buckets (hash(key) picks the bucket):
+#     slot 0 -> depth-preferred: keeps the entry with the
+#               largest weight (subtree size or search depth)
+#     slot 1 -> always-replace: the newest other entry
+# A heavier new entry pushes the old slot-0 entry down to slot 1,
+# so a costly result is only lost after two heavier-or-newer
+# stores land in its bucket.
+#
+#     memo = TranspositionTable(max_entries=100000)
+#     if key in memo:              # counts a hit or a miss
+#         return memo[key]
+#     start = memo.probes
+#     ...
+#     memo.store(key, value, memo.probes - start)   # subtree size
+#
+# memo[key] = value stores with weight 0 (always-replace slot
+# unless the bucket is empty).
+# ==========================================================
+
+DEFAULT_ENTRIES = 1 << 18
+
+# Bound types for alpha-beta entries (value, bound type, depth, move)
+EXACT = 0
+LOWER_BOUND = 1     # true score >= value (fail high)
+UPPER_BOUND = 2     # true score <= value (fail low)
+
+# Rough size of one entry (slot tuple, key and value objects),
+# used to turn a byte budget into an entry count
+ENTRY_BYTES = 160
+
+
+class TranspositionTable:
+    """Fixed-capacity memo table with depth-preferred replacement"""
+
+    def __init__(self, max_entries=DEFAULT_ENTRIES, max_bytes=None):
+        if max_bytes is not None:
+            max_entries = max_bytes // ENTRY_BYTES
+        self.buckets = max(1, max_entries // 2)
+        self.slots = [None] * (2 * self.buckets)
+        self.entries = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._last = None
+
+    @property
+    def capacity(self):
+        return len(self.slots)
+
+    @property
+    def probes(self):
+        """Lookups so far; the difference across a search is its subtree size"""
+        return self.hits + self.misses
+
+    def _find(self, key):
+        i = (hash(key) % self.buckets) * 2
+        entry = self.slots[i]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.slots[i + 1]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    # ---------------- lookup ----------------
+    def __contains__(self, key):
+        entry = self._find(key)
+        if entry is None:
+            self.misses += 1
+            return False
+        self.hits += 1
+        # Remembered for the memo[key] that usually follows
+        self._last = entry
+        return True
+
+    def __getitem__(self, key):
+        entry = self._last
+        if entry is None or entry[0] != key:
+            entry = self._find(key)
+            if entry is None:
+                raise KeyError(key)
+        return entry[1]
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._last[1]
+        return default
+
+    # ---------------- store ----------------
+    def __setitem__(self, key, value):
+        self.store(key, value, 0)
+
+    def store(self, key, value, weight=0):
+        """Insert or update an entry; heavier entries are kept longer"""
+        slots = self.slots
+        self._last = None
+        i = (hash(key) % self.buckets) * 2
+        entry = (key, value, weight)
+        deep = slots[i]
+        recent = slots[i + 1]
+
+        if recent is not None and recent[0] == key:
+            slots[i + 1] = recent = None
+            self.entries -= 1
+
+        if deep is not None and deep[0] == key:
+            if weight >= deep[2]:
+                slots[i] = entry
+            else:
+                # Keep the costlier weight with the new value
+                slots[i] = (key, value, deep[2])
+            return
+
+        if deep is None or weight >= deep[2]:
+            slots[i] = entry
+            if deep is None:
+                self.entries += 1
+                return
+            entry = deep        # demoted to the always-replace slot
+
+        if recent is None:
+            self.entries += 1
+        else:
+            self.evictions += 1
+        slots[i + 1] = entry
+
+    # ---------------- housekeeping ----------------
+    def __len__(self):
+        return self.entries
+
+    def clear(self):
+        """Drop every entry (the counters keep running)"""
+        self.slots = [None] * len(self.slots)
+        self.entries = 0
+        self._last = None
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Counters as a dict: entries, capacity, hits, misses, evictions"""
+        return {
+            'entries': self.entries,
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
@@ -0,0 +1,60 @@
+# ==========================================================
+# ROW-MAJOR BOARD VIEWS
+# ==========================================================
+# Backends that do not store a 2D list still expose
+# grid.board[r][c] (read and write) for the GUI and for older
+# strategy code. The views only go through grid.get/grid.set.
+# ==========================================================
+
+
+class RowView:
+    """Row-major view of one row (supports board[r][c])"""
+
+    __slots__ = ('grid', 'r')
+
+    def __init__(self, grid, r):
+        self.grid = grid
+        self.r = r
+
+    def __len__(self):
+        return self.grid.cols
+
+    def __getitem__(self, c):
+        if isinstance(c, slice):
+            return list(self)[c]
+        if c < 0:
+            c += self.grid.cols
+        return self.grid.get(self.r, c)
+
+    def __setitem__(self, c, color):
+        if c < 0:
+            c += self.grid.cols
+        self.grid.set(self.r, c, color)
+
+    def __iter__(self):
+        get = self.grid.get
+        for c in range(self.grid.cols):
+            yield get(self.r, c)
+
+
+class BoardView:
+    """Row-major view of a whole board (supports grid.board[r][c])"""
+
+    __slots__ = ('grid',)
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __len__(self):
+        return self.grid.rows
+
+    def __getitem__(self, r):
+        if isinstance(r, slice):
+            return list(self)[r]
+        if r < 0:
+            r += self.grid.rows
+        return RowView(self.grid, r)
+
+    def __iter__(self):
+        for r in range(self.grid.rows):
+            yield RowView(self.grid, r)